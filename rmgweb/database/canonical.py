@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+This module computes canonical keys for molecules, species and reactions, so
+that the same structure found in different parts of the RMG database can be
+matched by hashing rather than by pairwise isomorphism checks.
+
+The keys are made from standard InChIKeys, which are the same for tautomers
+(structures differing only in where mobile hydrogen atoms are), so two
+structures with the same key are only candidates for being the same, to be
+confirmed by :func:`isSameSpecies`. :class:`SpeciesDict` does both.
+"""
+
+from rmgpy.molecule.molecule import Molecule
+from rmgpy.data.base import Entry
+
+################################################################################
+
+def getMoleculeKey(molecule):
+    """
+    Return the canonical key of `molecule`: its InChIKey (or canonical SMILES,
+    if no InChI can be generated for it) together with its spin multiplicity.
+    """
+    try:
+        identifier = molecule.toInChIKey()
+    except Exception:
+        identifier = None
+    if not identifier:
+        identifier = molecule.toSMILES()
+    return (identifier, molecule.multiplicity)
+
+def getSpeciesKey(species):
+    """
+    Return the canonical key of `species`, which may be a :class:`Species`,
+    a :class:`Molecule` or an :class:`Entry` whose item is either. For a
+    species with several resonance isomers the smallest of their keys is used,
+    so that the key does not depend on which isomer is listed first.
+    """
+    if isinstance(species, Entry):
+        species = species.item
+    if isinstance(species, Molecule):
+        return getMoleculeKey(species)
+    return min([getMoleculeKey(molecule) for molecule in species.molecule])
+
+def getReactionKey(reaction):
+    """
+    Return the canonical key of `reaction`. Reactions that are isomorphic in
+    either direction have the same key.
+    """
+    reactants = tuple(sorted([getSpeciesKey(reactant) for reactant in reaction.reactants]))
+    products = tuple(sorted([getSpeciesKey(product) for product in reaction.products]))
+    return tuple(sorted([reactants, products]))
+
+def getKeyMolecules(species):
+    """
+    Return the list of molecules of `species`, which may be anything
+    :func:`getSpeciesKey` takes, or a list of molecules.
+    """
+    if isinstance(species, list):
+        return species
+    if isinstance(species, Entry):
+        species = species.item
+    if isinstance(species, Molecule):
+        return [species]
+    return species.molecule
+
+def isSameSpecies(species1, species2):
+    """
+    Return ``True`` if `species1` and `species2`, which may be anything
+    :func:`getKeyMolecules` takes, are the same species, that is, if a molecule
+    of one is isomorphic to a molecule of the other.
+    """
+    molecules2 = getKeyMolecules(species2)
+    for molecule1 in getKeyMolecules(species1):
+        for molecule2 in molecules2:
+            if molecule1.isIsomorphic(molecule2):
+                return True
+    return False
+
+def isSameSpeciesList(speciesList1, speciesList2):
+    """
+    Return ``True`` if the lists `speciesList1` and `speciesList2` contain the
+    same species, in any order.
+    """
+    if len(speciesList1) != len(speciesList2):
+        return False
+    unmatched = list(speciesList2)
+    for species1 in speciesList1:
+        for index, species2 in enumerate(unmatched):
+            if isSameSpecies(species1, species2):
+                del unmatched[index]
+                break
+        else:
+            return False
+    return True
+
+def findInBucket(bucket, species):
+    """
+    Return the value stored for `species` in `bucket`, a list of (species,
+    value) pairs sharing a canonical key, or ``None`` if it is not there.
+    """
+    for other, value in bucket or []:
+        if isSameSpecies(species, other):
+            return value
+    return None
+
+def addToBucket(bucket, species, value):
+    """
+    Return a copy of `bucket`, a list of (species, value) pairs sharing a
+    canonical key, with `value` stored for `species` in place of any value
+    already there.
+    """
+    bucket = [(other, existing) for other, existing in bucket or [] if not isSameSpecies(species, other)]
+    bucket.append((species, value))
+    return bucket
+
+class SpeciesDict(object):
+    """
+    A dictionary keyed by species (or molecules or entries), which finds a
+    species by its canonical key and confirms it by isomorphism, so that
+    tautomers are kept apart.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+
+    def get(self, species, default=None):
+        """
+        Return the value stored for `species`, or `default` if there is none.
+        """
+        value = findInBucket(self.buckets.get(getSpeciesKey(species)), species)
+        return default if value is None else value
+
+    def setdefault(self, species, value):
+        """
+        Return the value stored for `species`, first storing `value` for it
+        if there is none. Values may not be ``None``.
+        """
+        bucket = self.buckets.setdefault(getSpeciesKey(species), [])
+        existing = findInBucket(bucket, species)
+        if existing is None:
+            bucket.append((species, value))
+            existing = value
+        return existing
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+This module reduces the memory taken up by the entries of the loaded RMG
+database, which the website holds in every worker process. The short
+descriptions and references of the entries are largely repeated, so identical
+ones are shared, while the long descriptions are only displayed on individual
+entry pages, so they are kept compressed and expanded on access.
+"""
+
+import weakref
+import zlib
+
+from rmgpy.data.base import Entry
+
+################################################################################
+
+# Long descriptions shorter than this are not worth compressing
+MIN_COMPRESSED_LENGTH = 200
+
+# The single shared copy of each distinct reference in use, which is
+# forgotten once no entry refers to it any more
+_references = weakref.WeakValueDictionary()
+
+def internText(text, texts):
+    """
+    Return a shared copy of the (byte or unicode) string `text`, from the
+    dictionary `texts` of those seen so far. Strings cannot be weakly
+    referenced, so each call of :func:`compactDatabase` uses its own
+    dictionary, which is dropped when it returns.
+    """
+    if not isinstance(text, basestring):
+        return text
+    return texts.setdefault(text, text)
+
+def getFieldsKey(value):
+    """
+    Return a hashable key made from `value` and, for lists, tuples and
+    dictionaries, recursively from their contents. Raises :class:`TypeError`
+    if `value` contains anything else that is unhashable.
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple([getFieldsKey(item) for item in value])
+    elif isinstance(value, dict):
+        return tuple(sorted([(key, getFieldsKey(item)) for key, item in value.iteritems()]))
+    hash(value)
+    return value
+
+def internReference(reference):
+    """
+    Return a shared copy of the literature `reference`, identified by its
+    type and the values of all its fields.
+    """
+    if reference is None:
+        return None
+    try:
+        key = (reference.__class__, getFieldsKey(vars(reference)))
+    except TypeError:
+        return reference
+    shared = _references.get(key)
+    if shared is None:
+        _references[key] = shared = reference
+    return shared
+
+class CompressedText(str):
+    """
+    A unicode string held compressed, as returned by :func:`compressText`.
+    """
+
+    def decompress(self):
+        return zlib.decompress(self).decode('utf-8')
+
+def compressText(text):
+    """
+    Return `text` compressed as a :class:`CompressedText` if that makes it
+    smaller, or otherwise `text` itself.
+    """
+    if isinstance(text, basestring) and len(text) >= MIN_COMPRESSED_LENGTH:
+        compressed = zlib.compress(text.encode('utf-8') if isinstance(text, unicode) else text, 9)
+        if len(compressed) < len(text):
+            return CompressedText(compressed)
+    return text
+
+def decompressText(text):
+    """
+    Return the original text given the result of :func:`compressText`.
+    """
+    if isinstance(text, CompressedText):
+        return text.decompress()
+    return text
+
+################################################################################
+
+class CompactEntry(Entry):
+    """
+    An :class:`Entry` that keeps its long description compressed in memory,
+    decompressing it whenever the :attr:`longDesc` attribute is read.
+    """
+
+    def _getLongDesc(self):
+        return decompressText(self.__dict__.get('_longDesc', u''))
+
+    def _setLongDesc(self, value):
+        self.__dict__['_longDesc'] = compressText(value)
+
+    longDesc = property(_getLongDesc, _setLongDesc)
+
+def compactEntry(entry, texts):
+    """
+    Reduce the memory used by the database `entry` in place, by sharing its
+    short description (with those in the dictionary `texts`) and reference
+    with identical entries and, for plain :class:`Entry` objects, compressing
+    its long description.
+    """
+    if type(entry) is Entry:
+        longDesc = entry.__dict__.pop('longDesc', u'')
+        entry.__class__ = CompactEntry
+        entry.longDesc = longDesc
+    entry.shortDesc = internText(getattr(entry, 'shortDesc', u''), texts)
+    if hasattr(entry, 'referenceType'):
+        entry.referenceType = internText(entry.referenceType, texts)
+    if hasattr(entry, 'reference'):
+        entry.reference = internReference(entry.reference)
+    return entry
+
+def compactDatabase(database):
+    """
+    Compact every entry of the `database` (a library, depository, group or
+    rules database). The entries of rules databases are lists of entries.
+    """
+    if database is None:
+        return database
+    texts = {}
+    for value in database.entries.values():
+        if isinstance(value, list):
+            for entry in value:
+                compactEntry(entry, texts)
+        else:
+            compactEntry(value, texts)
+    return database
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+This module indexes the entries of each part of the RMG database by their
+index number, so that the entry views can find an entry, or the first or last
+entry, without scanning through all of them.
+"""
+
+################################################################################
+
+def getEntryList(database):
+    """
+    Return a list of all the entries of `database`. The entries of some
+    databases (e.g. rate rules) are lists of entries, which are flattened.
+    """
+    entries = []
+    for value in database.entries.values():
+        if isinstance(value, list):
+            entries.extend(value)
+        else:
+            entries.append(value)
+    return entries
+
+class EntryIndex(object):
+    """
+    An index of the entries of a database by their index number. The
+    attributes are:
+    
+    =============== ============================================================
+    Attribute       Description
+    =============== ============================================================
+    `entries`       A dictionary of the entries by index number
+    `minIndex`      The smallest positive index number, or ``None`` if none
+    `maxIndex`      The largest positive index number, or ``None`` if none
+    `nextIndex`     The index number to give a new entry
+    `size`          The number of items in the database's ``entries`` when indexed
+    =============== ============================================================
+    
+    If several entries have the same index number, the first one is indexed.
+    """
+
+    def __init__(self, database):
+        self.entries = {}
+        for entry in getEntryList(database):
+            self.entries.setdefault(entry.index, entry)
+        positive = [index for index in self.entries if index > 0]
+        self.minIndex = min(positive) if positive else None
+        self.maxIndex = max(positive) if positive else None
+        self.nextIndex = max(self.entries.keys() or [0]) + 1
+        self.size = len(database.entries)
+
+    def get(self, index):
+        """
+        Return the entry with the given `index` number, or ``None`` if there
+        is no such entry.
+        """
+        return self.entries.get(index)
+
+def indexEntries(database):
+    """
+    Build the index of the entries of `database` and store it on the database.
+    """
+    database.entryIndex = EntryIndex(database)
+    return database
+
+def getEntryIndex(database):
+    """
+    Return the index of the entries of `database`, which is normally built as
+    the database is loaded, but is (re)built here if missing or out of date.
+    """
+    entryIndex = getattr(database, 'entryIndex', None)
+    if entryIndex is None or entryIndex.size != len(database.entries):
+        entryIndex = indexEntries(database).entryIndex
+    return entryIndex
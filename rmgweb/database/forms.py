@@ -75,6 +75,57 @@ class ThermoSearchForm(forms.Form):
             help_text_html = u'<br />%s',
             errors_on_separate_row = False)
 
+class ThermoBatchForm(forms.Form):
+    """
+    This form provides a means of specifying a batch of species to estimate
+    the thermodynamic data of, as an uploaded RMG species dictionary or a
+    list of SMILES, and the format to return the data in.
+    """
+    dictionary = forms.FileField(label='Species dictionary', required=False)
+    species = forms.CharField(label='or SMILES', required=False, help_text='One per line, optionally after a label',
+                              widget=forms.widgets.Textarea(attrs={'rows': 10, 'cols': 40}))
+    format = forms.ChoiceField(choices=(('chemkin', 'Chemkin thermo file'), ('json', 'JSON')), initial='chemkin')
+
+    def clean(self):
+        """
+        Custom validation to ensure that some species have been provided.
+        """
+        cleaned_data = super(ThermoBatchForm, self).clean()
+        if not cleaned_data.get('dictionary') and not cleaned_data.get('species', '').strip():
+            raise forms.ValidationError('Upload a species dictionary or enter a list of SMILES.')
+        return cleaned_data
+
+class TransportBatchForm(forms.Form):
+    """
+    This form provides a means of uploading a mechanism, as a Chemkin file and
+    an RMG species dictionary, to estimate the transport data of its species.
+    """
+    chemkin = forms.FileField(label='Chemkin file')
+    dictionary = forms.FileField(label='Species dictionary')
+
+class SolvationBatchForm(forms.Form):
+    """
+    This form provides a means of specifying a batch of species, as an
+    uploaded RMG species dictionary or a list of SMILES, to estimate the
+    solvation of in the chosen solvents, and the format to return it in.
+    """
+    from models import SolventList
+    dictionary = forms.FileField(label='Species dictionary', required=False)
+    species = forms.CharField(label='or SMILES', required=False, help_text='One per line, optionally after a label',
+                              widget=forms.widgets.Textarea(attrs={'rows': 10, 'cols': 40}))
+    solvents = forms.MultipleChoiceField(choices=sorted(SolventList), required=False, help_text='All of them if none are chosen',
+                                         widget=forms.widgets.SelectMultiple(attrs={'size': 10}))
+    format = forms.ChoiceField(choices=(('csv', 'CSV'), ('json', 'JSON')), initial='csv')
+
+    def clean(self):
+        """
+        Custom validation to ensure that some species have been provided.
+        """
+        cleaned_data = super(SolvationBatchForm, self).clean()
+        if not cleaned_data.get('dictionary') and not cleaned_data.get('species', '').strip():
+            raise forms.ValidationError('Upload a species dictionary or enter a list of SMILES.')
+        return cleaned_data
+
 class KineticsSearchForm(forms.Form):
     """
     This form provides a means of specifying a set of reactants to get
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+This module looks up the kinetics of a batch of reactions at once, for the
+JSON kinetics API. Every kinetics entry and estimate found for each reaction
+is returned as a dictionary ready to be dumped as JSON.
+
+The species are parsed once however many reactions they appear in, repeated
+reactions are only searched once, and the searches are spread over the
+reactions pool (see ``DATABASE_REACTIONS_PROCESSES``), all using the same
+version of the database.
+"""
+
+import re
+
+from rmgpy.data.kinetics import TemplateReaction, DepositoryReaction, LibraryReaction
+from rmgpy.kinetics import ArrheniusEP
+from rmgpy.molecule.molecule import Molecule
+
+from rmgweb.database.canonical import isSameSpeciesList
+from rmgweb.database.reactionindex import getSideKey
+from rmgweb.database.tools import generateReactions, generateSpeciesThermo, reactionHasReactants, startDatabaseTasks
+
+################################################################################
+
+# The temperatures in K at which the rate coefficients are evaluated, unless
+# others are requested
+BATCH_TEMPERATURES = [300, 400, 500, 600, 800, 1000, 1500, 2000]
+
+# The pressure in Pa at which the rate coefficients are evaluated
+BATCH_PRESSURE = 1e5
+
+# The most reactions that can be looked up in one batch
+BATCH_MAX_REACTIONS = 100
+
+# Separates the species on each side of a reaction string; the plus signs must
+# be surrounded by whitespace, so as not to split charged SMILES like [NH4+]
+SPECIES_SEPARATOR = re.compile(r'\s+\+\s+')
+
+def getMolecule(text, molecules):
+    """
+    Return the molecule given in `text` as an adjacency list, InChI or SMILES,
+    parsing it only if it is not already in the dictionary `molecules` of the
+    molecules parsed so far.
+    """
+    text = str(text).strip()
+    molecule = molecules.get(text)
+    if molecule is None:
+        if '\n' in text:
+            molecule = Molecule().fromAdjacencyList(text)
+        elif text.startswith('InChI='):
+            molecule = Molecule().fromInChI(text)
+        else:
+            molecule = Molecule().fromSMILES(text)
+        molecules[text] = molecule
+    return molecule
+
+def parseReaction(reaction, molecules):
+    """
+    Return the lists of reactant and product molecules (or ``None`` for the
+    products) of `reaction`, which is either a string of SMILES such as
+    ``"CC + [OH] >> C[CH2] + O"`` (the products being optional, and the
+    plus signs between the species surrounded by whitespace), or a
+    dictionary with a list of ``reactants`` and optionally of ``products``,
+    each an adjacency list, InChI or SMILES. The molecules are parsed with
+    :func:`getMolecule`.
+    """
+    if isinstance(reaction, basestring):
+        sides = reaction.split('>>')
+        if len(sides) > 2:
+            raise ValueError('Invalid reaction "{0}".'.format(reaction))
+        reactants = SPECIES_SEPARATOR.split(sides[0].strip())
+        products = SPECIES_SEPARATOR.split(sides[1].strip()) if len(sides) == 2 else None
+    elif isinstance(reaction, dict):
+        reactants = reaction['reactants']
+        products = reaction.get('products') or None
+    else:
+        raise ValueError('Invalid reaction {0!r}.'.format(reaction))
+    if not 1 <= len(reactants) <= 3 or (products is not None and len(products) > 3):
+        raise ValueError('A reaction must have one to three reactants and at most three products.')
+    reactants = [getMolecule(text, molecules) for text in reactants]
+    if products is not None:
+        products = [getMolecule(text, molecules) for text in products]
+    return reactants, products
+
+def getRateCoefficients(kinetics, temperatures):
+    """
+    Return a list of the rate coefficients in SI units given by `kinetics` at
+    each of the `temperatures`, with ``None`` where it cannot be evaluated.
+    """
+    rates = []
+    for T in temperatures:
+        try:
+            rates.append(kinetics.getRateCoefficient(T, P=BATCH_PRESSURE))
+        except Exception:
+            rates.append(None)
+    return rates
+
+def getReactionKinetics(database, reactants, products, temperatures):
+    """
+    Return a list of dictionaries describing each kinetics entry and estimate
+    in `database` for the given `reactants` and `products`, with its rate
+    coefficients at the given `temperatures`. RMG-Java is not queried.
+    """
+    generatedReactions = generateReactions(database, reactants, products, rmgJava=False)
+    results = []
+    for reaction in generatedReactions[0]:
+        result = {}
+        if isinstance(reaction, TemplateReaction):
+            result['source'] = '%s (RMG-Py %s)' % (reaction.family, reaction.estimator)
+            result['type'] = reaction.estimator
+            result['family'] = reaction.family
+        elif isinstance(reaction, DepositoryReaction):
+            if 'untrained' in reaction.depository.name:
+                continue
+            result['source'] = reaction.depository.name
+            result['type'] = 'depository'
+            result['family'] = reaction.family
+            result['depository'] = reaction.depository.label
+            result['index'] = reaction.entry.index
+        elif isinstance(reaction, LibraryReaction):
+            result['source'] = reaction.library.name
+            result['type'] = 'library'
+            result['library'] = reaction.library.label
+            result['index'] = reaction.entry.index
+        
+        # Rate rules give the activation energy as a function of the enthalpy
+        # of reaction, for which the thermo data of the species are needed
+        if isinstance(reaction.kinetics, ArrheniusEP):
+            for species in reaction.reactants + reaction.products:
+                generateSpeciesThermo(species, database)
+            reaction.kinetics = reaction.kinetics.toArrhenius(reaction.getEnthalpyOfReaction(298))
+        
+        result['reactants'] = [species.molecule[0].toSMILES() for species in reaction.reactants]
+        result['products'] = [species.molecule[0].toSMILES() for species in reaction.products]
+        result['forward'] = reactionHasReactants(reaction, reactants)
+        result['kinetics'] = repr(reaction.kinetics)
+        result['rates'] = getRateCoefficients(reaction.kinetics, temperatures)
+        results.append(result)
+    return results
+
+def getBatchKinetics(database, reactions, temperatures=None):
+    """
+    Return a list of dictionaries giving the kinetics found in `database` for
+    each of `reactions`, given as for :func:`parseReaction`, with their rate
+    coefficients at the given `temperatures` (by default the
+    ``BATCH_TEMPERATURES``). A reaction that cannot be parsed or searched
+    gets a dictionary with an ``error`` rather than spoiling the whole batch.
+    """
+    temperatures = temperatures or BATCH_TEMPERATURES
+    molecules = {}
+    searches = []
+    searchIndices = {}
+    parsedReactions = []
+    for reaction in reactions:
+        try:
+            reactants, products = parseReaction(reaction, molecules)
+        except Exception, e:
+            parsedReactions.append('{0}: {1!s}'.format(e.__class__.__name__, e))
+            continue
+        # Search for each distinct reaction once, checking the reactions
+        # sharing a key for isomorphism as tautomers share keys
+        key = (getSideKey(reactants), getSideKey(products) if products is not None else None)
+        for index in searchIndices.get(key, []):
+            searchReactants, searchProducts = searches[index][:2]
+            if isSameSpeciesList(searchReactants, reactants) and (products is None or isSameSpeciesList(searchProducts, products)):
+                break
+        else:
+            index = len(searches)
+            searchIndices.setdefault(key, []).append(index)
+            searches.append((reactants, products, temperatures))
+        parsedReactions.append(index)
+    
+    pending = startDatabaseTasks(database, getReactionKinetics, searches)
+    searchResults = []
+    for index, args in enumerate(searches):
+        try:
+            if pending is None:
+                searchResults.append({'results': getReactionKinetics(database, *args)})
+            else:
+                searchResults.append({'results': pending[index].get()})
+        except Exception, e:
+            searchResults.append({'error': '{0}: {1!s}'.format(e.__class__.__name__, e)})
+    
+    results = []
+    for reaction, parsed in zip(reactions, parsedReactions):
+        if isinstance(parsed, basestring):
+            result = {'error': parsed}
+        else:
+            result = dict(searchResults[parsed])
+        result['reaction'] = reaction
+        results.append(result)
+    return results
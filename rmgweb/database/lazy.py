@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+This module provides a dictionary whose values are only loaded when first
+accessed, which the website uses to hold the libraries and families of the
+RMG database so that a page about one of them only has to parse that one.
+"""
+
+import threading
+
+################################################################################
+
+class LazyEntry(object):
+    """
+    A placeholder for a value of a :class:`LazyDict` that has not been loaded
+    yet, which is loaded by calling ``function(*args)``.
+    """
+
+    __slots__ = ['function', 'args']
+
+    def __init__(self, function, args):
+        self.function = function
+        self.args = args
+
+    def load(self):
+        return self.function(*self.args)
+
+class LazyDict(dict):
+    """
+    A dictionary whose values can be set with :meth:`setLazy` to be loaded on
+    first access, so the keys are known without loading anything. Looking up
+    a key loads only that value, while iterating over the values or items (or
+    pickling the dictionary) loads all of them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self.lock = threading.RLock()
+
+    def setLazy(self, key, function, *args):
+        """
+        Set the value of `key` to be loaded by calling ``function(*args)`` the
+        first time it is accessed. The function and arguments must be
+        picklable if the dictionary is to be copied to other processes.
+        """
+        dict.__setitem__(self, key, LazyEntry(function, args))
+
+    def isLoaded(self, key):
+        """
+        Return ``True`` if the value of `key` has been loaded.
+        """
+        return not isinstance(dict.__getitem__(self, key), LazyEntry)
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if isinstance(value, LazyEntry):
+            with self.lock:
+                # Another thread may have loaded it while we waited
+                value = dict.__getitem__(self, key)
+                if isinstance(value, LazyEntry):
+                    value = value.load()
+                    dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def pop(self, key, *args):
+        """
+        Remove `key` and return its value, or ``None`` if it was never loaded.
+        """
+        value = dict.pop(self, key, *args)
+        return None if isinstance(value, LazyEntry) else value
+
+    def loadAll(self):
+        """
+        Load every value that has not been loaded yet.
+        """
+        for key in self.keys():
+            self[key]
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def itervalues(self):
+        return (self[key] for key in self.keys())
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def iteritems(self):
+        return ((key, self[key]) for key in self.keys())
+
+    def copy(self):
+        """
+        Return a shallow copy, in which the values not yet loaded stay unloaded.
+        """
+        new = LazyDict()
+        dict.update(new, dict.items(self))
+        return new
+
+    __copy__ = copy
+
+    def __reduce__(self):
+        return (LazyDict, (), None, None, self.iteritems())
+
+def loadAll(container):
+    """
+    Load all the values of `container` if it is a :class:`LazyDict`.
+    """
+    if isinstance(container, LazyDict):
+        container.loadAll()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+This module contains a least-recently-used cache, for keeping the results of
+expensive calculations (such as kinetics searches or thermo estimates) that
+are requested over and over.
+"""
+
+import collections
+import threading
+
+################################################################################
+
+class LRUCache(object):
+    """
+    A dictionary holding at most `size` items, which forgets the least
+    recently used item when full. It may be used from several threads. The
+    attributes are:
+    
+    =============== ============================================================
+    Attribute       Description
+    =============== ============================================================
+    `size`          The largest number of items to hold
+    `items`         An ordered dictionary of the items, least recently used first
+    `hits`          The number of lookups that found an item
+    `misses`        The number of lookups that did not find an item
+    =============== ============================================================
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.items = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the item stored under `key`, or ``None`` if there is none.
+        """
+        with self.lock:
+            value = self.items.pop(key, None)
+            if value is not None:
+                self.items[key] = value
+                self.hits += 1
+            else:
+                self.misses += 1
+            return value
+
+    def set(self, key, value):
+        """
+        Store `value` under `key`, forgetting the least recently used item if
+        the cache is full.
+        """
+        if self.size <= 0:
+            return
+        with self.lock:
+            self.items.pop(key, None)
+            self.items[key] = value
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+
+    def clear(self):
+        """
+        Forget all the items in the cache.
+        """
+        with self.lock:
+            self.items.clear()
+
+    def getStats(self):
+        """
+        Return a dictionary of the size of the cache, the number of items in
+        it, and the number and rate of the lookups that found an item.
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': self.size,
+                'items': len(self.items),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': float(self.hits) / lookups if lookups else None,
+            }
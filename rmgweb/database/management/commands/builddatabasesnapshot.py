@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+Build the snapshot of the fully loaded RMG database, so that website worker
+processes can start without parsing the database files. Run this as part of
+deploying a new version of RMG-database::
+
+    python manage.py builddatabasesnapshot
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rmgweb.database import snapshot
+from rmgweb.database.tools import loadDatabase, loadLazyParts
+
+class Command(BaseCommand):
+
+    help = 'Load the complete RMG database and save a snapshot of it for fast worker startup.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', dest='force', default=False,
+                            help='Parse the database and rebuild the snapshot even if it is up to date.')
+
+    def handle(self, *args, **options):
+        path = snapshot.getSnapshotPath()
+        if not path:
+            raise CommandError('Database snapshots are disabled (DATABASE_SNAPSHOT_PATH is None).')
+
+        # Compute the key before loading, so that any edit made while we are
+        # loading invalidates the new snapshot rather than being missed
+        key = snapshot.getDatabaseKey()
+        if snapshot.getSnapshotKey(path) == key:
+            if not options['force']:
+                self.stdout.write('Database snapshot {0} is already up to date.'.format(path))
+                return
+            snapshot.removeSnapshot(path)
+
+        t0 = time.time()
+        database = loadDatabase()
+        loadLazyParts(database)
+        self.stdout.write('Loaded the RMG database in {0:.1f} s.'.format(time.time() - t0))
+
+        t0 = time.time()
+        snapshot.saveSnapshot(database, key, path)
+        self.stdout.write('Saved database snapshot {0} in {1:.1f} s.'.format(path, time.time() - t0))
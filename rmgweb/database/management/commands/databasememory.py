@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+"""
+Report how much memory each part of the loaded RMG database takes up::
+
+    python manage.py databasememory [--all] [--top N]
+
+By default only what a fresh worker loads is measured; use ``--all`` to also
+load (and measure) every library and family that is loaded on first access.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from rmgweb.database.memory import getDatabaseMemory
+from rmgweb.database.tools import loadDatabase, loadLazyParts
+
+class Command(BaseCommand):
+
+    help = 'Report the number of objects and memory used by each part of the loaded RMG database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', dest='all', default=False,
+                            help='Load every library and family before measuring.')
+        parser.add_argument('--top', type=int, dest='top', default=0,
+                            help='Only list the N largest parts (default: all of them).')
+
+    def handle(self, *args, **options):
+        database = loadDatabase()
+        if options['all']:
+            loadLazyParts(database)
+
+        t0 = time.time()
+        results = getDatabaseMemory(database)
+        loaded = [result for result in results if result[3] is not None]
+        loaded.sort(key=lambda result: -result[3])
+        if options['top']:
+            loaded = loaded[:options['top']]
+
+        self.stdout.write('{0:<60} {1:>9} {2:>11} {3:>10}'.format('part', 'entries', 'objects', 'size (MB)'))
+        for name, entries, count, size in loaded:
+            self.stdout.write('{0:<60} {1:>9} {2:11d} {3:10.2f}'.format(name, '' if entries is None else entries, count, size / 1048576.))
+
+        # Totals for each component, e.g. thermo/libraries
+        totals = {}
+        for name, entries, count, size in results:
+            if size is None:
+                continue
+            component = '/'.join(name.split('/')[:2])
+            totalCount, totalSize = totals.get(component, (0, 0))
+            totals[component] = (totalCount + count, totalSize + size)
+        self.stdout.write('')
+        for component in sorted(totals):
+            count, size = totals[component]
+            self.stdout.write('{0:<60} {1:>9} {2:11d} {3:10.2f}'.format(component, '', count, size / 1048576.))
+        self.stdout.write('{0:<60} {1:>9} {2:11d} {3:10.2f}'.format('total', '', sum([t[0] for t in totals.values()]), sum([t[1] for t in totals.values()]) / 1048576.))
+        unloaded = [name for name, entries, count, size in results if size is None]
+        if unloaded:
+            self.stdout.write('{0:d} libraries and families are not loaded yet (use --all to include them).'.format(len(unloaded)))
+        self.stdout.write('Measured in {0:.1f} s.'.format(time.time() - t0))
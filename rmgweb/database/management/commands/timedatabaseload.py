@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+"""
+Time loading the whole RMG database from its files, serially and in parallel
+across a pool of worker processes::
+
+    python manage.py timedatabaseload --processes 16
+
+Each load runs in a fresh child process, so neither benefits from the other.
+"""
+
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rmgweb.database.tools import createDatabase, loadDatabaseComponents, loadLazyParts
+
+def timeLoad(processes, queue):
+    """
+    Load the whole database with the given number of `processes` and put the
+    wall-clock time taken, or the error that stopped it, on the `queue`.
+    """
+    t0 = time.time()
+    try:
+        loadLazyParts(loadDatabaseComponents(createDatabase(), '', '', processes=processes))
+    except Exception, e:
+        queue.put('{0}: {1!s}'.format(e.__class__.__name__, e))
+        raise
+    queue.put(time.time() - t0)
+
+class Command(BaseCommand):
+
+    help = 'Time loading the complete RMG database serially and in parallel.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, dest='processes', default=multiprocessing.cpu_count(),
+                            help='The number of processes for the parallel load (default: one per CPU).')
+
+    def handle(self, *args, **options):
+        timings = []
+        for processes in [1, options['processes']]:
+            queue = multiprocessing.Queue()
+            process = multiprocessing.Process(target=timeLoad, args=(processes, queue))
+            process.start()
+            elapsed = queue.get()
+            process.join()
+            if isinstance(elapsed, str):
+                raise CommandError('Loading with {0:d} process(es) failed: {1}'.format(processes, elapsed))
+            timings.append(elapsed)
+            self.stdout.write('Loaded the RMG database with {0:d} process(es) in {1:.1f} s.'.format(processes, elapsed))
+        self.stdout.write('Speedup with {0:d} processes on {1:d} CPUs: {2:.2f}x'.format(options['processes'], multiprocessing.cpu_count(), timings[0] / timings[1]))
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+"""
+Time the kinetics searches behind the kinetics data page for a set of
+benchmark reactions, comparing the single generation pass the page now makes
+with the two it used to make (the second, restricted to one family, only to
+prefill the new-entry form), and giving how soon the streamed page would show
+its first result::
+
+    python manage.py timekineticssearch --repeat 3 "CC + [OH]" "C=C + [H]"
+
+Reactions are given as SMILES, with ``+`` between reactants and optionally
+``>>`` before the products. The results cache is bypassed throughout.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rmgpy.data.kinetics import TemplateReaction
+from rmgpy.molecule.molecule import Molecule
+
+import rmgweb.database.tools
+from rmgweb.database.tools import generateReactions, iterateReactions, loadDatabase
+
+# A few reactions of the kinds most often searched for on the site
+BENCHMARK_REACTIONS = [
+    'C + [H]',
+    'CC + [OH]',
+    'C=C + [H]',
+    'C=CC + [CH3]',
+    'CCO + [O]O',
+    'CC=O + [OH]',
+    'C[CH2] >> C=C + [H]',
+]
+
+def parseReaction(text):
+    """
+    Return the lists of reactant and product molecules (or ``None`` for the
+    products) of the reaction given in `text` as SMILES.
+    """
+    sides = text.split('>>')
+    if len(sides) > 2:
+        raise CommandError('Invalid reaction "{0}".'.format(text))
+    reactants = [Molecule().fromSMILES(smiles.strip()) for smiles in sides[0].split('+')]
+    products = None
+    if len(sides) == 2:
+        products = [Molecule().fromSMILES(smiles.strip()) for smiles in sides[1].split('+')]
+    return reactants, products
+
+def timeSearch(database, reactants, products):
+    """
+    Return the times taken by the kinetics data page's search for the given
+    `reactants` and `products`, until its first result was found (the whole
+    search if none was), and by the family-restricted search it used to
+    repeat afterwards (zero if no family matched).
+    """
+    t0 = time.time()
+    first = None
+    reactionList = []
+    for batch, rmgJavaReactionList in iterateReactions(database, reactants, products, cache=False):
+        if first is None and (batch or rmgJavaReactionList):
+            first = time.time() - t0
+        reactionList.extend(batch)
+    t1 = time.time()
+    if first is None:
+        first = t1 - t0
+    families = [reaction.family for reaction in reactionList if isinstance(reaction, TemplateReaction)]
+    if not families:
+        return t1 - t0, first, 0.0
+    generateReactions(database, reactants, products, only_families=families[-1], cache=False)
+    return t1 - t0, first, time.time() - t1
+
+class Command(BaseCommand):
+
+    help = 'Time the kinetics data page searches for a set of benchmark reactions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('reactions', nargs='*', default=BENCHMARK_REACTIONS,
+                            help='The reactions to search for, as SMILES (default: a built-in benchmark set).')
+        parser.add_argument('--repeat', type=int, dest='repeat', default=3,
+                            help='The number of times to time each search, keeping the fastest (default: 3).')
+
+    def handle(self, *args, **options):
+        loadDatabase('kinetics')
+        loadDatabase('thermo')
+        database = rmgweb.database.tools.database
+
+        totalSearch = totalRepeat = 0.0
+        for text in options['reactions']:
+            reactants, products = parseReaction(text)
+            timings = [timeSearch(database, reactants, products) for i in range(max(options['repeat'], 1))]
+            search = min([timing[0] for timing in timings])
+            first = min([timing[1] for timing in timings])
+            repeat = min([timing[2] for timing in timings])
+            totalSearch += search
+            totalRepeat += repeat
+            self.stdout.write('{0:<30} search {1:7.3f} s, first result {2:7.3f} s, repeated family search {3:7.3f} s'.format(text, search, first, repeat))
+        if totalSearch + totalRepeat > 0:
+            self.stdout.write('Total: {0:.3f} s per set of pages instead of {1:.3f} s ({2:.0%} saved).'.format(
+                totalSearch, totalSearch + totalRepeat, totalRepeat / (totalSearch + totalRepeat)))
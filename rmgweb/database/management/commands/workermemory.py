@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+Report the resident memory of the web server workers forked from a parent
+process, and how much of it is shared with the other workers::
+
+    python manage.py workermemory <parent pid>
+
+This is used to check how much memory is saved by preloading the RMG
+database in the parent process before the workers are forked.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rmgweb.database.memory import getChildProcesses, getProcessMemory
+
+class Command(BaseCommand):
+
+    help = 'Report the resident, shared and private memory of each worker forked from a parent process.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('pid', type=int, help='The process id of the parent (master) process.')
+
+    def handle(self, *args, **options):
+        pid = options['pid']
+        try:
+            parent = getProcessMemory(pid)
+        except IOError:
+            raise CommandError('Unable to read the memory usage of process {0:d}.'.format(pid))
+        workers = getChildProcesses(pid)
+        if not workers:
+            raise CommandError('Process {0:d} has no worker processes.'.format(pid))
+
+        self.stdout.write('{0:>8} {1:>12} {2:>12} {3:>12} {4:>12} {5:>12}'.format('pid', 'RSS (MB)', 'PSS (MB)', 'shared (MB)', 'private (MB)', 'saved (MB)'))
+        self.stdout.write('{0:>8} {1:12.1f} {2:12.1f} {3:12.1f} {4:12.1f} {5:>12}'.format(
+            pid, parent['rss'] / 1024., parent['pss'] / 1024., parent['shared'] / 1024., parent['private'] / 1024., '(parent)'))
+        totalSaved = 0
+        for worker in workers:
+            try:
+                memory = getProcessMemory(worker)
+            except IOError:
+                # The worker exited (e.g. it was recycled) while we were looking
+                continue
+            saved = memory['rss'] - memory['pss']
+            totalSaved += saved
+            self.stdout.write('{0:>8} {1:12.1f} {2:12.1f} {3:12.1f} {4:12.1f} {5:12.1f}'.format(
+                worker, memory['rss'] / 1024., memory['pss'] / 1024., memory['shared'] / 1024., memory['private'] / 1024., saved / 1024.))
+        self.stdout.write('Sharing saves {0:.1f} MB over {1:d} workers ({2:.1f} MB per worker).'.format(
+            totalSaved / 1024., len(workers), totalSaved / 1024. / len(workers)))
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+This module contains functions for measuring how much memory the website's
+processes use, and in particular how much of it is shared between worker
+processes that were forked from a parent holding the preloaded database,
+and how much of it each part of the loaded RMG database takes up.
+"""
+
+import gc
+import os
+import sys
+import types
+
+from rmgweb.database.lazy import LazyDict, LazyEntry
+
+################################################################################
+
+def getProcessMemory(pid):
+    """
+    Return a dictionary of the memory used by the process `pid`, in kB, as
+    summed over its mappings in ``/proc/<pid>/smaps`` (Linux only). The keys
+    are ``'rss'``, ``'pss'``, ``'shared'`` and ``'private'``. The proportional
+    set size (PSS) divides each shared page between the processes using it,
+    so ``rss - pss`` is the memory a worker saves by sharing pages.
+    """
+    totals = {'Rss': 0, 'Pss': 0, 'Shared_Clean': 0, 'Shared_Dirty': 0, 'Private_Clean': 0, 'Private_Dirty': 0}
+    with open('/proc/{0:d}/smaps'.format(pid)) as f:
+        for line in f:
+            field = line.split(':', 1)[0]
+            if field in totals:
+                totals[field] += int(line.split()[1])
+    return {
+        'rss': totals['Rss'],
+        'pss': totals['Pss'],
+        'shared': totals['Shared_Clean'] + totals['Shared_Dirty'],
+        'private': totals['Private_Clean'] + totals['Private_Dirty'],
+    }
+
+def getChildProcesses(pid):
+    """
+    Return a sorted list of the ids of the processes whose parent is `pid`.
+    """
+    children = []
+    for name in os.listdir('/proc'):
+        if not name.isdigit():
+            continue
+        try:
+            with open('/proc/{0}/stat'.format(name)) as f:
+                stat = f.read()
+        except IOError:
+            # The process exited while we were looking
+            continue
+        # The command name is in parentheses and may contain spaces, so split after it
+        ppid = int(stat.rsplit(')', 1)[1].split()[1])
+        if ppid == pid:
+            children.append(int(name))
+    children.sort()
+    return children
+
+################################################################################
+
+# Objects of these types are shared by the whole program rather than owned by
+# any part of the database, so are neither counted nor traversed
+_sharedTypes = (type, types.ClassType, types.ModuleType, types.FunctionType,
+                types.BuiltinFunctionType, types.MethodType, LazyEntry)
+
+def getDeepSize(obj, seen):
+    """
+    Return the number of objects reachable from `obj` and their total size in
+    bytes, skipping those whose ids are in the set `seen` and adding the rest
+    to it. Passing the same `seen` set when measuring several objects counts
+    any shared objects only once, against whichever was measured first.
+    """
+    count = 0
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _sharedTypes):
+            continue
+        seen.add(id(obj))
+        count += 1
+        size += sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+    return count, size
+
+def getDatabaseParts(database):
+    """
+    Return a list of (name, object) pairs for each part of the loaded RMG
+    `database` whose memory should be reported, in the order they should be
+    measured. Libraries and families that have not been loaded yet are
+    given as ``None``.
+    """
+    def getItems(container):
+        items = []
+        for label in sorted(container.keys()):
+            if isinstance(container, LazyDict) and not container.isLoaded(label):
+                items.append((label, None))
+            else:
+                items.append((label, container[label]))
+        return items
+
+    parts = []
+    for label, depository in getItems(database.thermo.depository):
+        parts.append(('thermo/depository/{0}'.format(label), depository))
+    for label, library in getItems(database.thermo.libraries):
+        parts.append(('thermo/libraries/{0}'.format(label), library))
+    for label, groups in getItems(database.thermo.groups):
+        parts.append(('thermo/groups/{0}'.format(label), groups))
+    for label, library in getItems(database.transport.libraries):
+        parts.append(('transport/libraries/{0}'.format(label), library))
+    for label, groups in getItems(database.transport.groups):
+        parts.append(('transport/groups/{0}'.format(label), groups))
+    parts.append(('solvation', database.solvation))
+    parts.append(('statmech', database.statmech))
+    for label, library in getItems(database.kinetics.libraries):
+        parts.append(('kinetics/libraries/{0}'.format(label), library))
+    for label, family in getItems(database.kinetics.families):
+        if family is None:
+            parts.append(('kinetics/families/{0}'.format(label), None))
+            continue
+        parts.append(('kinetics/families/{0}/groups'.format(label), family.groups))
+        parts.append(('kinetics/families/{0}/rules'.format(label), family.rules))
+        for depository in family.depositories:
+            parts.append(('kinetics/families/{0}'.format(depository.label), depository))
+        untrained = getattr(family, 'untrainedDepository', None)
+        if untrained is not None:
+            parts.append(('kinetics/families/{0}'.format(untrained.label), untrained))
+        # Whatever else the family holds, such as its templates and forbidden structures
+        parts.append(('kinetics/families/{0}'.format(label), family))
+    return parts
+
+def getDatabaseMemory(database):
+    """
+    Return a list of (name, entries, objects, bytes) tuples giving the number
+    of entries, the number of Python objects and their total size for each
+    part of the loaded RMG `database`, as listed by :func:`getDatabaseParts`.
+    Parts that have not been loaded have ``None`` for each number. Objects
+    shared between parts are counted against the first part only.
+    """
+    seen = set()
+    results = []
+    for name, part in getDatabaseParts(database):
+        if part is None:
+            results.append((name, None, None, None))
+            continue
+        entries = len(part.entries) if hasattr(part, 'entries') else None
+        count, size = getDeepSize(part, seen)
+        results.append((name, entries, count, size))
+    return results
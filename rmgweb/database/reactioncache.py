@@ -0,0 +1,320 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+This module caches the reactions generated for a kinetics search, which are
+keyed by the canonical keys of the reactants and products searched for, the
+families the search was restricted to, and the generation of the kinetics and
+thermo databases the reactions were generated from. As tautomers share
+canonical keys, the reactants and products searched for are cached too, and
+a result is only used if they are isomorphic to those of the search.
+
+A new generation is started every time the kinetics or thermo database is
+reloaded, so results from older versions of the database are never used. The
+most recently used results are kept in memory in each process, and may also
+be kept on disk to be shared between processes; results on disk are keyed by
+the contents of the database files rather than by the generation, which is
+only meaningful within one process.
+"""
+
+import copy
+import cPickle
+import hashlib
+import os
+import sys
+import threading
+import time
+import uuid
+import zlib
+
+import rmgweb.settings
+from rmgweb.database.canonical import isSameSpeciesList
+from rmgweb.database.entryindex import getEntryIndex
+from rmgweb.database.lru import LRUCache
+from rmgweb.database.reactionindex import getSideKey
+from rmgweb.database.rulecache import getTreeHash
+
+# Increment this whenever the way reactions are cached changes
+CACHE_FORMAT_VERSION = 3
+
+# The results cached in memory in this process
+_cache = LRUCache(rmgweb.settings.DATABASE_REACTIONS_CACHE_SIZE)
+
+################################################################################
+
+def getReactionsCachePath():
+    """
+    Return the path of the directory holding the reactions cached on disk, or
+    ``None`` if the on-disk cache has been disabled in the settings.
+    """
+    return rmgweb.settings.DATABASE_REACTIONS_CACHE_PATH
+
+def getContentKey(directories):
+    """
+    Return a key made from the contents of the given database `directories`,
+    for keying the results cached on disk, or ``None`` if the on-disk cache is
+    disabled.
+    """
+    if not getReactionsCachePath():
+        return None
+    sha = hashlib.sha1()
+    for dirpath in directories:
+        sha.update(dirpath)
+        sha.update('\0')
+        sha.update(getTreeHash(dirpath))
+    return sha.hexdigest()
+
+def newGeneration(contentKey=None):
+    """
+    Return a new generation of the kinetics and thermo databases, to be stored
+    as the ``reactionsGeneration`` of a database when either is (re)loaded.
+    The `contentKey` of the files they were loaded from, if given, is used to
+    share results on disk.
+    """
+    return (uuid.uuid4().hex, contentKey)
+
+def getReactionsKey(reactants, products=None, only_families=None):
+    """
+    Return the key under which the reactions generated for the given
+    `reactants`, `products` and `only_families` are cached.
+    """
+    if isinstance(only_families, (list, tuple)):
+        only_families = tuple(sorted(only_families))
+    return (getSideKey(reactants), getSideKey(products) if products else None, only_families)
+
+def copyReaction(reaction):
+    """
+    Return a copy of `reaction` with copies of its species, which are changed
+    as it is displayed (their resonance isomers and thermo data are
+    generated), so that no two requests share them. The library or depository
+    and entry the reaction came from are shared, not copied.
+    """
+    reaction = copy.copy(reaction)
+    # A shared memo, so the species pairs refer to the copied species
+    memo = {}
+    reaction.reactants = copy.deepcopy(reaction.reactants, memo)
+    reaction.products = copy.deepcopy(reaction.products, memo)
+    if getattr(reaction, 'pairs', None) is not None:
+        reaction.pairs = copy.deepcopy(reaction.pairs, memo)
+    return reaction
+
+def copyReactions(result):
+    """
+    Return a copy of the (reactionList, rmgJavaReactionList, familyReactions)
+    `result` of a kinetics search, in which the reactions and their species
+    may be changed without changing the cached ones.
+    """
+    reactionList, rmgJavaReactionList, familyReactions = result
+    return ([copyReaction(reaction) for reaction in reactionList],
+            [copyReaction(reaction) for reaction in rmgJavaReactionList],
+            dict([(family, copyReaction(reaction)) for family, reaction in familyReactions.iteritems()]))
+
+def isSameSearch(cached, reactants, products):
+    """
+    Return ``True`` if the `reactants` and `products` of a search are the same
+    as those of the `cached` (reactants, products, result) tuple.
+    """
+    cachedReactants, cachedProducts, result = cached
+    if not isSameSpeciesList(cachedReactants, reactants):
+        return False
+    if not products or not cachedProducts:
+        return not products and not cachedProducts
+    return isSameSpeciesList(cachedProducts, products)
+
+def getCachedReactions(database, key, reactants, products=None):
+    """
+    Return a copy of the (reactionList, rmgJavaReactionList, familyReactions)
+    result cached under `key` for the current generation of `database`, or ``None`` if
+    there is none or it was found for different (tautomeric) `reactants` or
+    `products`.
+    """
+    generation = getattr(database, 'reactionsGeneration', None)
+    if generation is None:
+        return None
+    generationNumber, contentKey = generation
+    cached = _cache.get((generationNumber,) + key)
+    if cached is None and contentKey:
+        cached = loadReactions(database, contentKey, key)
+        if cached is not None:
+            _cache.set((generationNumber,) + key, cached)
+    if cached is None or not isSameSearch(cached, reactants, products):
+        return None
+    return copyReactions(cached[2])
+
+def cacheReactions(database, key, result, reactants, products=None):
+    """
+    Cache the (reactionList, rmgJavaReactionList, familyReactions) `result`
+    of a kinetics search for the given `reactants` and `products` under `key`
+    for the current generation of `database`.
+    """
+    generation = getattr(database, 'reactionsGeneration', None)
+    if generation is None:
+        return
+    generationNumber, contentKey = generation
+    cached = ([molecule.copy(deep=True) for molecule in reactants],
+              [molecule.copy(deep=True) for molecule in products] if products else None,
+              copyReactions(result))
+    _cache.set((generationNumber,) + key, cached)
+    if contentKey:
+        saveReactions(contentKey, key, cached)
+
+def clearReactionsCache():
+    """
+    Forget all the results cached in memory in this process.
+    """
+    _cache.clear()
+
+def getReactionsCacheStats():
+    """
+    Return a dictionary of the statistics of the results cached in memory in
+    this process.
+    """
+    return _cache.getStats()
+
+################################################################################
+
+# Reactions from libraries and depositories refer to the library or
+# depository and entry they came from, which are replaced by their labels and
+# index numbers on disk, and looked up again in the database when loaded.
+
+def packReactions(reactionList):
+    """
+    Return a copy of `reactionList` fit for saving to disk, and a list of
+    (position, attribute, label, index) tuples giving the library or
+    depository (and entry) each reaction came from.
+    """
+    packedList = []
+    references = []
+    for position, reaction in enumerate(reactionList):
+        reaction = copy.copy(reaction)
+        for attribute in ['library', 'depository']:
+            db = getattr(reaction, attribute, None)
+            if db is not None and not isinstance(db, str):
+                entry = getattr(reaction, 'entry', None)
+                references.append((position, attribute, db.label, entry.index if entry is not None else None))
+                setattr(reaction, attribute, None)
+                reaction.entry = None
+        packedList.append(reaction)
+    return packedList, references
+
+def unpackReactions(database, packedList, references):
+    """
+    Restore the libraries or depositories (and entries) of the reactions in
+    `packedList` from the list of `references`, by looking them up in
+    `database`. Returns ``None`` if any of them cannot be found.
+    """
+    for position, attribute, label, index in references:
+        if attribute == 'library':
+            db = database.kinetics.libraries.get(label)
+        else:
+            family = database.kinetics.families.get(label.split('/')[0])
+            db = None
+            if family is not None:
+                depositories = family.depositories + [getattr(family, 'untrainedDepository', None)]
+                db = ([d for d in depositories if d is not None and d.label == label] or [None])[0]
+        if db is None:
+            return None
+        entry = None
+        if index is not None:
+            entry = getEntryIndex(db).get(index)
+            if entry is None:
+                return None
+        setattr(packedList[position], attribute, db)
+        packedList[position].entry = entry
+    return packedList
+
+def getReactionsPath(contentKey, key):
+    """
+    Return the path of the file in which the result for `key` is cached on
+    disk for the database files with the given `contentKey`.
+    """
+    name = hashlib.sha1(repr((CACHE_FORMAT_VERSION, key))).hexdigest()
+    return os.path.join(getReactionsCachePath(), contentKey, name + '.pkl')
+
+def loadReactions(database, contentKey, key):
+    """
+    Return the (reactants, products, (reactionList, rmgJavaReactionList,
+    familyReactions)) tuple cached on disk under `key` for the database files with the given `contentKey`, with its
+    libraries and depositories looked up in `database`, or ``None`` if it is
+    not cached.
+    """
+    path = getReactionsPath(contentKey, key)
+    if not os.path.isfile(path):
+        return None
+
+    recursionLimit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(recursionLimit, 10000))
+    try:
+        with open(path, 'rb') as f:
+            header = cPickle.load(f)
+            if header.get('key') != key:
+                return None
+            reactants, products, packedList, references, rmgJavaReactionList, familyReactions = cPickle.loads(zlib.decompress(f.read()))
+    except Exception, e:
+        print >> sys.stderr, "Unable to load cached reactions {0}: {1!s}".format(path, e)
+        return None
+    finally:
+        sys.setrecursionlimit(recursionLimit)
+    reactionList = unpackReactions(database, packedList, references)
+    if reactionList is None:
+        return None
+    return reactants, products, (reactionList, rmgJavaReactionList, familyReactions)
+
+def saveReactions(contentKey, key, cached):
+    """
+    Save the (reactants, products, (reactionList, rmgJavaReactionList,
+    familyReactions)) tuple `cached` to
+    disk under `key` for the database files with the given `contentKey`. Failures are reported
+    but not raised, as the cache is only an optimization.
+    """
+    path = getReactionsPath(contentKey, key)
+    temporaryPath = '{0}.{1:d}.{2:d}.tmp'.format(path, os.getpid(), threading.current_thread().ident)
+    reactants, products, (reactionList, rmgJavaReactionList, familyReactions) = cached
+    packedList, references = packReactions(reactionList)
+
+    recursionLimit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(recursionLimit, 10000))
+    try:
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        data = zlib.compress(cPickle.dumps((reactants, products, packedList, references, rmgJavaReactionList, familyReactions), cPickle.HIGHEST_PROTOCOL), 1)
+        with open(temporaryPath, 'wb') as f:
+            cPickle.dump({'key': key, 'created': time.time()}, f, cPickle.HIGHEST_PROTOCOL)
+            f.write(data)
+        os.chmod(temporaryPath, 0664)
+        os.rename(temporaryPath, path)
+    except Exception, e:
+        print >> sys.stderr, "Unable to cache reactions {0}: {1!s}".format(path, e)
+    finally:
+        sys.setrecursionlimit(recursionLimit)
+        if os.path.exists(temporaryPath):
+            os.remove(temporaryPath)
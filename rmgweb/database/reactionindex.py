@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+This module indexes the entries of the kinetics libraries and depositories by
+the canonical keys of their reactants and products, so that the entries that
+might match a reaction being searched for are found by a dictionary lookup,
+and only those few need to be checked for isomorphism.
+"""
+
+from rmgweb.database.canonical import getSpeciesKey
+
+################################################################################
+
+def getSideKey(species):
+    """
+    Return the key of one side of a reaction, made of the sorted canonical
+    keys of the given list of `species` (or molecules).
+    """
+    return tuple(sorted([getSpeciesKey(spec) for spec in species]))
+
+class ReactionIndex(object):
+    """
+    An index of the entries of a kinetics library or depository by the
+    canonical keys of their reactants and of their products. The attributes
+    are:
+    
+    =============== ============================================================
+    Attribute       Description
+    =============== ============================================================
+    `sides`         A dictionary of lists of (label, entry, other side key) tuples by the key of either side of their reaction
+    `size`          The number of items in the database's ``entries`` when indexed
+    =============== ============================================================
+    
+    Each entry is listed under the keys of both its reactants and its
+    products, so it is found whichever direction it is searched in, together
+    with its label in the database's ``entries`` and the key of the other side
+    of its reaction.
+    """
+
+    def __init__(self, database):
+        self.sides = {}
+        for label, entry in database.entries.iteritems():
+            reactantsKey = getSideKey(entry.item.reactants)
+            productsKey = getSideKey(entry.item.products)
+            self.sides.setdefault(reactantsKey, []).append((label, entry, productsKey))
+            if productsKey != reactantsKey:
+                self.sides.setdefault(productsKey, []).append((label, entry, reactantsKey))
+        self.size = len(database.entries)
+
+    def find(self, reactants, products=None):
+        """
+        Return a list of (label, entry) pairs for the entries whose reaction
+        has the given `reactants` on one side and, if given, the `products` on
+        the other. These are only candidates, as different structures may
+        share a key, and should be checked for isomorphism before use.
+        """
+        candidates = self.sides.get(getSideKey(reactants), [])
+        if products:
+            productsKey = getSideKey(products)
+            candidates = [candidate for candidate in candidates if candidate[2] == productsKey]
+        return [(label, entry) for label, entry, otherKey in candidates]
+
+def indexReactions(database):
+    """
+    Build the reaction index of the entries of `database`, a kinetics library
+    or depository, and store it on the database.
+    """
+    database.reactionIndex = ReactionIndex(database)
+    return database
+
+def getReactionIndex(database):
+    """
+    Return the reaction index of the entries of `database`, which is normally
+    built as the database is loaded, but is (re)built here if missing or out
+    of date.
+    """
+    reactionIndex = getattr(database, 'reactionIndex', None)
+    if reactionIndex is None or reactionIndex.size != len(database.entries):
+        reactionIndex = indexReactions(database).reactionIndex
+    return reactionIndex
+
+def getCandidateDatabase(database, reactants, products=None):
+    """
+    Return a copy of the kinetics library or depository `database` holding
+    only those of its entries that might match a reaction between the given
+    `reactants` and `products`, for passing to the RMG-Py searches in place of
+    the whole database.
+    """
+    candidates = database.__class__(label=database.label, name=database.name)
+    for label, entry in getReactionIndex(database).find(reactants, products):
+        candidates.entries[label] = entry
+    return candidates
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+This module fits the reverse rate coefficients of reactions, as
+:meth:`Reaction.generateReverseRateCoefficient` does, but for many reactions
+at once. The free energy of each distinct species and the forward rate
+coefficient of each reaction are evaluated on a shared grid of temperatures
+as NumPy arrays, and the Arrhenius expressions of all the reactions are then
+fitted in one least-squares solve.
+
+Each fit is cached by the reaction, its forward kinetics and the version of
+the thermo data used, so the reverse kinetics are not refitted every time a
+page showing them is viewed. Tautomers share canonical keys, so the species
+of a reaction are checked for isomorphism before a fit cached for the same
+key, or the free energy of a species sharing its key, is used.
+"""
+
+import copy
+
+import numpy
+
+import rmgpy.constants as constants
+from rmgpy.kinetics import Arrhenius
+from rmgpy.kinetics.model import getRateCoefficientUnitsFromReactionOrder
+from rmgpy.species import Species
+
+import rmgweb.settings
+from rmgweb.database.canonical import SpeciesDict, getSpeciesKey, isSameSpeciesList
+from rmgweb.database.lru import LRUCache
+
+################################################################################
+
+# The temperatures at which the reverse rate coefficients are fitted, the same
+# 29 points from 2000 K to 294 K that RMG-Py uses
+REVERSE_FIT_TEMPERATURES = 1.0 / numpy.arange(0.0005, 0.0034, 0.0001)
+
+# The reference pressure of the equilibrium constants
+REFERENCE_PRESSURE = 1e5
+
+# The fits cached in this process
+_cache = LRUCache(rmgweb.settings.DATABASE_REVERSE_RATES_CACHE_SIZE)
+
+def getSpeciesFitKey(species):
+    """
+    Return the key identifying `species` among the reactions fitted, which
+    is its canonical key if it has a structure, or else its label.
+    """
+    if species.molecule:
+        return getSpeciesKey(species)
+    return species.label
+
+def getKineticsFitKey(kinetics):
+    """
+    Return a key identifying the forward `kinetics` of a reaction.
+    """
+    if isinstance(kinetics, Arrhenius):
+        return ('Arrhenius', kinetics.A.value_si, kinetics.n.value_si, kinetics.Ea.value_si, kinetics.T0.value_si)
+    return repr(kinetics)
+
+def getReverseFitKey(reaction, version):
+    """
+    Return the key under which the reverse kinetics of `reaction`, with its
+    species' thermo data at the given `version`, are cached.
+    """
+    reactants = tuple(sorted([getSpeciesFitKey(reactant) for reactant in reaction.reactants]))
+    products = tuple(sorted([getSpeciesFitKey(product) for product in reaction.products]))
+    return (version, reactants, products, getKineticsFitKey(reaction.kinetics))
+
+def isSameFitSpecies(speciesList1, speciesList2):
+    """
+    Return ``True`` if the lists `speciesList1` and `speciesList2` contain the
+    same species, those with structures being compared by isomorphism and
+    those without by label.
+    """
+    structures1 = [species for species in speciesList1 if species.molecule]
+    structures2 = [species for species in speciesList2 if species.molecule]
+    labels1 = sorted([species.label for species in speciesList1 if not species.molecule])
+    labels2 = sorted([species.label for species in speciesList2 if not species.molecule])
+    return labels1 == labels2 and isSameSpeciesList(structures1, structures2)
+
+def getReactionFreeEnergies(reactions, Tlist):
+    """
+    Return a list of the Gibbs free energies of reaction in J/mol of each of
+    `reactions`, as arrays evaluated at each temperature in `Tlist`. Each
+    distinct species is only evaluated once.
+    """
+    energies = SpeciesDict()
+    labelEnergies = {}
+    def getFreeEnergy(species):
+        energy = energies.get(species) if species.molecule else labelEnergies.get(species.label)
+        if energy is None:
+            energy = numpy.array([species.getFreeEnergy(T) for T in Tlist])
+            if species.molecule:
+                energies.setdefault(species, energy)
+            else:
+                labelEnergies[species.label] = energy
+        return energy
+    return [sum([getFreeEnergy(product) for product in reaction.products])
+            - sum([getFreeEnergy(reactant) for reactant in reaction.reactants])
+            for reaction in reactions]
+
+def getCachedFit(key, reaction):
+    """
+    Return the fit cached under `key` for `reaction`, or ``None`` if there is
+    none. Each key holds a list of (reactants, products, fit) tuples.
+    """
+    for reactants, products, fit in _cache.get(key) or []:
+        if isSameFitSpecies(reactants, reaction.reactants) and isSameFitSpecies(products, reaction.products):
+            return fit
+    return None
+
+def cacheFit(key, reaction, fit):
+    """
+    Cache the `fit` for `reaction` under `key`.
+    """
+    bucket = [(reactants, products, cached) for reactants, products, cached in _cache.get(key) or []
+              if not (isSameFitSpecies(reactants, reaction.reactants) and isSameFitSpecies(products, reaction.products))]
+    # Keep just the structures and labels of the species, not their thermo
+    def strip(species):
+        return Species(label=species.label, molecule=list(species.molecule))
+    bucket.append(([strip(reactant) for reactant in reaction.reactants], [strip(product) for product in reaction.products], fit))
+    _cache.set(key, bucket)
+
+def fitReverseArrhenius(reactions, Tlist=REVERSE_FIT_TEMPERATURES):
+    """
+    Return a list of the reverse Arrhenius kinetics of `reactions`, whose
+    forward kinetics are all :class:`Arrhenius`, fitted to the reverse rate
+    coefficients k(T) / Kc(T) at the temperatures in `Tlist`. The reactions
+    with the same T0 share one least-squares solve.
+    """
+    energies = getReactionFreeEnergies(reactions, Tlist)
+    R = constants.R
+    C0 = REFERENCE_PRESSURE / (R * Tlist)
+    logkr = numpy.zeros((len(Tlist), len(reactions)), numpy.float64)
+    for j, reaction in enumerate(reactions):
+        kf = reaction.kinetics
+        dGrxn = energies[j]
+        # ln Kc = -dGrxn / RT + (change in moles) ln C0
+        logKc = -dGrxn / (R * Tlist) + (len(reaction.products) - len(reaction.reactants)) * numpy.log(C0)
+        logkf = (numpy.log(kf.A.value_si) + kf.n.value_si * numpy.log(Tlist / kf.T0.value_si)
+                 - kf.Ea.value_si / (R * Tlist))
+        logkr[:,j] = logkf - logKc
+    
+    results = [None] * len(reactions)
+    groups = {}
+    for j, reaction in enumerate(reactions):
+        groups.setdefault(reaction.kinetics.T0.value_si, []).append(j)
+    for T0, indices in groups.iteritems():
+        # ln kr = ln A + n ln(T/T0) - Ea / RT
+        A = numpy.zeros((len(Tlist), 3), numpy.float64)
+        A[:,0] = 1.0
+        A[:,1] = numpy.log(Tlist / T0)
+        A[:,2] = -1.0 / (R * Tlist)
+        x = numpy.linalg.lstsq(A, logkr[:,indices])[0]
+        for column, j in enumerate(indices):
+            kunits = getRateCoefficientUnitsFromReactionOrder(len(reactions[j].products))
+            results[j] = Arrhenius(
+                A = (numpy.exp(x[0,column]), kunits),
+                n = x[1,column],
+                Ea = (x[2,column] * 0.001, 'kJ/mol'),
+                T0 = (T0, 'K'),
+                Tmin = (numpy.min(Tlist), 'K'),
+                Tmax = (numpy.max(Tlist), 'K'),
+                comment = 'Fitted to {0:d} data points'.format(len(Tlist)),
+            )
+    return results
+
+def generateReverseRateCoefficients(reactions, version=None):
+    """
+    Return a list of the reverse kinetics of each of `reactions`, whose
+    species must have thermo data. The reverses of Arrhenius kinetics are
+    fitted together by :func:`fitReverseArrhenius`, and those of any other
+    kinetics by :meth:`Reaction.generateReverseRateCoefficient`.
+    
+    If the `version` of the thermo data is given, the fits are cached under
+    it, so it must change whenever the thermo data of the species might.
+    """
+    keys = [getReverseFitKey(reaction, version) if version is not None else None for reaction in reactions]
+    results = [None] * len(reactions)
+    toFit = []
+    for j, reaction in enumerate(reactions):
+        cached = getCachedFit(keys[j], reaction) if keys[j] is not None else None
+        if cached is not None:
+            results[j] = copy.deepcopy(cached)
+        elif isinstance(reaction.kinetics, Arrhenius) and reaction.kinetics.A.value_si > 0:
+            toFit.append(j)
+        else:
+            results[j] = reaction.generateReverseRateCoefficient()
+            if keys[j] is not None:
+                cacheFit(keys[j], reaction, copy.deepcopy(results[j]))
+    if toFit:
+        fits = fitReverseArrhenius([reactions[j] for j in toFit])
+        for j, kinetics in zip(toFit, fits):
+            results[j] = kinetics
+            if keys[j] is not None:
+                cacheFit(keys[j], reactions[j], copy.deepcopy(kinetics))
+    return results
+
+def clearReverseRatesCache():
+    """
+    Forget all the fits cached in this process.
+    """
+    _cache.clear()
+
+def getReverseRatesCacheStats():
+    """
+    Return a dictionary of the statistics of the fits cached in this process.
+    """
+    return _cache.getStats()
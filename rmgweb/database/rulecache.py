@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+This module caches the kinetics families after their rate rules have been
+derived from the training set and filled in by averaging, which is one of the
+slowest steps in loading the RMG database.
+
+Each family is cached in its own file, with a key made from the contents of
+the family's directory (groups, rules and training set), the contents of the
+thermo database used to train it, and the RMG-Py version. A cached family is
+only used if its key matches the files currently on disk.
+"""
+
+import cPickle
+import hashlib
+import os
+import sys
+import time
+import zlib
+
+import rmgpy
+import rmgweb.settings
+from rmgweb.database.watcher import isIgnored
+
+# Increment this whenever the way families are trained or cached changes
+CACHE_FORMAT_VERSION = 2
+
+################################################################################
+
+# The hash of each file, with the modification time and size it was computed for
+_fileHashes = {}
+
+def getFileHash(path):
+    """
+    Return a SHA-1 hex digest of the contents of the file at `path`. Hashes
+    are remembered, and only recomputed if the file's modification time or
+    size have changed.
+    """
+    stat = os.stat(path)
+    cached = _fileHashes.get(path)
+    if cached is not None and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+        return cached[2]
+    sha = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), ''):
+            sha.update(chunk)
+    digest = sha.hexdigest()
+    _fileHashes[path] = (stat.st_mtime, stat.st_size, digest)
+    return digest
+
+def getTreeHash(path):
+    """
+    Return a SHA-1 hex digest of the relative path and contents of every file
+    in the directory tree at `path`, ignoring hidden and compiled files.
+    """
+    sha = hashlib.sha1()
+    for root, dirs, files in os.walk(path):
+        dirs[:] = sorted([d for d in dirs if not d.startswith('.')])
+        for name in sorted(files):
+            if isIgnored(name):
+                continue
+            filepath = os.path.join(root, name)
+            sha.update(os.path.relpath(filepath, path))
+            sha.update('\0')
+            sha.update(getFileHash(filepath))
+    return sha.hexdigest()
+
+def getThermoHash():
+    """
+    Return a SHA-1 hex digest of the thermo database used to train the
+    kinetics families. Compute it once for all the families being loaded,
+    and pass it to :func:`getFamilyKey`.
+    """
+    return getTreeHash(os.path.join(rmgweb.settings.DATABASE_PATH, 'thermo'))
+
+def getFamilyKey(familyPath, thermoHash=None):
+    """
+    Return the key identifying the trained kinetics family whose files are in
+    the directory at `familyPath`, which changes whenever the family's files,
+    the thermo database (whose `thermoHash` is computed if not given) or the
+    RMG-Py version change.
+    """
+    if thermoHash is None:
+        thermoHash = getThermoHash()
+    return '{0}-{1}-{2}-{3}'.format(CACHE_FORMAT_VERSION, getattr(rmgpy, '__version__', 'unknown'),
+                                    getTreeHash(familyPath), thermoHash)
+
+################################################################################
+
+def getRulesCachePath():
+    """
+    Return the path of the directory holding the cached families, or ``None``
+    if the cache has been disabled in the settings.
+    """
+    return rmgweb.settings.DATABASE_RULES_CACHE_PATH
+
+def loadTrainedFamily(label, key):
+    """
+    Return the trained kinetics family `label` from the cache if it was saved
+    with the given `key`, or ``None`` if it is not cached or is out of date.
+    """
+    directory = getRulesCachePath()
+    if not directory:
+        return None
+    path = os.path.join(directory, label + '.pkl')
+    if not os.path.isfile(path):
+        return None
+
+    recursionLimit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(recursionLimit, 10000))
+    try:
+        with open(path, 'rb') as f:
+            header = cPickle.load(f)
+            if header.get('key') != key:
+                return None
+            family = cPickle.loads(zlib.decompress(f.read()))
+    except Exception, e:
+        print >> sys.stderr, "Unable to load cached kinetics family {0}: {1!s}".format(path, e)
+        return None
+    finally:
+        sys.setrecursionlimit(recursionLimit)
+    return family
+
+def saveTrainedFamily(family, key):
+    """
+    Save the trained kinetics `family` to the cache, labelled with `key`.
+    Failures are reported but not raised, as the cache is only an optimization.
+    """
+    directory = getRulesCachePath()
+    if not directory:
+        return
+    path = os.path.join(directory, family.label + '.pkl')
+    temporaryPath = '{0}.{1:d}.tmp'.format(path, os.getpid())
+
+    recursionLimit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(recursionLimit, 10000))
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        data = zlib.compress(cPickle.dumps(family, cPickle.HIGHEST_PROTOCOL), 1)
+        with open(temporaryPath, 'wb') as f:
+            cPickle.dump({'key': key, 'created': time.time()}, f, cPickle.HIGHEST_PROTOCOL)
+            f.write(data)
+        os.chmod(temporaryPath, 0664)
+        os.rename(temporaryPath, path)
+    except Exception, e:
+        print >> sys.stderr, "Unable to cache kinetics family {0}: {1!s}".format(path, e)
+    finally:
+        sys.setrecursionlimit(recursionLimit)
+        if os.path.exists(temporaryPath):
+            os.remove(temporaryPath)
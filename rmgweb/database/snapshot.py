@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+This module contains functions for saving the fully loaded RMG database to a
+binary snapshot on disk, and for restoring it in a freshly started process.
+
+Each snapshot is stored together with a key made from the git SHA of the
+RMG-database checkout and its uncommitted changes (or, outside git, the size
+and modification time of its files), so a snapshot is only ever used for
+exactly the database files it was built from.
+"""
+
+import cPickle
+import hashlib
+import os
+import subprocess
+import sys
+import time
+
+import rmgweb.settings
+
+################################################################################
+
+def runGit(path, *args):
+    """
+    Return the output of the git command with the given `args`, run in the
+    RMG-database checkout containing `path`, or ``None`` if it is not a git
+    repository or git is unavailable.
+    """
+    try:
+        return subprocess.check_output(('git',) + args, cwd=path, stderr=subprocess.STDOUT)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def getDatabaseGitSHA(path):
+    """
+    Return the git SHA of the RMG-database checkout containing `path`, or
+    ``'unknown'`` if it is not a git repository.
+    """
+    sha = runGit(path, 'rev-parse', 'HEAD')
+    return sha.strip() if sha is not None else 'unknown'
+
+def updateFileStat(sha, filepath, name):
+    """
+    Update the SHA-1 object `sha` with the `name`, size and modification time
+    of the file at `filepath`, or with a marker if there is no such file.
+    """
+    sha.update(name)
+    sha.update('\0')
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        sha.update('missing')
+    else:
+        sha.update('{0:d} {1!r}'.format(stat.st_size, stat.st_mtime))
+    sha.update('\0')
+
+def getDirectoryManifestHash(path):
+    """
+    Return a SHA-1 hex digest of the relative path, size and modification
+    time of every file in the directory tree at `path`. Hidden files and
+    compiled Python files are ignored. The files themselves are not read.
+    """
+    sha = hashlib.sha1()
+    for root, dirs, files in os.walk(path):
+        # Walk in a deterministic order, skipping hidden directories such as .git
+        dirs[:] = sorted([d for d in dirs if not d.startswith('.')])
+        for name in sorted(files):
+            if name.startswith('.') or os.path.splitext(name)[1] in ['.pyc', '.pyo']:
+                continue
+            filepath = os.path.join(root, name)
+            updateFileStat(sha, filepath, os.path.relpath(filepath, path))
+    return sha.hexdigest()
+
+def getWorkingTreeHash(path):
+    """
+    Return a SHA-1 hex digest of the uncommitted changes to the RMG-database
+    checkout containing `path`: the output of ``git status`` and the size and
+    modification time of every file it lists. Returns ``None`` if `path` is
+    not in a git repository.
+    """
+    status = runGit(path, 'status', '--porcelain', '-z', '--untracked-files=all')
+    root = runGit(path, 'rev-parse', '--show-toplevel')
+    if status is None or root is None:
+        return None
+    root = root.strip()
+    sha = hashlib.sha1(status)
+    for token in status.split('\0'):
+        if not token:
+            continue
+        # Each entry is "XY path", followed by the original path for a rename
+        name = token[3:] if len(token) > 3 and token[2] == ' ' else token
+        updateFileStat(sha, os.path.join(root, name), name)
+    return sha.hexdigest()
+
+def getDatabaseKey(path=None):
+    """
+    Return the key identifying the RMG database files at `path` (by default
+    the configured ``DATABASE_PATH``). The key changes whenever a commit is
+    made or any file in the database is edited.
+
+    For a git checkout, the key is made from the commit and the files changed
+    since, which only git needs to look at; otherwise, from the size and
+    modification time of every file. No file is read, so that checking the
+    snapshot costs little of the time it saves.
+    """
+    if path is None:
+        path = rmgweb.settings.DATABASE_PATH
+    sha = getDatabaseGitSHA(path)
+    workingTree = getWorkingTreeHash(path) if sha != 'unknown' else None
+    if workingTree is None:
+        return '{0}-{1}'.format(sha, getDirectoryManifestHash(path))
+    return '{0}-{1}'.format(sha, workingTree)
+
+################################################################################
+
+def getSnapshotPath():
+    """
+    Return the path of the database snapshot file, or ``None`` if snapshots
+    have been disabled in the settings.
+    """
+    return rmgweb.settings.DATABASE_SNAPSHOT_PATH
+
+def getSnapshotKey(path=None):
+    """
+    Return the key stored in the snapshot at `path`, without loading the
+    database itself. Returns ``None`` if there is no readable snapshot.
+    """
+    path = path or getSnapshotPath()
+    if not path or not os.path.isfile(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            header = cPickle.load(f)
+    except Exception:
+        return None
+    return header.get('key')
+
+def saveSnapshot(database, key, path=None):
+    """
+    Save the fully loaded RMG `database` to a snapshot at `path`, labelled with
+    the given database `key`. The file is written under a temporary name and
+    then renamed, so that a worker never reads a partially written snapshot.
+    """
+    path = path or getSnapshotPath()
+    if not path:
+        raise ValueError('Database snapshots are disabled (DATABASE_SNAPSHOT_PATH is None).')
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    # Deeply nested group trees and molecular graphs can exceed the default recursion limit
+    recursionLimit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(recursionLimit, 10000))
+    temporaryPath = '{0}.{1:d}.tmp'.format(path, os.getpid())
+    try:
+        with open(temporaryPath, 'wb') as f:
+            header = {'key': key, 'created': time.time(), 'pid': os.getpid()}
+            cPickle.dump(header, f, cPickle.HIGHEST_PROTOCOL)
+            cPickle.dump(database, f, cPickle.HIGHEST_PROTOCOL)
+        os.chmod(temporaryPath, 0664)
+        os.rename(temporaryPath, path)
+    finally:
+        sys.setrecursionlimit(recursionLimit)
+        if os.path.exists(temporaryPath):
+            os.remove(temporaryPath)
+
+def loadSnapshot(key, path=None):
+    """
+    Return the RMG database stored in the snapshot at `path` if it was saved
+    with the given database `key`, or ``None`` if there is no snapshot or it
+    is out of date.
+    """
+    path = path or getSnapshotPath()
+    if not path or not os.path.isfile(path):
+        return None
+
+    recursionLimit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(recursionLimit, 10000))
+    try:
+        with open(path, 'rb') as f:
+            header = cPickle.load(f)
+            if header.get('key') != key:
+                print "Database snapshot {0} is out of date; ignoring it.".format(path)
+                return None
+            t0 = time.time()
+            database = cPickle.load(f)
+    except Exception, e:
+        print >> sys.stderr, "Unable to load database snapshot {0}: {1!s}".format(path, e)
+        return None
+    finally:
+        sys.setrecursionlimit(recursionLimit)
+    print "Loaded database snapshot {0} in {1:.1f} s in process {2}".format(path, time.time() - t0, os.getpid())
+    return database
+
+def removeSnapshot(path=None):
+    """
+    Delete the snapshot at `path`, if there is one.
+    """
+    path = path or getSnapshotPath()
+    if path and os.path.isfile(path):
+        os.remove(path)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+This module caches the solute data estimated for species, so that the
+solvation of the species of a mechanism is estimated only once for each
+species, however many solvents or uploads it is needed for.
+
+The estimates are keyed by the canonical key of the species and the
+generation of the solvation database, a new one of which is started every
+time the solvation database is reloaded. Tautomers share a canonical key, so
+each key holds a list of (molecule, estimate) pairs, and the molecule of a
+species is checked for isomorphism before its estimate is used.
+"""
+
+import uuid
+
+import rmgweb.settings
+from rmgweb.database.canonical import addToBucket, findInBucket, getSpeciesKey
+from rmgweb.database.lru import LRUCache
+
+################################################################################
+
+# The estimates cached in this process
+_cache = LRUCache(rmgweb.settings.DATABASE_SOLUTE_CACHE_SIZE)
+
+def newGeneration():
+    """
+    Return a new generation of the solvation database, to be stored as the
+    ``solvationGeneration`` of a database when its solvation data are
+    (re)loaded.
+    """
+    return uuid.uuid4().hex
+
+def getCachedSoluteData(generation, molecule):
+    """
+    Return the estimate cached for `molecule` in the given `generation` of
+    the solvation database, or ``None`` if there is none.
+    """
+    return findInBucket(_cache.get((generation, getSpeciesKey(molecule))), molecule)
+
+def cacheSoluteData(generation, molecule, estimate):
+    """
+    Cache the `estimate` for `molecule` in the given `generation` of the
+    solvation database.
+    """
+    key = (generation, getSpeciesKey(molecule))
+    _cache.set(key, addToBucket(_cache.get(key), molecule, estimate))
+
+def clearSoluteCache():
+    """
+    Forget all the estimates cached in this process.
+    """
+    _cache.clear()
+
+def getSoluteCacheStats():
+    """
+    Return a dictionary of the statistics of the estimates cached in this
+    process.
+    """
+    return _cache.getStats()
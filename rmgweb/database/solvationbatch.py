@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+This module estimates the solvation of a batch of species, such as those of a
+mechanism, in several solvents at once, for building liquid-phase models.
+
+The solute data of each distinct species are estimated once, on the worker
+pool of the database (see ``DATABASE_REACTIONS_PROCESSES``) in chunks, and
+cached (see :mod:`rmgweb.database.solutecache`), so that uploading the same
+species again for other solvents estimates nothing. The solvation of all the
+species in all the solvents is then given by one product of their descriptors
+with the solvents' parameters (see :mod:`rmgweb.database.solventscreen`).
+"""
+
+import csv
+from cStringIO import StringIO
+
+import numpy
+
+from rmgpy.species import Species
+
+from rmgweb.database.canonical import SpeciesDict
+from rmgweb.database.solutecache import cacheSoluteData, getCachedSoluteData
+from rmgweb.database.solventscreen import SOLUTE_DESCRIPTORS, getSoluteDescriptors, getSolvationMatrices, getSolventParameters, getValue
+from rmgweb.database.tools import startDatabaseTasks
+
+################################################################################
+
+# How many species to send to a worker process at a time
+SOLUTE_CHUNK_SIZE = 50
+
+def estimateSoluteChunk(database, molecules):
+    """
+    Return a list of the solute data RMG would use for each of `molecules`
+    (the first found in the solute library, or else the group estimate) from
+    `database`, each with a description of its source, or the error message
+    in place of those that fail. Run by the worker processes of the database
+    pool.
+    """
+    chunk = []
+    for molecule in molecules:
+        try:
+            species = Species(molecule=[molecule])
+            species.generateResonanceIsomers()
+            soluteData, library, entry = database.solvation.getAllSoluteData(species)[0]
+            source = 'Group additivity' if library is None else '{0} ({1})'.format(library.name, entry.label)
+            chunk.append((soluteData, source))
+        except Exception, e:
+            chunk.append('{0}: {1!s}'.format(e.__class__.__name__, e))
+    return chunk
+
+def estimateBatchSoluteData(database, molecules):
+    """
+    Return a list of the (solute data, source) pairs of each of `molecules`,
+    distinct species, with the error message in place of those that could not
+    be estimated. The species not already cached are estimated, and then
+    cached.
+    """
+    generation = getattr(database, 'solvationGeneration', None)
+    estimates = [None] * len(molecules)
+    missing = []
+    for index, molecule in enumerate(molecules):
+        if generation is not None:
+            estimates[index] = getCachedSoluteData(generation, molecule)
+        if estimates[index] is None:
+            missing.append(index)
+    
+    chunks = [missing[i:i+SOLUTE_CHUNK_SIZE] for i in range(0, len(missing), SOLUTE_CHUNK_SIZE)]
+    argsList = [([molecules[index] for index in chunk],) for chunk in chunks]
+    pending = startDatabaseTasks(database, estimateSoluteChunk, argsList)
+    for chunkIndex, chunk in enumerate(chunks):
+        if pending is None:
+            results = estimateSoluteChunk(database, *argsList[chunkIndex])
+        else:
+            results = pending[chunkIndex].get()
+        for index, estimate in zip(chunk, results):
+            estimates[index] = estimate
+            if generation is not None and not isinstance(estimate, basestring):
+                cacheSoluteData(generation, molecules[index], estimate)
+    return estimates
+
+def getBatchSolvation(database, speciesList, solvents=None):
+    """
+    Return a list of dictionaries giving the solute data estimated in
+    `database` for each of the (label, molecule) pairs in `speciesList`, in
+    order, and its solvation free energy, enthalpy and entropy (in J/mol and
+    J/mol/K) in each of `solvents`, a list of the labels of solvents in the
+    solvent library (all of them if not given), or else an ``error``. Raises
+    :class:`ValueError` if any of the solvents has no parameters in the
+    library.
+    """
+    labels, abraham, mintz = getSolventParameters(database.solvation.libraries['solvent'])
+    if solvents is None:
+        solvents = labels
+    unknown = [solvent for solvent in solvents if solvent not in labels]
+    if unknown:
+        raise ValueError('No solvent parameters for {0}.'.format(', '.join(unknown)))
+    columns = [labels.index(solvent) for solvent in solvents]
+    
+    # Estimate each distinct species once
+    molecules = []
+    moleculeIndices = SpeciesDict()
+    rows = []
+    for label, molecule in speciesList:
+        if isinstance(molecule, basestring):
+            rows.append(None)
+            continue
+        index = moleculeIndices.setdefault(molecule, len(molecules))
+        if index == len(molecules):
+            molecules.append(molecule)
+        rows.append(index)
+    estimates = estimateBatchSoluteData(database, molecules)
+    
+    # Solve every species in every solvent at once; the rows of the species
+    # that failed are left as NaN, and never read
+    solutes = numpy.empty((len(molecules), len(SOLUTE_DESCRIPTORS) + 1), numpy.float64)
+    solutes.fill(numpy.nan)
+    for index, estimate in enumerate(estimates):
+        if not isinstance(estimate, basestring):
+            solutes[index] = getSoluteDescriptors(estimate[0])
+    gibbs, enthalpy, entropy = getSolvationMatrices(solutes, abraham[columns], mintz[columns])
+    
+    results = []
+    for (label, molecule), row in zip(speciesList, rows):
+        result = {'label': label}
+        if row is None:
+            result['error'] = molecule
+        elif isinstance(estimates[row], basestring):
+            result['smiles'] = molecule.toSMILES()
+            result['error'] = estimates[row]
+        else:
+            soluteData, source = estimates[row]
+            result['smiles'] = molecule.toSMILES()
+            result['source'] = source
+            result['soluteData'] = dict([(name, getattr(soluteData, name, None)) for name in SOLUTE_DESCRIPTORS + ['V']])
+            result['solvents'] = [{'solvent': solvent, 'gibbs': getValue(G), 'enthalpy': getValue(H), 'entropy': getValue(S)}
+                                  for solvent, G, H, S in zip(solvents, gibbs[row], enthalpy[row], entropy[row])]
+        results.append(result)
+    return results
+
+def writeBatchSolvationCSV(results, solvents):
+    """
+    Return the `results` of :func:`getBatchSolvation` for the given `solvents`
+    as a CSV table, with a row per species and the solvation free energy,
+    enthalpy and entropy in each solvent in turn.
+    """
+    output = StringIO()
+    writer = csv.writer(output)
+    header = ['Species', 'SMILES', 'Source'] + SOLUTE_DESCRIPTORS + ['V']
+    for solvent in solvents:
+        header.extend(['dG {0} (J/mol)'.format(solvent), 'dH {0} (J/mol)'.format(solvent), 'dS {0} (J/mol/K)'.format(solvent)])
+    writer.writerow(header)
+    for result in results:
+        if 'error' in result:
+            writer.writerow([result['label'], result.get('smiles', ''), result['error']])
+            continue
+        row = [result['label'], result['smiles'], result['source']]
+        row.extend([result['soluteData'][name] for name in SOLUTE_DESCRIPTORS + ['V']])
+        for solvent in result['solvents']:
+            row.extend([solvent['gibbs'], solvent['enthalpy'], solvent['entropy']])
+        writer.writerow(['' if value is None else value for value in row])
+    return output.getvalue()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+This module screens a solute against every solvent in the solvation database
+at once. The Abraham (for the free energy) and Mintz (for the enthalpy)
+parameters of all the solvents are kept as NumPy arrays, so that the
+solvation corrections in all the solvents are given by a single product with
+the solute's descriptors, rather than by one call of
+:meth:`SolvationDatabase.getSolvationCorrection` per solvent. Likewise, the
+solvation of a batch of solutes in several solvents is given by a single
+matrix product (see :mod:`rmgweb.database.solvationbatch`).
+"""
+
+import weakref
+
+import numpy
+
+################################################################################
+
+# The Abraham solute descriptors, in the order the solvent parameters of the
+# same name are stored, followed by the constant term
+SOLUTE_DESCRIPTORS = ['S', 'B', 'E', 'L', 'A']
+
+# The solvent parameters for the free energy (Abraham) and enthalpy (Mintz)
+ABRAHAM_PARAMETERS = ['s_g', 'b_g', 'e_g', 'l_g', 'a_g', 'c_g']
+MINTZ_PARAMETERS = ['s_h', 'b_h', 'e_h', 'l_h', 'a_h', 'c_h']
+
+# The temperature in K at which the corrections are given
+SCREENING_TEMPERATURE = 298
+
+# The parameters of the solvents in each solvent library, kept until the
+# library is replaced by a reload of the solvation database
+_solventParameters = weakref.WeakKeyDictionary()
+
+def getSolventParameters(library):
+    """
+    Return the labels of the solvents in the solvent `library`, sorted, and
+    arrays of their Abraham and Mintz parameters, with a row per solvent and
+    NaN for the parameters a solvent does not have.
+    """
+    parameters = _solventParameters.get(library)
+    if parameters is None:
+        labels = sorted([label for label, entry in library.entries.iteritems() if entry.data is not None])
+        def getArray(names):
+            return numpy.array([[getattr(library.entries[label].data, name, None) for name in names] for label in labels],
+                               numpy.float64).reshape(len(labels), len(names))
+        parameters = labels, getArray(ABRAHAM_PARAMETERS), getArray(MINTZ_PARAMETERS)
+        _solventParameters[library] = parameters
+    return parameters
+
+def getSoluteDescriptors(soluteData):
+    """
+    Return the descriptors of the solute with the given `soluteData`, in the
+    order of the solvent parameters, followed by 1 for the constant term, with
+    NaN for those the solute does not have.
+    """
+    descriptors = [getattr(soluteData, name, None) for name in SOLUTE_DESCRIPTORS]
+    return [numpy.nan if value is None else value for value in descriptors] + [1.0]
+
+def getSolvationMatrices(solutes, abraham, mintz):
+    """
+    Return arrays of the solvation free energy, enthalpy and entropy (in J/mol
+    and J/mol/K) of each solute in each solvent, with a row per solute and a
+    column per solvent, given an array of the `solutes`' descriptors (as from
+    :func:`getSoluteDescriptors`) and arrays of the solvents' `abraham` and
+    `mintz` parameters (as from :func:`getSolventParameters`). These are the
+    values :meth:`SolvationDatabase.getSolvationCorrection` gives, and are NaN
+    where a solvent lacks the parameters.
+    """
+    with numpy.errstate(invalid='ignore'):
+        # The same constants as SolvationDatabase.calcG, calcH and calcS
+        logK = numpy.dot(solutes, abraham.T)
+        gibbs = -8.314 * SCREENING_TEMPERATURE * 2.303 * logK
+        enthalpy = -1000 * numpy.dot(solutes, mintz.T)
+        entropy = (enthalpy - gibbs) / SCREENING_TEMPERATURE
+    return gibbs, enthalpy, entropy
+
+def getValue(value):
+    """
+    Return the array element `value` as a float, or ``None`` if it is NaN.
+    """
+    return float(value) if numpy.isfinite(value) else None
+
+def screenSolvents(database, soluteData):
+    """
+    Return a list of dictionaries giving the solvation free energy, enthalpy
+    and entropy (in J/mol and J/mol/K) of the solute with the given
+    `soluteData` in each solvent of the solvation `database`. The values a
+    solvent lacks the parameters for are ``None``.
+    """
+    labels, abraham, mintz = getSolventParameters(database.libraries['solvent'])
+    solutes = numpy.array([getSoluteDescriptors(soluteData)], numpy.float64)
+    gibbs, enthalpy, entropy = getSolvationMatrices(solutes, abraham, mintz)
+    return [{'solvent': label, 'gibbs': getValue(G), 'enthalpy': getValue(H), 'entropy': getValue(S)}
+            for label, G, H, S in zip(labels, gibbs[0], enthalpy[0], entropy[0])]
@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+This module indexes the entries of the RMG database by the canonical keys of
+the molecules they contain, so that finding every thermo, transport,
+solvation, statmech or kinetics entry in which a species appears is a
+dictionary lookup rather than a scan with isomorphism checks.
+
+Each library or depository is indexed as it is loaded; the index of the whole
+database is merged from these when first needed.
+"""
+
+import weakref
+
+from rmgpy.molecule.molecule import Molecule
+from rmgpy.species import Species
+from rmgpy.reaction import Reaction
+from rmgpy.data.base import Entry
+
+from rmgweb.database.canonical import getMoleculeKey, isSameSpecies
+from rmgweb.database.entryindex import getEntryList
+from rmgweb.database.lazy import LazyDict
+
+################################################################################
+
+def getItemMolecules(item):
+    """
+    Return a list of the molecules found in the `item` of a database entry,
+    which may be a molecule, a species, a reaction or a list of these. Items
+    such as functional groups contain no molecules.
+    """
+    if isinstance(item, Entry):
+        item = item.item
+    if isinstance(item, Molecule):
+        return [item]
+    elif isinstance(item, Species):
+        return list(item.molecule)
+    elif isinstance(item, Reaction):
+        return getItemMolecules(item.reactants + item.products)
+    elif isinstance(item, (list, tuple)):
+        molecules = []
+        for subitem in item:
+            molecules.extend(getItemMolecules(subitem))
+        return molecules
+    return []
+
+class StructureIndex(object):
+    """
+    An index of the entries of a database by the canonical keys of the
+    molecules they contain. The attributes are:
+    
+    =============== ============================================================
+    Attribute       Description
+    =============== ============================================================
+    `entries`       A dictionary of lists of entries by molecule key
+    `size`          The number of items in the database's ``entries`` when indexed
+    =============== ============================================================
+    
+    An entry is listed once under each distinct key of its molecules, so a
+    species given with several resonance isomers is found by any of them.
+    """
+
+    def __init__(self, database):
+        self.entries = {}
+        keys = {}
+        for entry in getEntryList(database):
+            found = set()
+            for molecule in getItemMolecules(entry.item):
+                key = keys.get(id(molecule))
+                if key is None:
+                    key = keys[id(molecule)] = getMoleculeKey(molecule)
+                if key not in found:
+                    found.add(key)
+                    self.entries.setdefault(key, []).append(entry)
+        self.size = len(database.entries)
+
+    def get(self, key):
+        """
+        Return a list of the entries containing a molecule with the given
+        canonical `key`.
+        """
+        return self.entries.get(key, [])
+
+def indexStructures(database):
+    """
+    Build the structure index of the entries of `database` and store it on
+    the database.
+    """
+    database.structureIndex = StructureIndex(database)
+    return database
+
+def getStructureIndex(database):
+    """
+    Return the structure index of the entries of `database`, which is
+    normally built as the database is loaded, but is (re)built here if
+    missing or out of date.
+    """
+    structureIndex = getattr(database, 'structureIndex', None)
+    if structureIndex is None or structureIndex.size != len(database.entries):
+        structureIndex = indexStructures(database).structureIndex
+    return structureIndex
+
+################################################################################
+
+def getIndexedDatabases(database):
+    """
+    Return a list of (component, section, subsection, db) tuples for each
+    loaded library or depository of the RMG `database` whose entries contain
+    molecules, named as in the URLs of the database views. Group and rate rule
+    databases, which contain functional groups instead, are left out.
+    """
+    def getItems(container):
+        items = []
+        for label in sorted((container or {}).keys()):
+            if not isinstance(container, LazyDict) or container.isLoaded(label):
+                items.append((label, container[label]))
+        return items
+
+    databases = []
+    for component in ['thermo', 'transport', 'solvation', 'statmech']:
+        for section in ['depository', 'libraries']:
+            container = getattr(getattr(database, component, None), section, None)
+            for label, db in getItems(container):
+                databases.append((component, section, label, db))
+    for label, library in getItems(database.kinetics.libraries):
+        databases.append(('kinetics', 'libraries', label, library))
+    for label, family in getItems(database.kinetics.families):
+        for depository in family.depositories:
+            databases.append(('kinetics', 'families', depository.label, depository))
+        untrained = getattr(family, 'untrainedDepository', None)
+        if untrained is not None:
+            databases.append(('kinetics', 'families', untrained.label, untrained))
+    return databases
+
+class DatabaseStructureIndex(object):
+    """
+    An index of the entries of the whole RMG database by the canonical keys of
+    the molecules they contain, merged from the structure indexes of its
+    libraries and depositories. The attributes are:
+    
+    =============== ============================================================
+    Attribute       Description
+    =============== ============================================================
+    `entries`       A dictionary of lists of (component, section, subsection, entry) tuples by molecule key
+    `indexes`       The structure indexes of the libraries and depositories that were merged
+    =============== ============================================================
+    """
+
+    def __init__(self, databases):
+        self.entries = {}
+        self.indexes = []
+        for component, section, subsection, db in databases:
+            structureIndex = getStructureIndex(db)
+            self.indexes.append(structureIndex)
+            for key, entries in structureIndex.entries.iteritems():
+                self.entries.setdefault(key, []).extend([(component, section, subsection, entry) for entry in entries])
+
+    def isCurrent(self, databases):
+        """
+        Return ``True`` if the index was merged from the current structure
+        indexes of the given `databases`, or ``False`` if any has been loaded,
+        reloaded or edited since.
+        """
+        if len(databases) != len(self.indexes):
+            return False
+        for (component, section, subsection, db), structureIndex in zip(databases, self.indexes):
+            if getStructureIndex(db) is not structureIndex:
+                return False
+        return True
+
+    def get(self, key):
+        """
+        Return a list of (component, section, subsection, entry) tuples for
+        the entries containing a molecule with the given canonical `key`.
+        """
+        return self.entries.get(key, [])
+
+# The merged structure index of each RMG database object
+_databaseIndexes = weakref.WeakKeyDictionary()
+
+def getDatabaseStructureIndex(database):
+    """
+    Return the structure index of the whole RMG `database`, merging it again
+    if any of its libraries or depositories has changed since it was last
+    merged.
+    """
+    databases = getIndexedDatabases(database)
+    structureIndex = _databaseIndexes.get(database)
+    if structureIndex is None or not structureIndex.isCurrent(databases):
+        structureIndex = _databaseIndexes[database] = DatabaseStructureIndex(databases)
+    return structureIndex
+
+def findStructure(database, molecule):
+    """
+    Return a list of (component, section, subsection, entry) tuples for each
+    entry of the loaded RMG `database` that contains `molecule`, which may be
+    a :class:`Molecule` or a :class:`Species`. If the molecule is found under
+    none of its keys, the keys of its resonance isomers are tried. The entries
+    found are checked for isomorphism, as tautomers share keys.
+    """
+    if isinstance(molecule, Species):
+        molecules = list(molecule.molecule)
+    else:
+        molecules = [molecule]
+    structureIndex = getDatabaseStructureIndex(database)
+
+    def find(molecules):
+        results = []
+        found = set()
+        for key in set([getMoleculeKey(molecule) for molecule in molecules]):
+            for result in structureIndex.get(key):
+                if id(result[3]) not in found:
+                    found.add(id(result[3]))
+                    if isSameSpecies(getItemMolecules(result[3].item), molecules):
+                        results.append(result)
+        return results
+
+    results = find(molecules)
+    if not results:
+        results = find([isomer for molecule in molecules for isomer in molecule.generateResonanceIsomers()])
+    return results
@@ -0,0 +1,79 @@
+{% load render_kinetics %}
+function getVisible(chart) {
+    // Returns an array of true/false values corresponding to vilibility of each series in the chart.
+    var visible = [chart.series.length];
+    for (var i = 0; i < chart.series.length; i++)
+        visible[i] = chart.series[i].visible;
+    return visible;
+};
+
+function calculateAverage() {
+    // Calculates the average of the visible rates on the chart. 
+    visible = getVisible(kchart);
+    AAverage = 0.0;
+    nAverage = 0.0;
+    EaAverage = 0.0;
+    count = 0;
+    var highChartsSeriesIndex = 0
+    refList = '';
+    {% for reactants, arrow, products, entry, kinetics, source, href, forward in kineticsDataList %}
+    {% if kinetics %}
+    if (visible[highChartsSeriesIndex]) {
+        {{ kinetics|get_rate_coefficients:"A_n_Ea" }} {# returns A=, n=, Ea=, Aunits=, Eunits=, and Pnote= #}
+        AAverage += Math.log(A);
+        nAverage += n;
+        EaAverage += Ea;
+        count += 1;
+        {% if entry.reference %}refList += count + '. {{ entry.reference.authors.0 }}, {{ entry.reference.year }}{% if entry.reference.url %} {{ entry.reference.url }}{% endif %}'+Pnote+'\n';
+        {% else %}refList += count + '. {{ source }}'+Pnote+'\n';{% endif %}
+        {{ kinetics|get_user_kfactor:user }}
+    }
+    highChartsSeriesIndex++;
+    {% else %} // {{ source }} had no kinetics. Not included in plot, so can't average.
+    {% endif %}{% endfor %}
+
+    AAverage = Math.exp(AAverage / count);
+    nAverage /= count;
+    EaAverage /= count;
+    
+    if (count == 0) document.getElementById("train").disabled = true
+    else document.getElementById("train").disabled = false;
+
+    output = document.getElementById("id_entry").value.split('kinetics')[0] +
+            'kinetics = Arrhenius(\n        A = (' + AAverage.toExponential(5) + ',\"' + Aunits + '\"),' +
+            '\n        n = (' + nAverage.toFixed(5) + ',\"\"),' +
+            '\n        Ea = (' + EaAverage.toExponential(5) + ',\"' + Eunits + '\"),' +
+            '\n        T0 = (1,\"K\"),' +
+            '\n    ),' +
+            '\n    reference = None,' +
+            '\n    referenceType = \"\",' +
+            '\n    shortDesc = u\"\"\"User-generated average\"\"\",' +
+            '\n    longDesc = ' +
+            '\nu\"\"\"' +
+            '\nAverage of ' + count + ' results:' +
+            '\n' + refList + '\"\"\",';
+    document.getElementById("id_entry").value = output;
+    
+    var new_data = [];
+    for (var n = 0; n <= 10; n++){
+        T = 1/( 1/300 + (1/2000-1/300)*n/10 );
+        k = kfactor * AAverage * Math.pow(T,nAverage) * Math.exp(-1*EaAverage / (8.314472 * T));
+        new_data.push([1000.0/T, Math.log(k)/Math.LN10 ]);
+    }
+    average_stale = false;
+    kchart.get('average').setData(new_data, false); // don't redraw automatically, because this function is called on redraw!
+    setTimeout(function(){ kchart.redraw(); },50); // redraw after delay
+};
+
+function insertSquib() {
+    input = document.getElementById("id_entry").value.split('    kinetics')[0];
+    squib = document.getElementById("id_new_squib").value;
+    output = '    label = "' + squib + '",\n' + input +
+             '    kinetics = None,\n' +
+             '    reference = None,\n' +
+             '    referenceType = \"\",\n' +
+             '    shortDesc = u\"\"\"\"\"\",\n' +
+             '    longDesc = \n' +
+             'u\"\"\"\n\n\"\"\",';
+    document.getElementById("id_new_squib_entry").value = output;
+}
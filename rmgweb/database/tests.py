@@ -35,7 +35,39 @@ unittest). These will both pass when you run "manage.py test".
 Replace these with more appropriate tests for your application.
 """
 
-from django.test import TestCase
+import math
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy
+import rmgpy.constants as constants
+import rmgpy.data.rmg
+from django.test import SimpleTestCase, TestCase
+from rmgpy.data.base import Entry
+from rmgpy.data.kinetics import KineticsDepository
+from rmgpy.data.solvation import SoluteData, SolvationDatabase, SolventData
+from rmgpy.kinetics import Arrhenius, MultiArrhenius
+from rmgpy.molecule.molecule import Molecule
+from rmgpy.reaction import Reaction
+from rmgpy.species import Species
+
+import rmgweb.settings
+from rmgweb.database import reverserates, rulecache, snapshot, solutecache, thermocache, tools, transportbatch, transportcache, watcher
+from rmgweb.database.canonical import SpeciesDict, getMoleculeKey, getReactionKey, getSpeciesKey, isSameSpecies, isSameSpeciesList
+from rmgweb.database.entryindex import getEntryIndex, getEntryList
+from rmgweb.database.kineticsbatch import parseReaction
+from rmgweb.database.lazy import LazyDict, loadAll
+from rmgweb.database.lru import LRUCache
+from rmgweb.database.reactionindex import getCandidateDatabase, getReactionIndex, getSideKey
+from rmgweb.database.solvationbatch import getBatchSolvation
+from rmgweb.database.solventscreen import getSolventParameters, screenSolvents
+from rmgweb.database.thermobatch import parseSpeciesDictionary, parseSpeciesList
+from rmgweb.database.transportbatch import iterateBatchTransport, writeTransportEntry
+from rmgweb.database.views import KINETICS_TREE_TEMPERATURES, getKineticsTreeRates
 
 class SimpleTest(TestCase):
     def test_basic_addition(self):
@@ -51,3 +83,1317 @@ Another way to test that 1 + 1 is equal to 2.
 True
 """}
 
+################################################################################
+
+class StaticWatcher(watcher.DirectoryWatcher):
+    """
+    A watcher that detects no changes itself, for checking the generation
+    numbers bumped by :meth:`DirectoryWatcher.bump`.
+    """
+
+    def addWatch(self, path):
+        pass
+
+class Record(object):
+    """
+    An object with the given attributes, standing in for the entries,
+    databases and species of the RMG database.
+    """
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+class Counter(object):
+    """
+    A function counting how many times it has been called, for checking when
+    the values of a :class:`LazyDict` are loaded. It is picklable, so the
+    dictionaries can be pickled too.
+    """
+
+    def __init__(self, delay=0):
+        self.calls = 0
+        self.delay = delay
+
+    def __call__(self, value):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return value
+
+class CandidateLibrary(object):
+    """
+    A kinetics library holding just the entries passed to it, as made by
+    :func:`getCandidateDatabase`.
+    """
+
+    def __init__(self, label='', name=''):
+        self.label = label
+        self.name = name
+        self.entries = {}
+
+class FitSpecies(object):
+    """
+    A species without a structure and with a constant enthalpy and entropy,
+    for which reverse rate coefficients can be worked out exactly.
+    """
+
+    def __init__(self, label, H, S):
+        self.label = label
+        self.molecule = []
+        self.H = H
+        self.S = S
+        self.calls = 0
+
+    def getFreeEnergy(self, T):
+        self.calls += 1
+        return self.H - T * self.S
+
+################################################################################
+
+class SnapshotTest(SimpleTestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.writeFile('thermo/groups.py', 'groups')
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def writeFile(self, name, text):
+        """
+        Write `text` to the file `name` within the test directory.
+        """
+        path = os.path.join(self.path, name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.write(text)
+
+    def runGit(self, *args):
+        """
+        Run git in the test directory, as a user who does not sign commits.
+        """
+        return snapshot.runGit(self.path, '-c', 'user.name=RMG', '-c', 'user.email=rmg@example.com',
+                               '-c', 'commit.gpgsign=false', *args)
+
+    def test_manifest(self):
+        """
+        Tests that the manifest of a directory changes when a file is edited
+        or added, but not for hidden or compiled files.
+        """
+        key = snapshot.getDirectoryManifestHash(self.path)
+        self.writeFile('thermo/groups.pyc', 'compiled')
+        self.writeFile('.hidden', 'hidden')
+        self.writeFile('.git/HEAD', 'ref')
+        self.assertEqual(snapshot.getDirectoryManifestHash(self.path), key)
+        self.writeFile('thermo/groups.py', 'edited groups')
+        edited = snapshot.getDirectoryManifestHash(self.path)
+        self.assertNotEqual(edited, key)
+        self.writeFile('thermo/libraries.py', 'libraries')
+        self.assertNotEqual(snapshot.getDirectoryManifestHash(self.path), edited)
+
+    def test_git_key(self):
+        """
+        Tests that the key of a git checkout changes with each commit and
+        with any uncommitted change, including new files.
+        """
+        if self.runGit('init', '-q') is None:
+            self.skipTest('git is not available')
+        self.runGit('add', '.')
+        self.runGit('commit', '-q', '-m', 'Add groups')
+        sha = snapshot.getDatabaseGitSHA(self.path)
+        self.assertNotEqual(sha, 'unknown')
+        key = snapshot.getDatabaseKey(self.path)
+        self.assertTrue(key.startswith(sha + '-'))
+        self.assertEqual(snapshot.getDatabaseKey(self.path), key)
+        self.writeFile('thermo/groups.py', 'edited groups')
+        edited = snapshot.getDatabaseKey(self.path)
+        self.assertNotEqual(edited, key)
+        self.writeFile('thermo/libraries.py', 'libraries')
+        added = snapshot.getDatabaseKey(self.path)
+        self.assertNotEqual(added, edited)
+        self.runGit('add', '.')
+        self.runGit('commit', '-q', '-m', 'Add libraries')
+        self.assertFalse(snapshot.getDatabaseKey(self.path).startswith(sha))
+
+    def test_save_and_load(self):
+        """
+        Tests that a snapshot is only loaded with the key it was saved with.
+        """
+        path = os.path.join(self.path, 'snapshots', 'database.pkl')
+        self.assertEqual(snapshot.getSnapshotKey(path), None)
+        self.assertEqual(snapshot.loadSnapshot('key', path), None)
+        snapshot.saveSnapshot({'thermo': [1, 2, 3]}, 'key', path)
+        self.assertEqual(os.listdir(os.path.dirname(path)), ['database.pkl'])
+        self.assertEqual(snapshot.getSnapshotKey(path), 'key')
+        self.assertEqual(snapshot.loadSnapshot('key', path), {'thermo': [1, 2, 3]})
+        self.assertEqual(snapshot.loadSnapshot('other key', path), None)
+        snapshot.removeSnapshot(path)
+        self.assertEqual(snapshot.getSnapshotKey(path), None)
+
+class WatcherTest(SimpleTestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.path, 'thermo'))
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+        tools._generations.pop(self.path, None)
+        for path in [path for path in tools._timestamps if path.startswith(self.path + os.sep)]:
+            del tools._timestamps[path]
+
+    def writeFile(self, name):
+        """
+        Write the file `name` within the test directory.
+        """
+        with open(os.path.join(self.path, name), 'w') as f:
+            f.write(name)
+
+    def waitFor(self, condition):
+        """
+        Return ``True`` once `condition()` is true, or ``False`` if it is
+        still false after a few seconds.
+        """
+        for i in range(100):
+            if condition():
+                return True
+            time.sleep(0.05)
+        return False
+
+    def test_ignored(self):
+        """
+        Tests which files are ignored.
+        """
+        self.assertTrue(watcher.isIgnored('.groups.py.swp'))
+        self.assertTrue(watcher.isIgnored('groups.py~'))
+        self.assertTrue(watcher.isIgnored('groups.pyc'))
+        self.assertFalse(watcher.isIgnored('groups.py'))
+
+    def test_bump(self):
+        """
+        Tests that a change bumps the generation of every watched directory
+        containing it, and of no other.
+        """
+        dbwatcher = StaticWatcher()
+        thermo = os.path.join(self.path, 'thermo')
+        other = self.path + 'other'
+        for path in [self.path, thermo, other]:
+            dbwatcher.watch(path)
+        dbwatcher.bump(os.path.join(thermo, 'groups.py'))
+        self.assertEqual([dbwatcher.getGeneration(path) for path in [self.path, thermo, other]], [1, 1, 0])
+        dbwatcher.bump(os.path.join(self.path, 'kinetics'))
+        dbwatcher.watch(self.path)
+        self.assertEqual([dbwatcher.getGeneration(path) for path in [self.path, thermo, other]], [2, 1, 0])
+        dbwatcher.bumpAll()
+        self.assertEqual([dbwatcher.getGeneration(path) for path in [self.path, thermo, other]], [3, 2, 1])
+        self.assertEqual(dbwatcher.getGeneration(os.path.join(thermo, os.pardir)), 3)
+
+    def test_polling(self):
+        """
+        Tests that the polling watcher notices a file being added, but not
+        compiled files.
+        """
+        dbwatcher = watcher.PollingWatcher(interval=0.05)
+        try:
+            dbwatcher.watch(self.path)
+            generation = dbwatcher.getGeneration(self.path)
+            self.writeFile('thermo/groups.pyc')
+            time.sleep(0.2)
+            self.assertEqual(dbwatcher.getGeneration(self.path), generation)
+            self.writeFile('thermo/groups.py')
+            self.assertTrue(self.waitFor(lambda: dbwatcher.getGeneration(self.path) != generation))
+        finally:
+            # Leave the polling thread nothing to do
+            dbwatcher.signatures.clear()
+
+    def test_inotify(self):
+        """
+        Tests that the inotify watcher notices a directory being added, and
+        then the files added to it.
+        """
+        libc = watcher._getLibC()
+        if libc is None:
+            self.skipTest('inotify is not available')
+        dbwatcher = watcher.InotifyWatcher(libc)
+        dbwatcher.watch(self.path)
+        generation = dbwatcher.getGeneration(self.path)
+        os.mkdir(os.path.join(self.path, 'kinetics'))
+        self.assertTrue(self.waitFor(lambda: dbwatcher.getGeneration(self.path) != generation))
+        generation = dbwatcher.getGeneration(self.path)
+        self.writeFile('kinetics/rules.py')
+        self.assertTrue(self.waitFor(lambda: dbwatcher.getGeneration(self.path) != generation))
+
+    def test_process_watcher(self):
+        """
+        Tests that each process has a single watcher.
+        """
+        dbwatcher = watcher.getWatcher()
+        self.assertTrue(watcher.getWatcher() is dbwatcher)
+        self.assertEqual(dbwatcher.pid, os.getpid())
+
+    def test_modified_while_loading(self):
+        """
+        Tests that a directory is modified once anything in it changes, even
+        while it is being loaded.
+        """
+        generation = tools.getDirGeneration(self.path)
+        self.assertFalse(tools.isDirLoaded(self.path))
+        self.writeFile('thermo/groups.py')
+        dbwatcher = watcher.getWatcher()
+        self.assertTrue(self.waitFor(lambda: dbwatcher.getGeneration(self.path) != generation[1]))
+        tools.resetDirTimestamps(self.path, generation)
+        self.assertTrue(tools.isDirLoaded(self.path))
+        self.assertTrue(tools.isDirModified(self.path))
+        tools.resetDirTimestamps(self.path)
+        self.assertFalse(tools.isDirModified(self.path))
+        self.writeFile('thermo/libraries.py')
+        self.assertTrue(self.waitFor(lambda: tools.isDirModified(self.path)))
+
+class ReloadTest(SimpleTestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.mtime = time.time()
+        for name in ['A/reactions.py', 'A/dictionary.txt', 'B/reactions.py']:
+            self.writeFile(name)
+        self.database = Record(kinetics=Record())
+        tools.loadKineticsLibrariesLazily(self.database, self.path)
+        tools.resetDirTimestamps(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+        tools._generations.pop(self.path, None)
+        for path in [path for path in tools._timestamps if path.startswith(self.path + os.sep)]:
+            del tools._timestamps[path]
+
+    def writeFile(self, name):
+        """
+        Write the file `name` within the test directory, with a modification
+        time later than that of every file written before.
+        """
+        path = os.path.join(self.path, name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.write(name)
+        self.mtime += 10
+        os.utime(path, (self.mtime, self.mtime))
+
+    def test_modified_labels(self):
+        """
+        Tests finding the libraries with files added, removed or modified.
+        """
+        self.assertEqual(tools.getModifiedFiles(self.path), set())
+        self.assertEqual(tools.getModifiedLabels(self.path, tools.getKineticsLibraryLabel), set())
+        self.writeFile('A/dictionary.txt')
+        self.writeFile('A/.dictionary.txt.swp')
+        self.writeFile('C/reactions.py')
+        os.remove(os.path.join(self.path, 'B', 'reactions.py'))
+        self.assertEqual(tools.getModifiedFiles(self.path), set([os.path.join(self.path, name) for name in
+                                                                 ['A/dictionary.txt', 'B/reactions.py', 'C/reactions.py']]))
+        self.assertEqual(tools.getModifiedLabels(self.path, tools.getKineticsLibraryLabel), set(['A', 'B', 'C']))
+
+    def test_whole_directory(self):
+        """
+        Tests that the whole directory is to be loaded if it never was, or a
+        modified file belongs to no library.
+        """
+        self.assertEqual(tools.getModifiedLabels(self.path + 'other', tools.getKineticsLibraryLabel), None)
+        self.writeFile('README')
+        self.assertEqual(tools.getModifiedLabels(self.path, tools.getKineticsLibraryLabel), None)
+        self.assertEqual(tools.getFamilyLabel(os.path.join('H_Abstraction', 'groups.py')), 'H_Abstraction')
+        self.assertEqual(tools.getFamilyLabel('recommended.py'), None)
+
+    def test_reload_changed(self):
+        """
+        Tests that reloading replaces the libraries that changed, adding and
+        removing libraries, and leaves the others as they were.
+        """
+        libraries = self.database.kinetics.libraries
+        self.assertEqual(sorted(libraries.keys()), ['A', 'B'])
+        self.assertEqual(self.database.kinetics.libraryOrder, ['A', 'B'])
+        library = libraries['A'] = Record(label='A')
+        self.writeFile('B/reactions.py')
+        self.writeFile('C/reactions.py')
+        for label in tools.getModifiedLabels(self.path, tools.getKineticsLibraryLabel):
+            tools.reloadKineticsLibrary(self.database, self.path, label)
+        self.assertTrue(libraries['A'] is library)
+        self.assertFalse(libraries.isLoaded('B'))
+        self.assertFalse(libraries.isLoaded('C'))
+        self.assertEqual(self.database.kinetics.libraryOrder, ['A', 'B', 'C'])
+        shutil.rmtree(os.path.join(self.path, 'A'))
+        for label in tools.getModifiedLabels(self.path, tools.getKineticsLibraryLabel):
+            tools.reloadKineticsLibrary(self.database, self.path, label)
+        self.assertEqual(sorted(libraries.keys()), ['B', 'C'])
+        self.assertEqual(self.database.kinetics.libraryOrder, ['B', 'C'])
+
+    def test_database_parts(self):
+        """
+        Tests setting and removing the parts of a database kept in a plain
+        dictionary, which are loaded at once.
+        """
+        container = {}
+        order = []
+        tools.setDatabasePart(container, order, 'A', str, 'library A')
+        self.assertEqual((container, order), ({'A': 'library A'}, ['A']))
+        tools.setDatabasePart(container, order, 'A', str, 'new library A')
+        self.assertEqual((container, order), ({'A': 'new library A'}, ['A']))
+        tools.removeDatabasePart(container, order, 'A')
+        tools.removeDatabasePart(container, order, 'B')
+        self.assertEqual((container, order), ({}, []))
+
+class BackgroundReloadTest(SimpleTestCase):
+
+    def setUp(self):
+        self.database = tools.database
+        self.loadDatabaseVersion = tools.loadDatabaseVersion
+        tools.loadDatabaseVersion = self.loadNewVersion
+        self.requests = []
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.waitForReload()
+        tools.loadDatabaseVersion = self.loadDatabaseVersion
+        tools.swapDatabase(self.database)
+
+    def loadNewVersion(self, requests):
+        """
+        Stand in for :func:`tools.loadDatabaseVersion`, swapping in a copy of
+        the database once the test releases it, or failing for the component
+        ``'broken'``.
+        """
+        self.requests.append(requests)
+        self.release.wait(5)
+        if ('broken', '') in requests:
+            raise ValueError('Unable to parse broken.py')
+        tools.swapDatabase(tools.copyDatabase(tools.database))
+
+    def waitForReload(self):
+        """
+        Wait for the reload thread, if any, to finish.
+        """
+        thread = tools._reloadThread
+        if thread is not None:
+            thread.join(5)
+
+    def test_swap(self):
+        """
+        Tests that swapping in a database makes it the one served, as a new
+        version.
+        """
+        status = tools.getDatabaseStatus()
+        newDatabase = tools.copyDatabase(self.database)
+        tools.swapDatabase(newDatabase)
+        self.assertTrue(tools.database is newDatabase)
+        self.assertTrue(rmgpy.data.rmg.database is newDatabase)
+        self.assertEqual(tools.getDatabaseStatus()['version'], status['version'] + 1)
+        self.assertTrue(tools.getDatabaseStatus()['loadedAt'] >= status['loadedAt'])
+
+    def test_copy(self):
+        """
+        Tests that a copy of the database has its own containers of the
+        libraries, groups and families, but shares what is in them.
+        """
+        newDatabase = tools.copyDatabase(self.database)
+        for name in ['thermo', 'transport', 'solvation', 'kinetics', 'statmech']:
+            self.assertFalse(getattr(newDatabase, name) is getattr(self.database, name))
+        self.assertTrue(newDatabase.forbiddenStructures is self.database.forbiddenStructures)
+        newDatabase.thermo.libraries['test'] = Record(label='test')
+        newDatabase.kinetics.families['test'] = Record(label='test')
+        self.assertFalse('test' in self.database.thermo.libraries)
+        self.assertFalse('test' in self.database.kinetics.families)
+
+    def test_background_reload(self):
+        """
+        Tests that the database is served as it was until a reload finishes,
+        and that the reloads requested meanwhile are made together next.
+        """
+        version = tools.getDatabaseStatus()['version']
+        tools.startBackgroundReload('thermo', '')
+        for i in range(100):
+            if tools.getDatabaseStatus()['reloading']:
+                break
+            time.sleep(0.05)
+        tools.startBackgroundReload('kinetics', 'families')
+        tools.startBackgroundReload('', '')
+        tools.startBackgroundReload('kinetics', 'families')
+        status = tools.getDatabaseStatus()
+        self.assertTrue(status['reloading'])
+        self.assertEqual(status['reloadComponents'], ['thermo'])
+        self.assertEqual(status['reloadPending'], ['all', 'kinetics/families'])
+        self.assertEqual(status['version'], version)
+        self.assertTrue(tools.database is self.database)
+
+        self.release.set()
+        self.waitForReload()
+        status = tools.getDatabaseStatus()
+        self.assertEqual(self.requests, [[('thermo', '')], [('', ''), ('kinetics', 'families')]])
+        self.assertEqual(status['version'], version + 2)
+        self.assertFalse(status['reloading'])
+        self.assertEqual((status['reloadComponents'], status['reloadPending']), ([], []))
+        self.assertNotEqual(status['lastReloadFinished'], None)
+        self.assertEqual(status['lastReloadError'], None)
+        self.assertFalse(tools.database is self.database)
+
+    def test_failed_reload(self):
+        """
+        Tests that the database is kept if a reload fails, and the error is
+        reported.
+        """
+        version = tools.getDatabaseStatus()['version']
+        self.release.set()
+        tools.startBackgroundReload('broken', '')
+        self.waitForReload()
+        status = tools.getDatabaseStatus()
+        self.assertEqual(status['lastReloadError'], 'ValueError: Unable to parse broken.py')
+        self.assertEqual(status['version'], version)
+        self.assertTrue(tools.database is self.database)
+
+class LazyDictTest(SimpleTestCase):
+
+    def setUp(self):
+        self.load = Counter()
+        self.lazy = LazyDict()
+        self.lazy.setLazy('a', self.load, 1)
+        self.lazy.setLazy('b', self.load, 2)
+        self.lazy['c'] = 3
+
+    def test_keys_without_loading(self):
+        """
+        Tests that the keys are known, and membership tested, without loading
+        any value.
+        """
+        self.assertEqual(sorted(self.lazy.keys()), ['a', 'b', 'c'])
+        self.assertTrue('a' in self.lazy)
+        self.assertEqual(len(self.lazy), 3)
+        self.assertEqual(self.load.calls, 0)
+
+    def test_loads_each_value_once(self):
+        """
+        Tests that looking up a key loads just its value, and only the first
+        time.
+        """
+        self.assertFalse(self.lazy.isLoaded('a'))
+        self.assertEqual(self.lazy['a'], 1)
+        self.assertEqual(self.lazy['a'], 1)
+        self.assertEqual(self.lazy.get('a'), 1)
+        self.assertEqual(self.load.calls, 1)
+        self.assertTrue(self.lazy.isLoaded('a'))
+        self.assertFalse(self.lazy.isLoaded('b'))
+        self.assertTrue(self.lazy.isLoaded('c'))
+        self.assertEqual(self.lazy.get('d', 4), 4)
+
+    def test_values_load_all(self):
+        """
+        Tests that the values and items are all loaded.
+        """
+        self.assertEqual(sorted(self.lazy.values()), [1, 2, 3])
+        self.assertEqual(sorted(self.lazy.iteritems()), [('a', 1), ('b', 2), ('c', 3)])
+        self.assertEqual(self.load.calls, 2)
+        loadAll(self.lazy)
+        self.assertEqual(self.load.calls, 2)
+
+    def test_pop_unloaded(self):
+        """
+        Tests that popping a value that was never loaded does not load it.
+        """
+        self.assertEqual(self.lazy.pop('a'), None)
+        self.assertEqual(self.lazy.pop('c'), 3)
+        self.assertEqual(self.lazy.pop('d', None), None)
+        self.assertEqual(self.load.calls, 0)
+        self.assertEqual(self.lazy.keys(), ['b'])
+
+    def test_copy_stays_unloaded(self):
+        """
+        Tests that a copy shares the values not yet loaded, unloaded.
+        """
+        copy = self.lazy.copy()
+        self.assertTrue(isinstance(copy, LazyDict))
+        self.assertFalse(copy.isLoaded('a'))
+        self.assertEqual(copy['a'], 1)
+        self.assertFalse(self.lazy.isLoaded('a'))
+
+    def test_pickle(self):
+        """
+        Tests that pickling loads all the values, and that the unpickled
+        dictionary is a working LazyDict.
+        """
+        lazy = pickle.loads(pickle.dumps(self.lazy, pickle.HIGHEST_PROTOCOL))
+        self.assertTrue(isinstance(lazy, LazyDict))
+        self.assertEqual(dict(lazy.items()), {'a': 1, 'b': 2, 'c': 3})
+        self.assertTrue(lazy.isLoaded('a'))
+        lazy.setLazy('d', Counter(), 4)
+        self.assertEqual(lazy['d'], 4)
+
+    def test_threads_load_once(self):
+        """
+        Tests that a value looked up by several threads at once is loaded
+        only once.
+        """
+        load = Counter(delay=0.05)
+        lazy = LazyDict()
+        lazy.setLazy('a', load, 1)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(lazy['a'])) for i in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [1] * 5)
+        self.assertEqual(load.calls, 1)
+
+    def test_loadAll_other_containers(self):
+        """
+        Tests that loadAll leaves containers other than a LazyDict alone.
+        """
+        loadAll({'a': 1})
+        loadAll([1, 2])
+
+class RulesCacheTest(SimpleTestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.familyPath = os.path.join(self.path, 'families', 'H_Abstraction')
+        os.makedirs(self.familyPath)
+        self.writeFile('groups.py', 'groups')
+        self.writeFile('rules.py', 'rules')
+        self.cachePath = rmgweb.settings.DATABASE_RULES_CACHE_PATH
+        rmgweb.settings.DATABASE_RULES_CACHE_PATH = os.path.join(self.path, 'cache')
+
+    def tearDown(self):
+        rmgweb.settings.DATABASE_RULES_CACHE_PATH = self.cachePath
+        shutil.rmtree(self.path)
+
+    def writeFile(self, name, text):
+        """
+        Write `text` to the file `name` within the test family.
+        """
+        with open(os.path.join(self.familyPath, name), 'w') as f:
+            f.write(text)
+
+    def test_family_key(self):
+        """
+        Tests that the key of a family changes with its files and the thermo
+        database, but not with its compiled files.
+        """
+        key = rulecache.getFamilyKey(self.familyPath, 'thermo')
+        self.assertEqual(rulecache.getFamilyKey(self.familyPath, 'thermo'), key)
+        self.assertNotEqual(rulecache.getFamilyKey(self.familyPath, 'new thermo'), key)
+        self.writeFile('groups.pyc', 'compiled')
+        self.assertEqual(rulecache.getFamilyKey(self.familyPath, 'thermo'), key)
+        self.writeFile('rules.py', 'new rules')
+        edited = rulecache.getFamilyKey(self.familyPath, 'thermo')
+        self.assertNotEqual(edited, key)
+        self.writeFile('training.py', 'training')
+        self.assertNotEqual(rulecache.getFamilyKey(self.familyPath, 'thermo'), edited)
+
+    def test_save_and_load(self):
+        """
+        Tests that a cached family is only loaded with the key it was saved
+        with, and not at all once the cache is disabled.
+        """
+        self.assertEqual(rulecache.loadTrainedFamily('H_Abstraction', 'key'), None)
+        rulecache.saveTrainedFamily(Record(label='H_Abstraction', rules=[1, 2]), 'key')
+        self.assertEqual(os.listdir(rulecache.getRulesCachePath()), ['H_Abstraction.pkl'])
+        self.assertEqual(rulecache.loadTrainedFamily('H_Abstraction', 'key').rules, [1, 2])
+        self.assertEqual(rulecache.loadTrainedFamily('H_Abstraction', 'other key'), None)
+        self.assertEqual(rulecache.loadTrainedFamily('R_Recombination', 'key'), None)
+        rmgweb.settings.DATABASE_RULES_CACHE_PATH = None
+        self.assertEqual(rulecache.loadTrainedFamily('H_Abstraction', 'key'), None)
+
+class EntryIndexTest(SimpleTestCase):
+
+    def setUp(self):
+        self.entries = [Record(index=index, label=str(index)) for index in [3, 1, 7, -1]]
+        self.database = Record(entries={
+            'a': self.entries[0],
+            'b': self.entries[1],
+            # A rate rule's entries are lists of entries
+            'c': [self.entries[2], self.entries[3], Record(index=3, label='duplicate')],
+        })
+
+    def test_entry_list(self):
+        """
+        Tests that the lists of entries are flattened.
+        """
+        self.assertEqual(len(getEntryList(self.database)), 5)
+
+    def test_index(self):
+        """
+        Tests finding the entries by index, and the range of the indices.
+        """
+        index = getEntryIndex(self.database)
+        self.assertEqual((index.minIndex, index.maxIndex, index.nextIndex), (1, 7, 8))
+        self.assertTrue(index.get(7) is self.entries[2])
+        self.assertTrue(index.get(-1) is self.entries[3])
+        self.assertEqual(index.get(5), None)
+        self.assertTrue(getEntryIndex(self.database) is index)
+
+    def test_reindexed_when_changed(self):
+        """
+        Tests that the index is rebuilt once the entries have changed.
+        """
+        getEntryIndex(self.database)
+        entry = Record(index=9, label='new')
+        self.database.entries['d'] = entry
+        index = getEntryIndex(self.database)
+        self.assertTrue(index.get(9) is entry)
+        self.assertEqual(index.nextIndex, 10)
+
+    def test_empty(self):
+        """
+        Tests the index of a database with no entries.
+        """
+        index = getEntryIndex(Record(entries={}))
+        self.assertEqual((index.minIndex, index.maxIndex, index.nextIndex), (None, None, 1))
+
+class KineticsTreeTest(SimpleTestCase):
+
+    def test_rates(self):
+        """
+        Tests that the rates of the nodes evaluated together match those given
+        by their own getRateCoefficient, for Arrhenius and other kinetics.
+        """
+        entries = [
+            Record(data=Arrhenius(A=(1e7, 'm^3/(mol*s)'), n=0.5, Ea=(30, 'kJ/mol'), T0=(1, 'K'))),
+            Record(data=None),
+            Record(data=Arrhenius(A=(2e12, 's^-1'), n=-1.2, Ea=(-5, 'kJ/mol'), T0=(300, 'K'))),
+            Record(data=MultiArrhenius(arrhenius=[
+                Arrhenius(A=(1e6, 's^-1'), n=0, Ea=(10, 'kJ/mol'), T0=(1, 'K')),
+                Arrhenius(A=(1e8, 's^-1'), n=1, Ea=(50, 'kJ/mol'), T0=(1, 'K')),
+            ])),
+        ]
+        rates = getKineticsTreeRates(entries)
+        self.assertEqual(sorted(rates.keys()), sorted([id(entry) for entry in entries if entry.data is not None]))
+        for entry in entries:
+            if entry.data is None:
+                continue
+            self.assertEqual(len(rates[id(entry)]), len(KINETICS_TREE_TEMPERATURES))
+            for T, logk in zip(KINETICS_TREE_TEMPERATURES, rates[id(entry)]):
+                self.assertAlmostEqual(logk, math.log10(entry.data.getRateCoefficient(T)), 6)
+
+class CanonicalTest(SimpleTestCase):
+
+    def setUp(self):
+        # Formamide and formimidic acid are tautomers, sharing an InChIKey
+        self.formamide = Molecule().fromSMILES('NC=O')
+        self.formimidicAcid = Molecule().fromSMILES('N=CO')
+
+    def test_same_structure(self):
+        """
+        Tests that the same structure has the same key, however it is given.
+        """
+        molecule = Molecule().fromSMILES('OCC')
+        self.assertEqual(getMoleculeKey(molecule), getMoleculeKey(Molecule().fromSMILES('CCO')))
+        self.assertEqual(getSpeciesKey(Species(molecule=[molecule])), getMoleculeKey(molecule))
+        self.assertEqual(getSpeciesKey(Entry(item=molecule)), getMoleculeKey(molecule))
+        self.assertNotEqual(getMoleculeKey(molecule), getMoleculeKey(Molecule().fromSMILES('COC')))
+
+    def test_resonance_isomers(self):
+        """
+        Tests that the key of a species does not depend on which of its
+        resonance isomers is listed first.
+        """
+        species = Species(molecule=[Molecule().fromSMILES('C=C[CH2]')])
+        species.generateResonanceIsomers()
+        flipped = Species(molecule=species.molecule[::-1])
+        self.assertEqual(getSpeciesKey(species), getSpeciesKey(flipped))
+        self.assertTrue(isSameSpecies(species, flipped.molecule[-1]))
+
+    def test_tautomers(self):
+        """
+        Tests that tautomers share a key but are told apart by isomorphism.
+        """
+        self.assertEqual(getMoleculeKey(self.formamide), getMoleculeKey(self.formimidicAcid))
+        self.assertFalse(isSameSpecies(self.formamide, self.formimidicAcid))
+        self.assertTrue(isSameSpecies(self.formamide, Molecule().fromSMILES('O=CN')))
+
+    def test_species_lists(self):
+        """
+        Tests comparing lists of species in any order.
+        """
+        ethane = Molecule().fromSMILES('CC')
+        self.assertTrue(isSameSpeciesList([ethane, self.formamide], [Molecule().fromSMILES('O=CN'), Molecule().fromSMILES('CC')]))
+        self.assertFalse(isSameSpeciesList([ethane, self.formamide], [ethane, self.formimidicAcid]))
+        self.assertFalse(isSameSpeciesList([ethane, ethane], [ethane]))
+
+    def test_species_dict(self):
+        """
+        Tests that a SpeciesDict keeps tautomers apart.
+        """
+        species = SpeciesDict()
+        self.assertEqual(species.setdefault(self.formamide, 1), 1)
+        self.assertEqual(species.setdefault(self.formimidicAcid, 2), 2)
+        self.assertEqual(species.setdefault(Molecule().fromSMILES('O=CN'), 3), 1)
+        self.assertEqual(species.get(Species(molecule=[Molecule().fromSMILES('OC=N')])), 2)
+        self.assertEqual(species.get(Molecule().fromSMILES('CC'), 0), 0)
+
+    def test_reaction_key(self):
+        """
+        Tests that a reaction has the same key in either direction.
+        """
+        reactants = [Species(molecule=[Molecule().fromSMILES('CC')]), Species(molecule=[Molecule().fromSMILES('[OH]')])]
+        products = [Species(molecule=[Molecule().fromSMILES('C[CH2]')]), Species(molecule=[Molecule().fromSMILES('O')])]
+        self.assertEqual(getReactionKey(Reaction(reactants=reactants, products=products)),
+                         getReactionKey(Reaction(reactants=products[::-1], products=reactants)))
+
+    def test_untrained_reactions(self):
+        """
+        Tests that the untrained reactions of a family are those of its other
+        depositories not in the training set, each given once in whichever
+        direction, while tautomers are kept apart.
+        """
+        def getReaction(reactants, products):
+            return Reaction(reactants=[Species(molecule=[Molecule().fromSMILES(smiles)]) for smiles in reactants],
+                            products=[Species(molecule=[Molecule().fromSMILES(smiles)]) for smiles in products])
+        def getDepository(label, reactions):
+            depository = KineticsDepository(label=label)
+            for index, reaction in enumerate(reactions):
+                depository.entries[index] = Entry(item=reaction, index=index)
+            return depository
+        methane = getReaction(['C', '[OH]'], ['[CH3]', 'O'])
+        formamide = getReaction(['NC=O', '[H]'], ['N[CH]O'])
+        formimidicAcid = getReaction(['N=CO', '[H]'], ['N[CH]O'])
+        family = Record(label='H_Abstraction', depositories=[
+            getDepository('H_Abstraction/training', [getReaction(['CC', '[OH]'], ['C[CH2]', 'O'])]),
+            getDepository('H_Abstraction/NIST', [getReaction(['O', 'C[CH2]'], ['[OH]', 'CC']), methane, formamide]),
+            getDepository('H_Abstraction/PrIMe', [getReaction(['[OH]', 'C'], ['O', '[CH3]']), formimidicAcid]),
+        ])
+        untrained = tools.getUntrainedReactions(family)
+        self.assertEqual(untrained.label, 'H_Abstraction/untrained')
+        self.assertEqual(sorted(untrained.entries.keys()), ['1', '2', '3'])
+        for index, reaction in enumerate([methane, formamide, formimidicAcid]):
+            self.assertTrue(untrained.entries[str(index + 1)].item is reaction)
+
+class ReactionIndexTest(SimpleTestCase):
+
+    def setUp(self):
+        self.ethane = Molecule().fromSMILES('CC')
+        self.hydroxyl = Molecule().fromSMILES('[OH]')
+        self.ethyl = Molecule().fromSMILES('C[CH2]')
+        self.water = Molecule().fromSMILES('O')
+        self.hydrogen = Molecule().fromSMILES('[H]')
+        def getEntry(reactants, products):
+            return Entry(item=Reaction(reactants=[Species(molecule=[molecule]) for molecule in reactants],
+                                       products=[Species(molecule=[molecule]) for molecule in products]))
+        self.abstraction = getEntry([self.ethane, self.hydroxyl], [self.ethyl, self.water])
+        self.dissociation = getEntry([self.ethane], [self.ethyl, self.hydrogen])
+        self.database = CandidateLibrary(label='test', name='Test')
+        self.database.entries = {'abstraction': self.abstraction, 'dissociation': self.dissociation}
+
+    def test_side_key_order(self):
+        """
+        Tests that the key of a side of a reaction does not depend on the
+        order of its species.
+        """
+        self.assertEqual(getSideKey([self.ethane, self.hydroxyl]), getSideKey([self.hydroxyl, self.ethane]))
+        self.assertNotEqual(getSideKey([self.ethane]), getSideKey([self.ethane, self.hydroxyl]))
+
+    def test_find_either_direction(self):
+        """
+        Tests that an entry is found by the species on either side of its
+        reaction, and that the other side must match if given.
+        """
+        index = getReactionIndex(self.database)
+        self.assertEqual(index.find([self.hydroxyl, self.ethane]), [('abstraction', self.abstraction)])
+        self.assertEqual(index.find([self.water, self.ethyl]), [('abstraction', self.abstraction)])
+        self.assertEqual(index.find([self.ethane, self.hydroxyl], [self.water, self.ethyl]), [('abstraction', self.abstraction)])
+        self.assertEqual(index.find([self.ethane, self.hydroxyl], [self.ethyl, self.hydrogen]), [])
+        self.assertEqual(index.find([self.ethane]), [('dissociation', self.dissociation)])
+        self.assertEqual(index.find([self.water]), [])
+
+    def test_candidate_database(self):
+        """
+        Tests that the candidate database holds just the matching entries.
+        """
+        candidates = getCandidateDatabase(self.database, [self.ethane])
+        self.assertEqual((candidates.label, candidates.name), ('test', 'Test'))
+        self.assertEqual(candidates.entries, {'dissociation': self.dissociation})
+
+    def test_reindexed_when_changed(self):
+        """
+        Tests that the index is rebuilt once the entries have changed.
+        """
+        getReactionIndex(self.database)
+        del self.database.entries['dissociation']
+        self.assertEqual(getReactionIndex(self.database).find([self.ethane]), [])
+
+class LRUCacheTest(SimpleTestCase):
+
+    def test_forgets_least_recently_used(self):
+        """
+        Tests that a full cache forgets the item used longest ago, counting
+        lookups as uses.
+        """
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_set_replaces(self):
+        """
+        Tests that setting a key again replaces its value without taking up
+        another place.
+        """
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('a', 2)
+        cache.set('b', 3)
+        self.assertEqual(cache.get('a'), 2)
+        self.assertEqual(len(cache.items), 2)
+
+    def test_size_zero(self):
+        """
+        Tests that a cache of size 0 holds nothing.
+        """
+        cache = LRUCache(0)
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), None)
+
+    def test_stats(self):
+        """
+        Tests the counts of hits and misses, and that clearing the cache
+        forgets its items.
+        """
+        cache = LRUCache(4)
+        self.assertEqual(cache.getStats()['hitRate'], None)
+        cache.set('a', 1)
+        cache.get('a')
+        cache.get('b')
+        cache.get('a')
+        stats = cache.getStats()
+        self.assertEqual((stats['size'], stats['items'], stats['hits'], stats['misses']), (4, 1, 2, 1))
+        self.assertAlmostEqual(stats['hitRate'], 2.0 / 3.0)
+        cache.clear()
+        self.assertEqual(cache.get('a'), None)
+        self.assertEqual(cache.getStats()['items'], 0)
+
+class ThermoCacheTest(SimpleTestCase):
+
+    def setUp(self):
+        self.cache = thermocache._cache
+        thermocache._cache = LRUCache(16)
+        self.database = Record(thermoGeneration=thermocache.newGeneration())
+        self.estimated = []
+
+    def tearDown(self):
+        thermocache._cache = self.cache
+
+    def estimate(self, species):
+        """
+        Give `species` its resonance isomers and a made-up thermo estimate,
+        recording which species were estimated.
+        """
+        self.estimated.append(species)
+        species.generateResonanceIsomers()
+        species.thermo = Record(isomers=len(species.molecule), estimate=len(self.estimated))
+
+    def getSpecies(self, smiles):
+        """
+        Return the species with the given `smiles`, with its thermo from the
+        cache if possible.
+        """
+        species = Species(molecule=[Molecule().fromSMILES(smiles)])
+        thermocache.getSpeciesThermo(self.database, species, self.estimate)
+        return species
+
+    def test_hits(self):
+        """
+        Tests that a species is estimated once, and that the cached isomers
+        and thermo are copies.
+        """
+        allyl = self.getSpecies('C=C[CH2]')
+        again = self.getSpecies('[CH2]C=C')
+        self.assertEqual(len(self.estimated), 1)
+        self.assertEqual(len(again.molecule), 2)
+        self.assertEqual((again.thermo.isomers, again.thermo.estimate), (2, 1))
+        self.assertFalse(again.thermo is allyl.thermo)
+        self.assertFalse(again.molecule[0] is allyl.molecule[0])
+        self.assertTrue(again.molecule[0].isIsomorphic(allyl.molecule[0]))
+
+    def test_tautomers(self):
+        """
+        Tests that tautomers, which share a canonical key, are estimated and
+        cached separately.
+        """
+        formamide = self.getSpecies('NC=O')
+        formimidicAcid = self.getSpecies('N=CO')
+        self.assertEqual(len(self.estimated), 2)
+        self.assertEqual(self.getSpecies('O=CN').thermo.estimate, formamide.thermo.estimate)
+        self.assertEqual(self.getSpecies('OC=N').thermo.estimate, formimidicAcid.thermo.estimate)
+        self.assertEqual(len(self.estimated), 2)
+
+    def test_generations(self):
+        """
+        Tests that a species is estimated again for a new generation of the
+        thermo database, and every time for a database without one.
+        """
+        self.getSpecies('CC')
+        self.database = Record(thermoGeneration=thermocache.newGeneration())
+        self.getSpecies('CC')
+        self.getSpecies('CC')
+        self.assertEqual(len(self.estimated), 2)
+        self.database = Record()
+        self.getSpecies('CC')
+        self.getSpecies('CC')
+        self.assertEqual(len(self.estimated), 4)
+        self.assertEqual(thermocache.getThermoCacheStats()['items'], 2)
+
+class ReverseRatesTest(SimpleTestCase):
+
+    def setUp(self):
+        # Species of constant enthalpy and entropy, for which the reverse rate
+        # coefficients are exactly of the modified Arrhenius form
+        self.A = FitSpecies('A', -50000.0, 150.0)
+        self.B = FitSpecies('B', 20000.0, 120.0)
+        self.C = FitSpecies('C', -80000.0, 200.0)
+        self.reaction = Reaction(reactants=[self.A, self.B], products=[self.C], kinetics=Arrhenius(
+            A = (1e7, 'm^3/(mol*s)'),
+            n = 0.5,
+            Ea = (30, 'kJ/mol'),
+            T0 = (1, 'K'),
+        ))
+        self.cache = reverserates._cache
+        reverserates._cache = LRUCache(16)
+
+    def tearDown(self):
+        reverserates._cache = self.cache
+
+    def getReverseRate(self, T):
+        """
+        Return the reverse rate coefficient of the test reaction at `T`, from
+        its forward rate coefficient and equilibrium constant.
+        """
+        R = constants.R
+        dG = self.C.getFreeEnergy(T) - self.A.getFreeEnergy(T) - self.B.getFreeEnergy(T)
+        Kc = math.exp(-dG / (R * T)) * (1e5 / (R * T)) ** -1
+        return self.reaction.kinetics.getRateCoefficient(T) / Kc
+
+    def test_fit(self):
+        """
+        Tests that the fitted reverse rate coefficients match those given by
+        the forward rate coefficient and the equilibrium constant.
+        """
+        reverse = reverserates.fitReverseArrhenius([self.reaction])[0]
+        for T in [300, 500, 1000, 1500, 2000]:
+            self.assertAlmostEqual(reverse.getRateCoefficient(T) / self.getReverseRate(T), 1.0, 4)
+
+    def test_free_energies_once(self):
+        """
+        Tests that each distinct species is evaluated only once.
+        """
+        Tlist = numpy.array([300.0, 1000.0])
+        reactions = [self.reaction, Reaction(reactants=[self.C], products=[self.A, self.B])]
+        energies = reverserates.getReactionFreeEnergies(reactions, Tlist)
+        self.assertEqual((self.A.calls, self.B.calls, self.C.calls), (2, 2, 2))
+        for T, dG1, dG2 in zip(Tlist, energies[0], energies[1]):
+            self.assertAlmostEqual(dG1, -dG2)
+            self.assertAlmostEqual(dG1, self.C.H - self.A.H - self.B.H - T * (self.C.S - self.A.S - self.B.S))
+
+    def test_fit_species(self):
+        """
+        Tests that species without structures are compared by label.
+        """
+        self.assertTrue(reverserates.isSameFitSpecies([self.A, self.B], [self.B, self.A]))
+        self.assertFalse(reverserates.isSameFitSpecies([self.A, self.B], [self.A, self.C]))
+
+    def test_cached_fits(self):
+        """
+        Tests that the fits are cached by reaction and thermo version, and
+        used for the same species only.
+        """
+        key = reverserates.getReverseFitKey(self.reaction, 'version')
+        self.assertEqual(reverserates.getCachedFit(key, self.reaction), None)
+        reverse = reverserates.generateReverseRateCoefficients([self.reaction], 'version')[0]
+        self.assertEqual(reverserates.getCachedFit(key, self.reaction).A.value_si, reverse.A.value_si)
+        other = Reaction(reactants=[FitSpecies('A', 0.0, 0.0), self.B], products=[FitSpecies('D', 0.0, 0.0)], kinetics=self.reaction.kinetics)
+        self.assertEqual(reverserates.getCachedFit(key, other), None)
+        self.assertNotEqual(reverserates.getReverseFitKey(self.reaction, 'other version'), key)
+
+class ReactionParserTest(SimpleTestCase):
+
+    def test_reaction_strings(self):
+        """
+        Tests parsing reactions given as strings of SMILES, including charged
+        species.
+        """
+        molecules = {}
+        reactants, products = parseReaction('CC + [OH] >> C[CH2] + O', molecules)
+        self.assertEqual(len(reactants), 2)
+        self.assertTrue(reactants[1].isIsomorphic(Molecule().fromSMILES('[OH]')))
+        self.assertTrue(products[0].isIsomorphic(Molecule().fromSMILES('C[CH2]')))
+        reactants, products = parseReaction('C[N+](=O)[O-] + [OH]', molecules)
+        self.assertEqual(products, None)
+        self.assertEqual(len(reactants), 2)
+        self.assertTrue('C[N+](=O)[O-]' in molecules)
+        # The molecules parsed before are reused
+        reactants, products = parseReaction('CC >> C[CH2] + [H]', molecules)
+        self.assertTrue(reactants[0] is molecules['CC'])
+
+    def test_reaction_dictionaries(self):
+        """
+        Tests parsing reactions given as dictionaries, and rejecting reactions
+        with too many species.
+        """
+        reactants, products = parseReaction({'reactants': ['InChI=1S/C2H6/c1-2/h1-2H3', 'C=C']}, {})
+        self.assertEqual(products, None)
+        self.assertTrue(reactants[0].isIsomorphic(Molecule().fromSMILES('CC')))
+        self.assertRaises(ValueError, parseReaction, 'C + C + C + C', {})
+        self.assertRaises(ValueError, parseReaction, 'C >> C >> C', {})
+        self.assertRaises(ValueError, parseReaction, 42, {})
+
+class SpeciesParserTest(SimpleTestCase):
+
+    def test_species_dictionary(self):
+        """
+        Tests parsing a species dictionary, with an error in place of the
+        molecule of a species that cannot be parsed.
+        """
+        text = """ethane
+1 C u0 p0 c0 {2,S} {3,S} {4,S} {5,S}
+2 C u0 p0 c0 {1,S} {6,S} {7,S} {8,S}
+3 H u0 p0 c0 {1,S}
+4 H u0 p0 c0 {1,S}
+5 H u0 p0 c0 {1,S}
+6 H u0 p0 c0 {2,S}
+7 H u0 p0 c0 {2,S}
+8 H u0 p0 c0 {2,S}\r
+\r
+broken
+1 C u0 p0 c0 {2,S}
+
+"""
+        speciesList = parseSpeciesDictionary(text)
+        self.assertEqual([label for label, molecule in speciesList], ['ethane', 'broken'])
+        self.assertTrue(speciesList[0][1].isIsomorphic(Molecule().fromSMILES('CC')))
+        self.assertTrue(isinstance(speciesList[1][1], basestring))
+
+    def test_species_list(self):
+        """
+        Tests parsing a list of SMILES and InChIs, labeled or not.
+        """
+        speciesList = parseSpeciesList('ethanol CCO\n\nInChI=1S/CH4/h1H4\n  [OH]  \n')
+        self.assertEqual([label for label, molecule in speciesList], ['ethanol', 'CH4(2)', 'HO(3)'])
+        self.assertTrue(speciesList[0][1].isIsomorphic(Molecule().fromSMILES('OCC')))
+        self.assertTrue(speciesList[1][1].isIsomorphic(Molecule().fromSMILES('C')))
+
+class TransportBatchTest(SimpleTestCase):
+
+    def setUp(self):
+        self.cache = transportcache._cache
+        transportcache._cache = LRUCache(16)
+        self.chunkSize = transportbatch.TRANSPORT_CHUNK_SIZE
+        transportbatch.TRANSPORT_CHUNK_SIZE = 2
+        self.ethanol = Molecule().fromSMILES('CCO')
+        self.water = Molecule().fromSMILES('O')
+        self.database = Record(transportGeneration=transportcache.newGeneration(),
+                               transport=Record(getTransportProperties=self.getTransportProperties))
+        self.speciesList = [
+            ('ethanol', Molecule().fromSMILES('CCO')),
+            ('methane', Molecule().fromSMILES('C')),
+            ('EtOH', Molecule().fromSMILES('OCC')),
+            ('broken', 'Not in the species dictionary'),
+            ('water', Molecule().fromSMILES('O')),
+            ('ethane', Molecule().fromSMILES('CC')),
+        ]
+        self.estimated = []
+
+    def tearDown(self):
+        transportcache._cache = self.cache
+        transportbatch.TRANSPORT_CHUNK_SIZE = self.chunkSize
+
+    def getTransportProperties(self, species):
+        """
+        Return made-up transport data for `species`, as if from a library for
+        ethanol and from the groups otherwise, and fail for water.
+        """
+        molecule = species.molecule[0]
+        self.estimated.append(molecule)
+        if molecule.isIsomorphic(self.water):
+            raise ValueError('No transport data for water')
+        if molecule.isIsomorphic(self.ethanol):
+            return Record(molecule=molecule), Record(label='Library'), Record(label='ethanol')
+        return Record(molecule=molecule), None, None
+
+    def getSources(self):
+        """
+        Return the label and source of the transport data of each species of
+        the test batch, and check the data of each is for that species.
+        """
+        sources = []
+        for (label, data, source), (speciesLabel, molecule) in zip(iterateBatchTransport(self.database, self.speciesList), self.speciesList):
+            self.assertEqual(label, speciesLabel)
+            if data is not None:
+                self.assertTrue(data.molecule.isIsomorphic(molecule))
+            sources.append((label, source))
+        return sources
+
+    def test_batch(self):
+        """
+        Tests that each distinct species is estimated once, in order and in
+        chunks, with the errors given in place of the species that failed.
+        """
+        sources = [
+            ('ethanol', 'Library (ethanol)'),
+            ('methane', 'Group additivity'),
+            ('EtOH', 'Library (ethanol)'),
+            ('broken', 'Not in the species dictionary'),
+            ('water', 'ValueError: No transport data for water'),
+            ('ethane', 'Group additivity'),
+        ]
+        self.assertEqual(self.getSources(), sources)
+        self.assertEqual(len(self.estimated), 4)
+        # Only the species that failed are estimated again
+        self.estimated = []
+        self.assertEqual(self.getSources(), sources)
+        self.assertEqual(len(self.estimated), 1)
+        self.assertTrue(self.estimated[0].isIsomorphic(self.water))
+
+    def test_no_generation(self):
+        """
+        Tests that nothing is cached for a database without a generation of
+        its transport data.
+        """
+        del self.database.transportGeneration
+        self.getSources()
+        self.getSources()
+        self.assertEqual(len(self.estimated), 8)
+        self.assertEqual(transportcache.getTransportCacheStats()['items'], 0)
+
+    def test_missing_entry(self):
+        """
+        Tests the line written for a species without transport data.
+        """
+        self.assertEqual(writeTransportEntry('water', None, 'No data'), '! water               No transport data: No data\n')
+
+class SolventScreenTest(SimpleTestCase):
+
+    def setUp(self):
+        def getSolvent(value):
+            parameters = ['s_g', 'b_g', 'e_g', 'l_g', 'a_g', 'c_g', 's_h', 'b_h', 'e_h', 'l_h', 'a_h', 'c_h']
+            return Record(data=Record(**dict([(name, value) for name in parameters])))
+        self.library = Record(entries={
+            'water': getSolvent(0.5),
+            'benzene': getSolvent(0.25),
+            'unknown': Record(data=None),
+        })
+        # Benzene lacks a Mintz parameter, so its enthalpy is not known
+        self.library.entries['benzene'].data.a_h = None
+
+    def test_parameters(self):
+        """
+        Tests that the solvents without data are left out, and the missing
+        parameters are NaN.
+        """
+        labels, abraham, mintz = getSolventParameters(self.library)
+        self.assertEqual(labels, ['benzene', 'water'])
+        self.assertEqual(abraham.shape, (2, 6))
+        self.assertTrue(numpy.isnan(mintz[0, 4]))
+        self.assertTrue(getSolventParameters(self.library)[1] is abraham)
+
+    def test_screen(self):
+        """
+        Tests the solvation corrections in each solvent against the Abraham
+        and Mintz equations.
+        """
+        soluteData = Record(S=1.0, B=2.0, E=3.0, L=4.0, A=5.0)
+        results = screenSolvents(Record(libraries={'solvent': self.library}), soluteData)
+        self.assertEqual([result['solvent'] for result in results], ['benzene', 'water'])
+        benzene, water = results
+        self.assertAlmostEqual(water['gibbs'], -8.314 * 298 * 2.303 * 0.5 * 16)
+        self.assertAlmostEqual(water['enthalpy'], -1000 * 0.5 * 16)
+        self.assertAlmostEqual(water['entropy'], (water['enthalpy'] - water['gibbs']) / 298)
+        self.assertAlmostEqual(benzene['gibbs'], -8.314 * 298 * 2.303 * 0.25 * 16)
+        self.assertEqual((benzene['enthalpy'], benzene['entropy']), (None, None))
+
+class SolvationBatchTest(SimpleTestCase):
+
+    def setUp(self):
+        self.cache = solutecache._cache
+        solutecache._cache = LRUCache(16)
+        self.ethanol = Molecule().fromSMILES('CCO')
+        self.water = Molecule().fromSMILES('O')
+        self.soluteData = {
+            'ethanol': SoluteData(S=0.42, B=0.48, E=0.246, L=1.485, A=0.37, V=0.4491),
+            'methane': SoluteData(S=0.0, B=0.0, E=0.0, L=-0.323, A=0.0, V=0.2495),
+        }
+        self.solvents = {
+            'water': SolventData(s_g=2.549, b_g=4.841, e_g=0.822, l_g=-0.213, a_g=3.603, c_g=-1.271,
+                                 s_h=-1.233, b_h=-1.951, e_h=-0.112, l_h=-0.385, a_h=-2.342, c_h=-3.042),
+            'octanol': SolventData(s_g=0.561, b_g=0.749, e_g=-0.198, l_g=0.86, a_g=3.46, c_g=-0.222,
+                                   s_h=-0.887, b_h=-1.126, e_h=0.155, l_h=-0.861, a_h=-1.833, c_h=0.106),
+        }
+        solventLibrary = Record(entries=dict([(label, Entry(label=label, data=data)) for label, data in self.solvents.iteritems()]))
+        solventLibrary.entries['unknown'] = Entry(label='unknown')
+        self.database = Record(solvationGeneration=solutecache.newGeneration(), solvation=Record(
+            libraries={'solvent': solventLibrary},
+            getAllSoluteData=self.getAllSoluteData,
+        ))
+        self.speciesList = [
+            ('ethanol', Molecule().fromSMILES('CCO')),
+            ('methane', Molecule().fromSMILES('C')),
+            ('EtOH', Molecule().fromSMILES('OCC')),
+            ('broken', 'Not in the species dictionary'),
+            ('water', Molecule().fromSMILES('O')),
+        ]
+        self.estimated = []
+
+    def tearDown(self):
+        solutecache._cache = self.cache
+
+    def getAllSoluteData(self, species):
+        """
+        Return the test solute data for `species`, as if from a library for
+        ethanol and from the groups for methane, and fail for water.
+        """
+        molecule = species.molecule[0]
+        self.estimated.append(molecule)
+        if molecule.isIsomorphic(self.water):
+            raise ValueError('No solute data for water')
+        if molecule.isIsomorphic(self.ethanol):
+            return [(self.soluteData['ethanol'], Record(name='Solute Library'), Record(label='ethanol'))]
+        return [(self.soluteData['methane'], None, None)]
+
+    def test_batch(self):
+        """
+        Tests the solvation of each species in each solvent against
+        :meth:`SolvationDatabase.getSolvationCorrection`, with each distinct
+        species estimated once.
+        """
+        results = getBatchSolvation(self.database, self.speciesList, ['water', 'octanol'])
+        self.assertEqual([result['label'] for result in results], ['ethanol', 'methane', 'EtOH', 'broken', 'water'])
+        self.assertEqual(len(self.estimated), 3)
+        self.assertEqual([result.get('source') for result in results],
+                         ['Solute Library (ethanol)', 'Group additivity', 'Solute Library (ethanol)', None, None])
+        self.assertEqual(results[3]['error'], 'Not in the species dictionary')
+        self.assertEqual(results[4]['error'], 'ValueError: No solute data for water')
+        solvation = SolvationDatabase()
+        for result, solute in [(results[0], 'ethanol'), (results[1], 'methane'), (results[2], 'ethanol')]:
+            self.assertEqual(result['soluteData']['L'], self.soluteData[solute].L)
+            self.assertEqual([solvent['solvent'] for solvent in result['solvents']], ['water', 'octanol'])
+            for solvent in result['solvents']:
+                correction = solvation.getSolvationCorrection(self.soluteData[solute], self.solvents[solvent['solvent']])
+                self.assertAlmostEqual(solvent['gibbs'], correction.gibbs, 6)
+                self.assertAlmostEqual(solvent['enthalpy'], correction.enthalpy, 6)
+                self.assertAlmostEqual(solvent['entropy'], correction.entropy, 6)
+
+        # Only the species that failed are estimated again
+        self.estimated = []
+        results = getBatchSolvation(self.database, self.speciesList)
+        self.assertEqual([solvent['solvent'] for solvent in results[0]['solvents']], ['octanol', 'water'])
+        self.assertEqual(len(self.estimated), 1)
+        self.assertTrue(self.estimated[0].isIsomorphic(self.water))
+
+    def test_unknown_solvent(self):
+        """
+        Tests that solvents without parameters are rejected.
+        """
+        self.assertRaises(ValueError, getBatchSolvation, self.database, self.speciesList, ['water', 'unknown'])
+        self.assertRaises(ValueError, getBatchSolvation, self.database, self.speciesList, ['benzene'])
+        self.assertEqual(self.estimated, [])
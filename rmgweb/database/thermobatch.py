@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+This module estimates the thermo data of a batch of species at once, for the
+bulk thermo page, which returns them as a Chemkin thermo file or as JSON.
+
+Each distinct species is estimated once, and the estimates are spread over the
+worker pool of the database (see ``DATABASE_REACTIONS_PROCESSES``) in chunks,
+all using the same version of the database. The results are yielded in the
+order of the species, each as soon as its chunk is done, so they can be
+streamed back.
+"""
+
+from rmgpy.chemkin import writeThermoEntry
+from rmgpy.molecule.molecule import Molecule
+from rmgpy.species import Species
+from rmgpy.thermo import NASA
+
+from rmgweb.database.canonical import SpeciesDict
+from rmgweb.database.tools import startDatabaseTasks
+
+################################################################################
+
+# The temperatures in K at which the heat capacities are given
+THERMO_TEMPERATURES = [300, 400, 500, 600, 800, 1000, 1500]
+
+# How many species to send to a worker process at a time
+THERMO_CHUNK_SIZE = 50
+
+# The start and end of a Chemkin thermo file, with its default temperatures
+CHEMKIN_THERMO_HEADER = 'THERMO ALL\n   300.000  1000.000  5000.000\n\n'
+CHEMKIN_THERMO_FOOTER = 'END\n'
+
+def parseSpeciesDictionary(text):
+    """
+    Return a list of the (label, molecule) pairs of the species in the RMG
+    species dictionary `text`, in which each species is given by its label
+    and adjacency list, separated from the next by a blank line. A species
+    that cannot be parsed gets the error message in place of its molecule.
+    """
+    speciesList = []
+    for block in text.replace('\r', '').split('\n\n'):
+        block = block.strip()
+        if not block:
+            continue
+        label = block.splitlines()[0].strip()
+        try:
+            species = Species().fromAdjacencyList(block)
+        except Exception, e:
+            speciesList.append((label, '{0}: {1!s}'.format(e.__class__.__name__, e)))
+        else:
+            speciesList.append((species.label, species.molecule[0]))
+    return speciesList
+
+def parseSpeciesList(text):
+    """
+    Return a list of the (label, molecule) pairs of the species in `text`,
+    which has a SMILES or InChI on each line, optionally after a label and a
+    space. Species without a label are labeled by their formula and position,
+    as RMG does. A species that cannot be parsed gets the error message in
+    place of its molecule.
+    """
+    speciesList = []
+    for line in text.splitlines():
+        tokens = line.split()
+        if not tokens:
+            continue
+        identifier = tokens[-1]
+        label = tokens[0] if len(tokens) > 1 else None
+        try:
+            if identifier.startswith('InChI='):
+                molecule = Molecule().fromInChI(str(identifier))
+            else:
+                molecule = Molecule().fromSMILES(str(identifier))
+        except Exception, e:
+            speciesList.append((label or identifier, '{0}: {1!s}'.format(e.__class__.__name__, e)))
+            continue
+        if label is None:
+            label = '{0}({1:d})'.format(molecule.getFormula(), len(speciesList) + 1)
+        speciesList.append((label, molecule))
+    return speciesList
+
+def getThermoSummary(data):
+    """
+    Return a dictionary of the enthalpy and entropy of formation at 298 K and
+    the heat capacities at the ``THERMO_TEMPERATURES`` given by the thermo
+    `data`, in SI units.
+    """
+    return {
+        'H298': data.getEnthalpy(298),
+        'S298': data.getEntropy(298),
+        'Cp': [data.getHeatCapacity(T) for T in THERMO_TEMPERATURES],
+    }
+
+def estimateSpeciesThermo(database, molecule):
+    """
+    Return a list of dictionaries describing each thermo entry and estimate
+    in `database` for `molecule`, and the NASA polynomials of the one RMG
+    would use (the first from a library, or else the group additivity
+    estimate) for the Chemkin thermo file.
+    """
+    species = Species(molecule=[molecule])
+    species.generateResonanceIsomers()
+    results = []
+    preferred = None
+    for data, library, entry in database.thermo.getAllThermoData(species):
+        if library is None:
+            result = {'source': 'Group additivity', 'type': 'group additivity'}
+        elif library in database.thermo.depository.values():
+            result = {'source': 'Depository', 'type': 'depository', 'depository': library.label, 'index': entry.index}
+        else:
+            result = {'source': library.name, 'type': 'library', 'library': library.label, 'index': entry.index}
+        if preferred is None and result['type'] != 'depository':
+            preferred = data
+        result.update(getThermoSummary(data))
+        result['thermo'] = repr(data)
+        results.append(result)
+    if preferred is None:
+        nasa = None
+    elif isinstance(preferred, NASA):
+        nasa = preferred
+    else:
+        nasa = preferred.toNASA(Tmin=100.0, Tmax=5000.0, Tint=1000.0)
+    return results, nasa
+
+def estimateThermoChunk(database, molecules):
+    """
+    Return a list of the results of :func:`estimateSpeciesThermo` for each of
+    `molecules`, with the error message in place of those that fail. Run by
+    the worker processes of the database pool.
+    """
+    chunk = []
+    for molecule in molecules:
+        try:
+            chunk.append(estimateSpeciesThermo(database, molecule))
+        except Exception, e:
+            chunk.append('{0}: {1!s}'.format(e.__class__.__name__, e))
+    return chunk
+
+def iterateBatchThermo(database, speciesList):
+    """
+    Yield a dictionary of the thermo data estimated in `database` for each of
+    the (label, molecule) pairs in `speciesList`, in order, with the Chemkin
+    thermo entry of the species under ``chemkin``, or else an ``error``
+    (which does not stop the rest of the species being yielded).
+    """
+    # Estimate each distinct species once
+    molecules = []
+    moleculeIndices = SpeciesDict()
+    rows = []
+    for label, molecule in speciesList:
+        if isinstance(molecule, basestring):
+            rows.append(None)
+            continue
+        index = moleculeIndices.setdefault(molecule, len(molecules))
+        if index == len(molecules):
+            molecules.append(molecule)
+        rows.append(index)
+    
+    chunks = [molecules[i:i+THERMO_CHUNK_SIZE] for i in range(0, len(molecules), THERMO_CHUNK_SIZE)]
+    pending = startDatabaseTasks(database, estimateThermoChunk, [(chunk,) for chunk in chunks])
+    estimates = []
+    
+    for (label, molecule), index in zip(speciesList, rows):
+        result = {'label': label}
+        if index is None:
+            result['error'] = molecule
+            yield result
+            continue
+        # Wait for the chunk of this species, if not already done
+        while len(estimates) <= index:
+            chunkIndex = len(estimates) // THERMO_CHUNK_SIZE
+            if pending is None:
+                estimates.extend(estimateThermoChunk(database, chunks[chunkIndex]))
+            else:
+                estimates.extend(pending[chunkIndex].get())
+        estimate = estimates[index]
+        result['smiles'] = molecule.toSMILES()
+        if isinstance(estimate, basestring):
+            result['error'] = estimate
+        else:
+            result['results'], nasa = estimate
+            if nasa is not None:
+                try:
+                    result['chemkin'] = writeThermoEntry(Species(label=label, molecule=[molecule], thermo=nasa))
+                except Exception, e:
+                    # Such as a label that cannot be written to a Chemkin file
+                    result['error'] = '{0}: {1!s}'.format(e.__class__.__name__, e)
+        yield result
+
+def writeBatchThermoEntry(result):
+    """
+    Return the Chemkin thermo file entry for a `result` yielded by
+    :func:`iterateBatchThermo`, or a comment explaining why there is none.
+    """
+    if 'chemkin' in result:
+        return result['chemkin']
+    return '! No thermo data for {0}: {1}\n'.format(result['label'], result.get('error', 'nothing was found'))
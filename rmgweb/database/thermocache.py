@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+This module caches the thermo data estimated for species, with their
+resonance isomers, so that each distinct species is estimated only once for
+as long as the thermo database is not reloaded, however many reactions of a
+kinetics search (or searches) it takes part in.
+
+The estimates are keyed by the canonical key of the species and the
+generation of the thermo database, a new one of which is started every time
+the thermo database is reloaded. Tautomers share a canonical key, so each
+key holds a list of (resonance isomers, estimate) pairs, and the molecule of
+a species is checked for isomorphism with the isomers before their estimate
+is used.
+"""
+
+import copy
+import uuid
+
+import rmgweb.settings
+from rmgweb.database.canonical import addToBucket, findInBucket, getSpeciesKey
+from rmgweb.database.lru import LRUCache
+
+################################################################################
+
+# The estimates cached in this process
+_cache = LRUCache(rmgweb.settings.DATABASE_THERMO_CACHE_SIZE)
+
+def newGeneration():
+    """
+    Return a new generation of the thermo database, to be stored as the
+    ``thermoGeneration`` of a database when its thermo is (re)loaded.
+    """
+    return uuid.uuid4().hex
+
+def getSpeciesThermo(database, species, estimate):
+    """
+    Give `species` its resonance isomers and the thermo data estimated for it
+    from `database`, using the cached estimate for the same species if there
+    is one. Otherwise the `estimate` function is called with the species to
+    find them, and its results are cached.
+    """
+    generation = getattr(database, 'thermoGeneration', None)
+    if generation is None:
+        estimate(species)
+        return
+    key = (generation, getSpeciesKey(species))
+    cached = findInBucket(_cache.get(key), species)
+    if cached is not None:
+        isomers, thermo = cached
+        species.molecule = [isomer.copy(deep=True) for isomer in isomers]
+        species.thermo = copy.deepcopy(thermo)
+        return
+    estimate(species)
+    isomers = [molecule.copy(deep=True) for molecule in species.molecule]
+    _cache.set(key, addToBucket(_cache.get(key), isomers, (isomers, copy.deepcopy(species.thermo))))
+
+def clearThermoCache():
+    """
+    Forget all the estimates cached in this process.
+    """
+    _cache.clear()
+
+def getThermoCacheStats():
+    """
+    Return a dictionary of the statistics of the estimates cached in this
+    process.
+    """
+    return _cache.getStats()
@@ -33,9 +33,15 @@ This module contains additional classes and functions used by the database
 app that don't belong to any other module.
 """
 
+import copy
+import gc
+import multiprocessing
 import socket
 import sys
 import os
+import threading
+import time
+import traceback
 import rmgweb.settings
 import pybel
 import openbabel as ob
@@ -47,13 +53,23 @@ from rmgpy.molecule.molecule import Molecule
 from rmgpy.species import Species
 from rmgpy.reaction import Reaction
 from rmgpy.data.base import Entry
-from rmgpy.data.kinetics import TemplateReaction, DepositoryReaction
+from rmgpy.data.kinetics import TemplateReaction, DepositoryReaction, KineticsLibrary, KineticsFamily, KineticsDepository
+from rmgpy.data.thermo import ThermoLibrary, ThermoDepository
+from rmgpy.data.transport import TransportLibrary
 from rmgweb.main.tools import *
+from rmgweb.database import reactioncache, reverserates, rulecache, snapshot, solutecache, thermocache, transportcache, watcher
+from rmgweb.database.canonical import SpeciesDict, getReactionKey
+from rmgweb.database.compact import compactDatabase
+from rmgweb.database.entryindex import indexEntries
+from rmgweb.database.lazy import LazyDict, loadAll
+from rmgweb.database.reactionindex import getCandidateDatabase, indexReactions
+from rmgweb.database.structureindex import indexStructures
 
 from rmgpy.data.thermo import ThermoDatabase
 from rmgpy.data.kinetics import KineticsDatabase
 from rmgpy.data.transport import TransportDatabase
 from rmgpy.data.rmg import SolvationDatabase
+import rmgpy.data.rmg
 from rmgpy.data.rmg import RMGDatabase
 from rmgpy.data.rmg import StatmechDatabase
 
@@ -61,6 +77,24 @@ from rmgpy.data.rmg import StatmechDatabase
 
 database = None
 
+# Whether we have already looked for a database snapshot in this process
+_snapshotChecked = False
+
+# The version of the database being served, which increases every time a newly
+# loaded database is swapped in, and when that happened
+_databaseVersion = 0
+_databaseLoadedAt = None
+
+# Held while loading the database, so only one thread loads at a time
+_loadLock = threading.RLock()
+
+# The parts of the database waiting to be reloaded in the background, the
+# thread reloading them, and the state of the current or last reload
+_reloadLock = threading.Lock()
+_reloadRequests = set()
+_reloadThread = None
+_reloadStatus = {'started': None, 'components': [], 'finished': None, 'error': None}
+
 ################################################################################
 
 _timestamps = {}
@@ -73,14 +107,39 @@ def resetTimestamp(path):
     mtime = os.stat(path).st_mtime
     _timestamps[path] = mtime
 
-def resetDirTimestamps(dirpath):
+# The directory watcher and its generation number for each directory when it
+# was last loaded
+_generations = {}
+
+def getDirGeneration(dirpath):
     """
-    Walk the directory tree from dirpath, calling resetTimestamp(file) on each file.
+    Return the current (watcher, generation) of the directory at dirpath.
+    Capture this before loading a directory and pass it to resetDirTimestamps()
+    afterwards, so that changes made while loading still trigger another reload.
+    """
+    dbwatcher = watcher.getWatcher()
+    dbwatcher.watch(dirpath)
+    return (dbwatcher, dbwatcher.getGeneration(dirpath))
+
+def resetDirTimestamps(dirpath, generation=None):
+    """
+    Mark the directory at dirpath as loaded at the given `generation` (by
+    default, the current one), so that isDirModified(dirpath) returns False
+    until something in it changes. The directory is added to this process's
+    watcher, and the timestamp of each file is also recorded, as that is what
+    a forked process (with a new watcher) checks against.
     """
     print "Resetting 'last loaded' timestamps for {0} in process {1}".format(dirpath, os.getpid())
+    if generation is None or generation[0] is not watcher.getWatcher():
+        generation = getDirGeneration(dirpath)
+    # Forget any files that have since been removed
+    for path in [path for path in _timestamps if path.startswith(dirpath + os.sep)]:
+        del _timestamps[path]
     for root, dirs, files in os.walk(dirpath):
         for name in files:
-            resetTimestamp(os.path.join(root,name))
+            if not watcher.isIgnored(name):
+                resetTimestamp(os.path.join(root,name))
+    _generations[dirpath] = generation
 
 def isFileModified(path):
     """
@@ -112,115 +171,927 @@ def isFileModified(path):
     # passed all tests
     return False
 
-def isDirModified(dirpath):
+def getModifiedFiles(dirpath):
     """
-    Returns True if anything in the directory at dirpath has been modified since resetDirTimestamps(dirpath).
+    Return the set of files in the directory at dirpath that have been added,
+    removed or modified since resetDirTimestamps(dirpath), by walking the
+    directory and checking the timestamp of every file.
     """
-    to_check = set([path for path in _timestamps if path.startswith(dirpath)])
+    modified = set()
+    to_check = set([path for path in _timestamps if path.startswith(dirpath + os.sep)])
     for root, dirs, files in os.walk(dirpath):
         for name in files:
             path = os.path.join(root,name)
+            if watcher.isIgnored(name):
+                continue
             if isFileModified(path):
-                return True
-            to_check.remove(path)
-    # If there's anything left in to_check, it's probably now gone and this will return True:
+                modified.add(path)
+            to_check.discard(path)
+    # If there's anything left in to_check, it's probably now gone:
     for path in to_check:
         if isFileModified(path):
-            return True
-    # Passed all tests.
+            modified.add(path)
+    return modified
+
+def isDirModifiedOnDisk(dirpath):
+    """
+    Returns True if anything in the directory at dirpath has been modified since
+    resetDirTimestamps(dirpath), by walking the directory and checking the
+    timestamp of every file.
+    """
+    return len(getModifiedFiles(dirpath)) > 0
+
+def isDirModified(dirpath):
+    """
+    Returns True if anything in the directory at dirpath has been modified since resetDirTimestamps(dirpath).
+    
+    Normally this just compares the directory's generation number from this
+    process's watcher with the one recorded when it was loaded. The files are
+    only walked the first time a directory is checked by a new watcher, e.g.
+    in a worker process forked after the database was loaded.
+    """
+    dbwatcher = watcher.getWatcher()
+    loaded = _generations.get(dirpath)
+    if loaded is not None and loaded[0] is dbwatcher:
+        return dbwatcher.getGeneration(dirpath) != loaded[1]
+    if loaded is None:
+        return True
+    # Start watching before checking the files, so no change can be missed
+    generation = getDirGeneration(dirpath)
+    if isDirModifiedOnDisk(dirpath):
+        return True
+    _generations[dirpath] = generation
     return False
 
+def isDirLoaded(dirpath):
+    """
+    Returns True if the directory at dirpath has been loaded at some point.
+    """
+    return dirpath in _generations
+
+def getDatabaseDirectories(component='', section=''):
+    """
+    Return a list of the directories that :func:`loadDatabase` loads the
+    requested `component` and `section` of the RMG database from.
+    """
+    directories = []
+    for dirComponent, dirSection in [
+        ('thermo', 'depository'),
+        ('thermo', 'libraries'),
+        ('thermo', 'groups'),
+        ('transport', 'libraries'),
+        ('transport', 'groups'),
+        ('solvation', None),
+        ('kinetics', 'libraries'),
+        ('kinetics', 'families'),
+        ('statmech', None),
+    ]:
+        if component not in [dirComponent, ''] or (dirSection is not None and section not in [dirSection, '']):
+            continue
+        subdirs = (dirComponent,) if dirSection is None else (dirComponent, dirSection)
+        directories.append(os.path.join(rmgweb.settings.DATABASE_PATH, *subdirs))
+    if component == 'kinetics' and section in ['families', '']:
+        # The families are trained using the thermo database
+        directories.extend(getDatabaseDirectories('thermo'))
+    return directories
+
+def loadDatabaseSnapshot():
+    """
+    Replace the global database with the one stored in the database snapshot,
+    if there is a snapshot matching the database files currently on disk.
+    Returns ``True`` if the snapshot was used.
+    """
+    if snapshot.getSnapshotKey() is None:
+        return False
+    generations = [(dirpath, getDirGeneration(dirpath)) for dirpath in getDatabaseDirectories()]
+    key = snapshot.getDatabaseKey()
+    snapshotDatabase = snapshot.loadSnapshot(key)
+    if snapshotDatabase is None:
+        return False
+    snapshotDatabase.reactionsGeneration = reactioncache.newGeneration(key if reactioncache.getReactionsCachePath() else None)
+    snapshotDatabase.thermoGeneration = thermocache.newGeneration()
+    snapshotDatabase.transportGeneration = transportcache.newGeneration()
+    snapshotDatabase.solvationGeneration = solutecache.newGeneration()
+    swapDatabase(snapshotDatabase)
+    # The snapshot contains the whole database, so every directory is now up to date
+    for dirpath, generation in generations:
+        resetDirTimestamps(dirpath, generation)
+    return True
+
+################################################################################
+
+# Some functions to reload only the libraries, depositories and families whose
+# files have changed, rather than the whole of a directory of the database.
+
+def getModifiedLabels(dirpath, getLabel):
+    """
+    Return the set of labels, given by getLabel(relpath) for the path of each
+    file relative to dirpath, of the parts of the database in dirpath that have
+    been added, removed or modified since resetDirTimestamps(dirpath).
+    Returns None if the whole directory needs loading instead, because it has
+    not been loaded before or getLabel() returns None for a modified file.
+    """
+    if dirpath not in _generations:
+        return None
+    labels = set()
+    for path in getModifiedFiles(dirpath):
+        label = getLabel(os.path.relpath(path, dirpath))
+        if label is None:
+            return None
+        labels.add(label)
+    return labels
+
+def setDatabasePart(container, order, label, function, *args):
+    """
+    Set container[label] to the part of the database (a library, family,
+    etc.) returned by function(*args), and add `label` to the list `order`
+    if given. If `container` is a :class:`LazyDict`, the part is only loaded
+    when it is first accessed.
+    """
+    if isinstance(container, LazyDict):
+        container.setLazy(label, function, *args)
+    else:
+        container[label] = function(*args)
+    if order is not None and label not in order:
+        order.append(label)
+
+def removeDatabasePart(container, order, label):
+    """
+    Remove the part of the database `label` from `container` and the list
+    `order`, if present.
+    """
+    container.pop(label, None)
+    if order is not None and label in order:
+        order.remove(label)
+
+def indexDatabase(db):
+    """
+    Index the entries of `db` (a library, depository, group or rules
+    database) by number and by the molecules they contain, and also by their
+    reactions for kinetics libraries and depositories. This must be redone
+    whenever its entries are changed.
+    """
+    indexEntries(db)
+    indexStructures(db)
+    if isinstance(db, (KineticsLibrary, KineticsDepository)):
+        indexReactions(db)
+    return db
+
+def prepareDatabase(db):
+    """
+    Prepare the freshly loaded `db` (a library, depository, group or rules
+    database) for serving, by compacting its entries and indexing them.
+    """
+    if db is not None:
+        compactDatabase(db)
+        indexDatabase(db)
+    return db
+
+def prepareDatabases(container):
+    """
+    Prepare each database in the dictionary `container`, such as the
+    libraries or groups of a component of the RMG database. Libraries waiting
+    to be loaded on first access are left alone; they are prepared as they
+    are loaded.
+    """
+    for label in container.keys():
+        if not isinstance(container, LazyDict) or container.isLoaded(label):
+            prepareDatabase(container[label])
+
+def prepareComponent(component):
+    """
+    Prepare the depository, libraries and groups of a `component` of the RMG
+    database, such as the solvation or statmech database.
+    """
+    for attr in ['depository', 'libraries', 'groups']:
+        container = getattr(component, attr, None)
+        if isinstance(container, dict):
+            prepareDatabases(container)
+    return component
+
+def getUntrainedReactions(family):
+    """
+    Return a depository containing unique reactions of the kinetics `family`
+    for which no training data exists. Reactions are compared by their
+    canonical keys, and those sharing a key checked for isomorphism.
+    """
+    
+    # Load training depository
+    for depository in family.depositories:
+        if 'training' in depository.label:
+            training = depository
+            break
+    else:
+        raise Exception('Could not find training depository in {0} family.'.format(family.label))
+    
+    def isKnown(reactions, reaction):
+        for other in reactions.get(getReactionKey(reaction), []):
+            if reaction.isIsomorphic(other):
+                return True
+        return False
+    
+    # Load trained reactions
+    trainedByKey = {}
+    for entry in training.entries.values():
+        trainedByKey.setdefault(getReactionKey(entry.item), []).append(entry.item)
+    
+    # Load untrained reactions
+    untrainedByKey = {}
+    untrainedReactions = []
+    for depository in family.depositories:
+        if 'training' not in depository.label:
+            for entry in depository.entries.values():
+                if not isKnown(trainedByKey, entry.item) and not isKnown(untrainedByKey, entry.item):
+                    untrainedByKey.setdefault(getReactionKey(entry.item), []).append(entry.item)
+                    untrainedReactions.append(entry.item)
+    
+    # Sort reactions by reactant size
+    untrainedReactions.sort(key=lambda reaction: sum([1 for r in reaction.reactants for a in r.molecule[0].atoms if a.isNonHydrogen()]))
+    
+    # Build entries
+    untrained = KineticsDepository(name='{0}/untrained'.format(family.label),
+                                   label='{0}/untrained'.format(family.label))
+    count = 1
+    for reaction in untrainedReactions:
+        untrained.entries['{0}'.format(count)] = Entry(
+            item = reaction,
+            index = count,
+            label = str(reaction),
+        )
+        count += 1
+    
+    return untrained
+
+def getUntrainedDepository(family):
+    """
+    Return the depository of untrained reactions of the kinetics `family`,
+    which is normally found when the family is loaded. Families loaded from
+    an older snapshot or rules cache get theirs found here instead.
+    """
+    untrained = getattr(family, 'untrainedDepository', None)
+    if untrained is None:
+        untrained = family.untrainedDepository = prepareDatabase(getUntrainedReactions(family))
+    return untrained
+
+def prepareFamily(family):
+    """
+    Prepare the groups, rules and depositories of the kinetics `family`, and
+    find its depository of untrained reactions.
+    """
+    prepareDatabase(family.groups)
+    prepareDatabase(family.rules)
+    for depository in family.depositories:
+        prepareDatabase(depository)
+    family.untrainedDepository = prepareDatabase(getUntrainedReactions(family))
+    return family
+
+def loadLibraryFile(databaseClass, libraryClass, path):
+    """
+    Load and return the thermo or transport library stored in the file at
+    `path`, using the contexts of the given `databaseClass`.
+    """
+    print "Loading {0} from {1}".format(libraryClass.__name__, path)
+    db = databaseClass()
+    library = libraryClass()
+    library.load(path, db.local_context, db.global_context)
+    library.label = os.path.splitext(os.path.basename(path))[0]
+    return prepareDatabase(library)
+
+def getKineticsLibraryFile(dirpath, label):
+    """
+    Return the path of the file in which the kinetics library `label` is
+    stored within dirpath, or None if there is no such library.
+    """
+    libraryPath = os.path.join(dirpath, label)
+    if not os.path.isdir(libraryPath):
+        return None
+    filenames = sorted([f for f in os.listdir(libraryPath) if os.path.splitext(f)[1].lower() == '.py'])
+    if 'reactions.py' in filenames:
+        return os.path.join(libraryPath, 'reactions.py')
+    return os.path.join(libraryPath, filenames[0]) if filenames else None
+
+def loadKineticsLibrary(dirpath, label):
+    """
+    Load and return the kinetics library `label` from its directory in dirpath.
+    """
+    path = getKineticsLibraryFile(dirpath, label)
+    print "Loading kinetics library {0} from {1}".format(label, path)
+    db = KineticsDatabase()
+    library = KineticsLibrary(label=label)
+    library.load(path, db.local_context, db.global_context)
+    return prepareDatabase(library)
+
+def trainKineticsFamily(family, thermoDatabase):
+    """
+    Add the rules from the training set of the kinetics `family` and fill in
+    the rest of its rate rules by averaging, using the given `thermoDatabase`.
+    """
+    oldentries = len(family.rules.entries)
+    family.addKineticsRulesFromTrainingSet(thermoDatabase=thermoDatabase)
+    newentries = len(family.rules.entries)
+    if newentries != oldentries:
+        print '{0} new entries added to {1} family after adding rules from training set.'.format(newentries-oldentries, family.label)
+    # Filling in rate rules in kinetics families by averaging...
+    family.fillKineticsRulesByAveragingUp()
+
+# The database whose thermo is used to train the kinetics families when loading
+# in parallel, which is inherited by the worker processes forked to load them
+_trainingDatabase = None
+
+def loadKineticsFamily(dirpath, label, thermoDatabase=None, thermoHash=None):
+    """
+    Load the kinetics family `label` from its directory in dirpath, train it
+    using `thermoDatabase` (by default, the thermo of _trainingDatabase) and
+    return it. The trained family is taken from the rules cache if it is
+    up to date, and saved there otherwise; `thermoHash` is the hash of the
+    thermo database files for its key, computed if not given.
+    """
+    t0 = time.time()
+    familyPath = os.path.join(dirpath, label)
+    key = rulecache.getFamilyKey(familyPath, thermoHash)
+    family = rulecache.loadTrainedFamily(label, key)
+    if family is not None:
+        print "Loaded trained kinetics family {0} from cache in {1:.1f} s in process {2}".format(label, time.time() - t0, os.getpid())
+        return family
+    kineticsDatabase = KineticsDatabase()
+    family = KineticsFamily(label=label)
+    family.load(familyPath, kineticsDatabase.local_context, kineticsDatabase.global_context, depositoryLabels='all')
+    if thermoDatabase is None:
+        thermoDatabase = _trainingDatabase.thermo
+    trainKineticsFamily(family, thermoDatabase)
+    prepareFamily(family)
+    rulecache.saveTrainedFamily(family, key)
+    print "Loaded kinetics family {0} in {1:.1f} s in process {2}".format(label, time.time() - t0, os.getpid())
+    return family
+
+def loadLibrariesLazily(db, libraryClass, dirpath):
+    """
+    Set up the thermo or transport libraries of `db` from the files in
+    dirpath, each to be loaded when first accessed.
+    """
+    db.libraries = LazyDict()
+    db.libraryOrder = []
+    for root, dirs, files in os.walk(dirpath):
+        for name in files:
+            label, ext = os.path.splitext(name)
+            if ext.lower() == '.py':
+                setDatabasePart(db.libraries, db.libraryOrder, label, loadLibraryFile, db.__class__, libraryClass, os.path.join(root, name))
+
+def loadKineticsLibrariesLazily(database, dirpath):
+    """
+    Set up the kinetics libraries of `database` from the directories in
+    dirpath, each to be loaded when first accessed.
+    """
+    database.kinetics.libraries = LazyDict()
+    database.kinetics.libraryOrder = []
+    for root, dirs, files in os.walk(dirpath):
+        dirs.sort()
+        label = os.path.relpath(root, dirpath)
+        if root != dirpath and getKineticsLibraryFile(dirpath, label):
+            setDatabasePart(database.kinetics.libraries, database.kinetics.libraryOrder, label, loadKineticsLibrary, dirpath, label)
+
+def loadKineticsFamiliesLazily(database, dirpath, thermoHash):
+    """
+    Set up the kinetics families of `database` from the directories in
+    dirpath, each to be loaded and trained when first accessed, using the
+    thermo database files with the given `thermoHash`.
+    """
+    database.kinetics.families = LazyDict()
+    for label in sorted(os.listdir(dirpath)):
+        if os.path.isdir(os.path.join(dirpath, label)) and not label.startswith('.'):
+            setDatabasePart(database.kinetics.families, None, label, loadKineticsFamily, dirpath, label, database.thermo, thermoHash)
+
+def loadLazyParts(database):
+    """
+    Load all the libraries and families of `database` that are waiting to be
+    loaded when first accessed. The families go last, as training them uses
+    the thermo libraries.
+    """
+    loadAll(database.thermo.libraries)
+    loadAll(database.transport.libraries)
+    loadAll(database.kinetics.libraries)
+    loadAll(database.kinetics.families)
+
+def reloadLibraryFile(db, libraryClass, path):
+    """
+    Reload the thermo or transport library stored in the file at `path` into
+    `db`, or remove it from `db` if the file has been removed.
+    """
+    label, ext = os.path.splitext(os.path.basename(path))
+    if ext.lower() != '.py':
+        return
+    if os.path.exists(path):
+        setDatabasePart(db.libraries, db.libraryOrder, label, loadLibraryFile, db.__class__, libraryClass, path)
+    else:
+        print "Removing {0} {1}".format(libraryClass.__name__, label)
+        removeDatabasePart(db.libraries, db.libraryOrder, label)
+
+def reloadThermoDepositoryFile(database, path):
+    """
+    Reload the thermo depository stored in the file at `path`, or remove it
+    if the file has been removed.
+    """
+    label, ext = os.path.splitext(os.path.basename(path))
+    if ext.lower() != '.py':
+        return
+    if os.path.exists(path):
+        print "Reloading thermo depository from {0}".format(path)
+        database.thermo.depository[label] = prepareDatabase(ThermoDepository().load(path, database.thermo.local_context, database.thermo.global_context))
+    else:
+        database.thermo.depository.pop(label, None)
+
+def reloadKineticsLibrary(database, dirpath, label):
+    """
+    Reload the kinetics library `label` from its directory in dirpath, or
+    remove it if the directory no longer contains a library.
+    """
+    if getKineticsLibraryFile(dirpath, label):
+        setDatabasePart(database.kinetics.libraries, database.kinetics.libraryOrder, label, loadKineticsLibrary, dirpath, label)
+    else:
+        print "Removing kinetics library {0}".format(label)
+        removeDatabasePart(database.kinetics.libraries, database.kinetics.libraryOrder, label)
+
+def reloadKineticsFamily(database, dirpath, label, thermoHash):
+    """
+    Reload and retrain the kinetics family `label` from its directory in
+    dirpath, using the thermo database files with the given `thermoHash`, or
+    remove it if the directory has been removed.
+    """
+    if os.path.isdir(os.path.join(dirpath, label)):
+        setDatabasePart(database.kinetics.families, None, label, loadKineticsFamily, dirpath, label, database.thermo, thermoHash)
+    else:
+        print "Removing kinetics family {0}".format(label)
+        removeDatabasePart(database.kinetics.families, None, label)
+
+def getFamilyLabel(relpath):
+    """
+    Return the label of the kinetics family containing the file at relpath
+    within the families directory, or None for files outside any family.
+    """
+    parts = relpath.split(os.sep)
+    return parts[0] if len(parts) > 1 else None
+
+def getKineticsLibraryLabel(relpath):
+    """
+    Return the label of the kinetics library containing the file at relpath
+    within the kinetics libraries directory, or None for files outside any library.
+    """
+    return os.path.dirname(relpath) or None
+
 ################################################################################
 
+def copyDatabase(database):
+    """
+    Return a copy of `database` that can be reloaded without changing
+    `database` itself. Only the containers of the libraries, groups,
+    depositories and families are copied; the objects in them are shared,
+    since reloading replaces those objects rather than modifying them.
+    """
+    newDatabase = copy.copy(database)
+    for name in ['thermo', 'transport', 'solvation', 'kinetics', 'statmech']:
+        component = copy.copy(getattr(database, name))
+        for attr in ['libraries', 'libraryOrder', 'groups', 'depository', 'families']:
+            if hasattr(component, attr):
+                setattr(component, attr, copy.copy(getattr(component, attr)))
+        setattr(newDatabase, name, component)
+    return newDatabase
+
+def swapDatabase(newDatabase):
+    """
+    Start serving `newDatabase` in place of the current global database.
+    Requests already being served keep the version they started with.
+    """
+    global database, _databaseVersion, _databaseLoadedAt
+    database = newDatabase
+    # RMG-Py looks up the families via its own global reference to the database
+    rmgpy.data.rmg.database = newDatabase
+    _databaseVersion += 1
+    _databaseLoadedAt = time.time()
+    # The workers of the reactions pool hold the old version, so let them go
+    closeReactionsPool()
+
+def loadDatabaseVersion(requests):
+    """
+    Load the parts of the database given as a list of (component, section)
+    `requests` into a copy of the current database, and then swap it in.
+    If loading fails, the current database is kept, and the directories are
+    left as they were, so they are loaded again next time.
+    Must be called with _loadLock held.
+    """
+    generations = _generations.copy()
+    timestamps = _timestamps.copy()
+    newDatabase = copyDatabase(database) if database else createDatabase()
+    # The kinetics searches depend on both the kinetics and thermo databases
+    reactionsDirectories = getDatabaseDirectories('kinetics')
+    contentKey = reactioncache.getContentKey(reactionsDirectories)
+    try:
+        for component, section in requests:
+            loadDatabaseComponents(newDatabase, component, section, processes=rmgweb.settings.DATABASE_LOAD_PROCESSES)
+    except:
+        _generations.clear()
+        _generations.update(generations)
+        _timestamps.clear()
+        _timestamps.update(timestamps)
+        raise
+    if any([_generations.get(dirpath) != generations.get(dirpath) for dirpath in reactionsDirectories]):
+        newDatabase.reactionsGeneration = reactioncache.newGeneration(contentKey)
+    if any([_generations.get(dirpath) != generations.get(dirpath) for dirpath in getDatabaseDirectories('thermo')]):
+        newDatabase.thermoGeneration = thermocache.newGeneration()
+    if any([_generations.get(dirpath) != generations.get(dirpath) for dirpath in getDatabaseDirectories('transport')]):
+        newDatabase.transportGeneration = transportcache.newGeneration()
+    if any([_generations.get(dirpath) != generations.get(dirpath) for dirpath in getDatabaseDirectories('solvation')]):
+        newDatabase.solvationGeneration = solutecache.newGeneration()
+    swapDatabase(newDatabase)
+
+def reloadDatabaseInBackground():
+    """
+    Reload the parts of the database requested since the last reload, as
+    recorded in _reloadRequests, into a copy of the database, and swap it in
+    when complete. Runs in the reload thread until no requests remain.
+    """
+    global _reloadThread
+    while True:
+        with _reloadLock:
+            requests = sorted(_reloadRequests)
+            _reloadRequests.clear()
+            if not requests:
+                _reloadThread = None
+                return
+        with _loadLock:
+            _reloadStatus.update({'started': time.time(), 'components': requests})
+            try:
+                loadDatabaseVersion(requests)
+            except Exception, e:
+                traceback.print_exc()
+                _reloadStatus['error'] = '{0}: {1!s}'.format(e.__class__.__name__, e)
+            else:
+                _reloadStatus['error'] = None
+            _reloadStatus.update({'started': None, 'components': [], 'finished': time.time()})
+
+def startBackgroundReload(component, section):
+    """
+    Request a reload of the given `component` and `section` of the database,
+    starting the reload thread if it is not already running.
+    """
+    global _reloadThread
+    with _reloadLock:
+        _reloadRequests.add((component, section))
+        if _reloadThread is None or not _reloadThread.isAlive():
+            _reloadThread = threading.Thread(target=reloadDatabaseInBackground, name='RMG database reload')
+            _reloadThread.setDaemon(True)
+            _reloadThread.start()
+
+def getDatabaseStatus():
+    """
+    Return a dictionary describing the version of the database currently
+    being served and any reload in progress.
+    """
+    with _reloadLock:
+        pending = sorted(_reloadRequests)
+    return {
+        'version': _databaseVersion,
+        'loadedAt': _databaseLoadedAt,
+        'process': os.getpid(),
+        'loaded': sorted([dirpath for dirpath in getDatabaseDirectories() if isDirLoaded(dirpath)]),
+        'modified': sorted([dirpath for dirpath in getDatabaseDirectories() if isDirLoaded(dirpath) and isDirModified(dirpath)]),
+        'reloading': _reloadStatus['started'] is not None,
+        'reloadStarted': _reloadStatus['started'],
+        'reloadComponents': ['/'.join([c for c in request if c]) or 'all' for request in _reloadStatus['components']],
+        'reloadPending': ['/'.join([c for c in request if c]) or 'all' for request in pending],
+        'lastReloadFinished': _reloadStatus['finished'],
+        'lastReloadError': _reloadStatus['error'],
+        'caches': {
+            'reactions': reactioncache.getReactionsCacheStats(),
+            'thermo': thermocache.getThermoCacheStats(),
+            'reverseRates': reverserates.getReverseRatesCacheStats(),
+            'transport': transportcache.getTransportCacheStats(),
+            'solute': solutecache.getSoluteCacheStats(),
+        },
+    }
+
 def loadDatabase(component='', section=''):
     """
     Load the requested `component` of the RMG database if modified since last loaded.
+    The first time anything is requested, a current database snapshot is used
+    in place of parsing the files, if one is available.
+    
+    Parts of the database that have never been loaded are loaded before
+    returning, as there is nothing to serve until they are. Parts that have
+    been modified since they were loaded are reloaded by a background thread,
+    and the current version of the database is returned in the meantime.
+    Either way, the loading is done on a copy of the database which then
+    replaces the global one, so a request never sees a partly loaded database.
     """
-    global database
-    if not database:
-        database = RMGDatabase()
-        database.solvation = SolvationDatabase()
-        database.thermo = ThermoDatabase()
-        database.kinetics = KineticsDatabase()
-        database.transport = TransportDatabase()
-        database.statmech = StatmechDatabase()
-        database.loadForbiddenStructures(os.path.join(rmgweb.settings.DATABASE_PATH, 'forbiddenStructures.py'))
-
+    global _snapshotChecked
     if component == 'initialize':
+        if not database:
+            swapDatabase(createDatabase())
+        return database
+    
+    directories = getDatabaseDirectories(component, section)
+    if all([isDirLoaded(dirpath) for dirpath in directories]):
+        if any([isDirModified(dirpath) for dirpath in directories]):
+            startBackgroundReload(component, section)
         return database
+    
+    with _loadLock:
+        if not _snapshotChecked:
+            _snapshotChecked = True
+            loadDatabaseSnapshot()
+        if not all([isDirLoaded(dirpath) for dirpath in directories]):
+            loadDatabaseVersion([(component, section)])
+    return database
+
+def createDatabase():
+    """
+    Return a new, empty RMG database.
+    """
+    database = RMGDatabase()
+    database.solvation = SolvationDatabase()
+    database.thermo = ThermoDatabase()
+    database.kinetics = KineticsDatabase()
+    database.transport = TransportDatabase()
+    database.statmech = StatmechDatabase()
+    database.loadForbiddenStructures(os.path.join(rmgweb.settings.DATABASE_PATH, 'forbiddenStructures.py'))
+    return database
+
+def sortThermoLibraries(database):
+    """
+    Put the thermo libraries in our preferred order, so that when we look up
+    thermo in order to estimate kinetics, we use our favorite values first.
+    """
+    preferred_order = ['primaryThermoLibrary','DFT_QCI_thermo','GRI-Mech3.0','CBS_QB3_1dHR','KlippensteinH2O2']
+    new_order = [i for i in preferred_order if i in database.thermo.libraryOrder]
+    for i in database.thermo.libraryOrder:
+        if i not in new_order: new_order.append(i) 
+    database.thermo.libraryOrder = new_order
+
+def loadDatabaseComponents(database, component='', section='', processes=1):
+    """
+    Load the requested `component` of the RMG database into `database`,
+    reloading only what has been modified since last loaded. When loading
+    the whole database for the first time, the work is spread over the given
+    number of `processes`.
+    """
+    if component == '' and processes > 1 and not any([isDirLoaded(dirpath) for dirpath in getDatabaseDirectories()]):
+        return loadDatabaseInParallel(database, processes)
+    
     if component in ['thermo', '']:
         if section in ['depository', '']:
             dirpath = os.path.join(rmgweb.settings.DATABASE_PATH, 'thermo', 'depository')
+            generation = getDirGeneration(dirpath)
             if isDirModified(dirpath):
-                database.thermo.loadDepository(dirpath)
-                resetDirTimestamps(dirpath)
+                paths = getModifiedLabels(dirpath, lambda relpath: os.path.join(dirpath, relpath))
+                if paths is None:
+                    database.thermo.loadDepository(dirpath)
+                    prepareDatabases(database.thermo.depository)
+                else:
+                    for path in paths:
+                        reloadThermoDepositoryFile(database, path)
+                resetDirTimestamps(dirpath, generation)
         if section in ['libraries', '']:
             dirpath = os.path.join(rmgweb.settings.DATABASE_PATH, 'thermo', 'libraries')
+            generation = getDirGeneration(dirpath)
             if isDirModified(dirpath):
-                database.thermo.loadLibraries(dirpath)
-                # put them in our preferred order, so that when we look up thermo in order to estimate kinetics,
-                # we use our favorite values first.
-                preferred_order = ['primaryThermoLibrary','DFT_QCI_thermo','GRI-Mech3.0','CBS_QB3_1dHR','KlippensteinH2O2']
-                new_order = [i for i in preferred_order if i in database.thermo.libraryOrder]
-                for i in database.thermo.libraryOrder:
-                    if i not in new_order: new_order.append(i) 
-                database.thermo.libraryOrder = new_order
-                resetDirTimestamps(dirpath)
+                paths = getModifiedLabels(dirpath, lambda relpath: os.path.join(dirpath, relpath))
+                if paths is None:
+                    loadLibrariesLazily(database.thermo, ThermoLibrary, dirpath)
+                else:
+                    for path in paths:
+                        reloadLibraryFile(database.thermo, ThermoLibrary, path)
+                sortThermoLibraries(database)
+                resetDirTimestamps(dirpath, generation)
         if section in ['groups', '']:
             dirpath = os.path.join(rmgweb.settings.DATABASE_PATH, 'thermo', 'groups')
+            generation = getDirGeneration(dirpath)
             if isDirModified(dirpath):
                 database.thermo.loadGroups(dirpath)
-                resetDirTimestamps(dirpath)  
+                prepareDatabases(database.thermo.groups)
+                resetDirTimestamps(dirpath, generation)
                               
     if component in ['transport', '']:
         if section in ['libraries', '']:
             dirpath = os.path.join(rmgweb.settings.DATABASE_PATH, 'transport', 'libraries')
+            generation = getDirGeneration(dirpath)
             if isDirModified(dirpath):
-                database.transport.loadLibraries(dirpath)
-                resetDirTimestamps(dirpath)
+                paths = getModifiedLabels(dirpath, lambda relpath: os.path.join(dirpath, relpath))
+                if paths is None:
+                    loadLibrariesLazily(database.transport, TransportLibrary, dirpath)
+                else:
+                    for path in paths:
+                        reloadLibraryFile(database.transport, TransportLibrary, path)
+                resetDirTimestamps(dirpath, generation)
         if section in ['groups', '']:
             dirpath = os.path.join(rmgweb.settings.DATABASE_PATH, 'transport', 'groups')
+            generation = getDirGeneration(dirpath)
             if isDirModified(dirpath):
                 database.transport.loadGroups(dirpath)
-                resetDirTimestamps(dirpath)
+                prepareDatabases(database.transport.groups)
+                resetDirTimestamps(dirpath, generation)
                 
     if component in ['solvation', '']:
         dirpath = os.path.join(rmgweb.settings.DATABASE_PATH, 'solvation')
+        generation = getDirGeneration(dirpath)
         if isDirModified(dirpath):
             database.solvation.load(dirpath)
-            resetDirTimestamps(dirpath)
+            prepareComponent(database.solvation)
+            resetDirTimestamps(dirpath, generation)
                 
     if component in ['kinetics', '']:
         if section in ['libraries', '']:
             dirpath = os.path.join(rmgweb.settings.DATABASE_PATH, 'kinetics', 'libraries')
+            generation = getDirGeneration(dirpath)
             if isDirModified(dirpath):
-                database.kinetics.loadLibraries(dirpath)
-                resetDirTimestamps(dirpath)
+                labels = getModifiedLabels(dirpath, getKineticsLibraryLabel)
+                if labels is None:
+                    loadKineticsLibrariesLazily(database, dirpath)
+                else:
+                    for label in labels:
+                        reloadKineticsLibrary(database, dirpath, label)
+                resetDirTimestamps(dirpath, generation)
         if section in ['families', '']:
             dirpath = os.path.join(rmgweb.settings.DATABASE_PATH, 'kinetics', 'families')
+            # Make sure to load the entire thermo database prior to adding training values to the rules
+            loadDatabaseComponents(database, 'thermo', '')
+            generation = getDirGeneration(dirpath)
             if isDirModified(dirpath):
-                database.kinetics.loadFamilies(dirpath, families = 'all', depositories = 'all')
-                resetDirTimestamps(dirpath)
-                
-                # Make sure to load the entire thermo database prior to adding training values to the rules
-                loadDatabase('thermo','')
-                for family in database.kinetics.families.values():
-                    oldentries = len(family.rules.entries)
-                    family.addKineticsRulesFromTrainingSet(thermoDatabase=database.thermo)
-                    newentries = len(family.rules.entries)
-                    if newentries != oldentries:
-                        print '{0} new entries added to {1} family after adding rules from training set.'.format(newentries-oldentries, family.label)
-                    # Filling in rate rules in kinetics families by averaging...
-                    family.fillKineticsRulesByAveragingUp()
+                # The thermo database is the same for every family
+                thermoHash = rulecache.getThermoHash()
+                labels = getModifiedLabels(dirpath, getFamilyLabel)
+                if labels is None:
+                    loadKineticsFamiliesLazily(database, dirpath, thermoHash)
+                else:
+                    for label in labels:
+                        reloadKineticsFamily(database, dirpath, label, thermoHash)
+                resetDirTimestamps(dirpath, generation)
                     
     if component in ['statmech', '']:
         dirpath = os.path.join(rmgweb.settings.DATABASE_PATH, 'statmech')
+        generation = getDirGeneration(dirpath)
         if isDirModified(dirpath):
             database.statmech.load(dirpath)
-            resetDirTimestamps(dirpath)
+            prepareComponent(database.statmech)
+            resetDirTimestamps(dirpath, generation)
 
     return database
 
+################################################################################
+
+# Functions for loading the whole database in parallel. Each of the functions
+# run by the worker processes loads one directory into a new database object
+# and returns the parts of it to be merged into the main database.
+
+def loadDirectory(component, section, dirpath):
+    """
+    Load the `component` and `section` of the database in the directory at
+    `dirpath`, and return what was loaded. Run in a worker process.
+    """
+    t0 = time.time()
+    if component == 'thermo':
+        db = ThermoDatabase()
+        if section == 'depository':
+            db.loadDepository(dirpath)
+            result = db.depository
+        elif section == 'libraries':
+            db.loadLibraries(dirpath)
+            result = (db.libraries, db.libraryOrder)
+        else:
+            db.loadGroups(dirpath)
+            result = db.groups
+    elif component == 'transport':
+        db = TransportDatabase()
+        if section == 'libraries':
+            db.loadLibraries(dirpath)
+            result = (db.libraries, db.libraryOrder)
+        else:
+            db.loadGroups(dirpath)
+            result = db.groups
+    elif component == 'kinetics':
+        db = KineticsDatabase()
+        db.loadLibraries(dirpath)
+        result = (db.libraries, db.libraryOrder)
+    elif component == 'solvation':
+        result = SolvationDatabase()
+        result.load(dirpath)
+    elif component == 'statmech':
+        result = StatmechDatabase()
+        result.load(dirpath)
+    prepareComponent(result if component in ['solvation', 'statmech'] else db)
+    print "Loaded {0} in {1:.1f} s in process {2}".format(dirpath, time.time() - t0, os.getpid())
+    return result
+
+def loadDatabaseInParallel(database, processes):
+    """
+    Load the whole RMG database into `database` using a pool of the given
+    number of worker `processes`, whose results are merged into `database`.
+    
+    The directories are independent of one another, apart from the kinetics
+    families, which are trained using the thermo database. So each directory
+    is loaded by a worker, and as soon as the thermo database is complete a
+    second pool of workers is forked (with a copy of it) that loads and
+    trains one family each.
+    """
+    global _trainingDatabase
+    # The loaded objects are returned by pickling them, which needs a deep stack
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+    
+    directories = [
+        ('thermo', 'depository'),
+        ('thermo', 'libraries'),
+        ('thermo', 'groups'),
+        ('transport', 'libraries'),
+        ('transport', 'groups'),
+        ('solvation', ''),
+        ('kinetics', 'libraries'),
+        ('statmech', ''),
+    ]
+    familiesPath = os.path.join(rmgweb.settings.DATABASE_PATH, 'kinetics', 'families')
+    generations = dict([(dirpath, getDirGeneration(dirpath)) for dirpath in getDatabaseDirectories()])
+    
+    pool = multiprocessing.Pool(processes)
+    familyPool = None
+    try:
+        results = {}
+        for component, section in directories:
+            dirpath = os.path.join(rmgweb.settings.DATABASE_PATH, component, section) if section else os.path.join(rmgweb.settings.DATABASE_PATH, component)
+            results[component, section] = pool.apply_async(loadDirectory, (component, section, dirpath))
+        pool.close()
+        
+        database.thermo.depository = results['thermo', 'depository'].get()
+        database.thermo.libraries, database.thermo.libraryOrder = results['thermo', 'libraries'].get()
+        sortThermoLibraries(database)
+        database.thermo.groups = results['thermo', 'groups'].get()
+        
+        _trainingDatabase = database
+        familyLabels = sorted([label for label in os.listdir(familiesPath)
+                               if os.path.isdir(os.path.join(familiesPath, label)) and not label.startswith('.')])
+        # Hash the thermo database once here, rather than in every worker
+        thermoHash = rulecache.getThermoHash()
+        familyPool = multiprocessing.Pool(processes)
+        familyResults = [(label, familyPool.apply_async(loadKineticsFamily, (familiesPath, label, None, thermoHash))) for label in familyLabels]
+        familyPool.close()
+        
+        database.transport.libraries, database.transport.libraryOrder = results['transport', 'libraries'].get()
+        database.transport.groups = results['transport', 'groups'].get()
+        database.solvation = results['solvation', ''].get()
+        database.kinetics.libraries, database.kinetics.libraryOrder = results['kinetics', 'libraries'].get()
+        database.statmech = results['statmech', ''].get()
+        database.kinetics.families = {}
+        for label, result in familyResults:
+            database.kinetics.families[label] = result.get()
+    finally:
+        _trainingDatabase = None
+        pool.terminate()
+        if familyPool is not None:
+            familyPool.terminate()
+    
+    for dirpath, generation in generations.iteritems():
+        resetDirTimestamps(dirpath, generation)
+    return database
+
+# The garbage collection thresholds of this process before they were raised
+# by preloadDatabase, or None if they were not
+_gcThreshold = None
+
+def preloadDatabase(fork=False):
+    """
+    Load the whole RMG database into the current process, including every
+    library and family that would otherwise be loaded on first access.
+    
+    If `fork` is ``True``, the database is to be shared copy-on-write with
+    worker processes about to be forked from this one, which is then left
+    to do little more than fork them. A full collection touches every object
+    and so copies the pages holding them, so the garbage collector is run
+    once and then stopped from traversing the loaded objects in this process:
+    with :func:`gc.freeze` where available (from Python 3.7), or else by
+    disabling collections of the oldest generation until
+    :func:`restoreGarbageCollection` is called in each forked worker.
+    """
+    global _gcThreshold
+    loadLazyParts(loadDatabase())
+    if fork:
+        gc.collect()
+        if hasattr(gc, 'freeze'):
+            gc.freeze()
+        elif _gcThreshold is None:
+            _gcThreshold = gc.get_threshold()
+            gc.set_threshold(_gcThreshold[0], _gcThreshold[1], sys.maxint)
+    print "Preloaded the RMG database in process {0}".format(os.getpid())
+    return database
+
+def restoreGarbageCollection():
+    """
+    Restore the garbage collection thresholds raised by
+    :func:`preloadDatabase` in the process it was called in. Call it in each
+    worker process just after it is forked, so the workers collect all their
+    garbage as usual; their full collections do gradually copy the pages of
+    the shared database, which recycling the workers now and then returns.
+    """
+    global _gcThreshold
+    if _gcThreshold is not None:
+        gc.set_threshold(*_gcThreshold)
+        _gcThreshold = None
+
 def getTransportDatabase(section, subsection):
     """
     Return the component of the transport database corresponding to the
@@ -313,6 +1184,8 @@ def getKineticsDatabase(section, subsection):
                     db = family.groups
                 elif subsection[1] == 'rules':
                     db = family.rules
+                elif subsection[1] == 'untrained':
+                    db = getUntrainedDepository(family)
                 else:
                     label = '{0}/{1}'.format(family.label, subsection[1])
                     db = (d for d in family.depositories if d.label==label).next()
@@ -327,41 +1200,281 @@ def getKineticsDatabase(section, subsection):
 def generateSpeciesThermo(species, database):
     """
     Generate the thermodynamics data for a given :class:`Species` object
-    `species` using the provided `database`.
+    `species` using the provided `database`. The estimates are cached (see
+    :mod:`rmgweb.database.thermocache`), so each species is only estimated
+    once until the thermo database is reloaded.
     """
-    species.generateResonanceIsomers()
-    species.thermo = database.thermo.getThermoData(species)
+    def estimate(species):
+        species.generateResonanceIsomers()
+        species.thermo = database.thermo.getThermoData(species)
+    thermocache.getSpeciesThermo(database, species, estimate)
         
 ################################################################################
 
-def generateReactions(database, reactants, products=None, only_families=None):
+def generateReactionsFromLibraries(database, reactants, products=None):
     """
-    Generate the reactions (and associated kinetics) for a given set of
-    `reactants` and an optional set of `products`. A list of reactions is
-    returned, with a reaction for each matching kinetics entry in any part of
-    the database. This means that the same reaction may appear multiple times
-    with different kinetics in the output. If the RMG-Java server is running,
-    this function will also query it for reactions and kinetics.
-    If `only_families` is a list of strings, only those labeled families are 
-    used: no libraries and no RMG-Java kinetics are returned.
+    Generate the reactions between the given `reactants` (and, if given,
+    `products`) found in the kinetics libraries of `database`, as
+    :meth:`KineticsDatabase.generateReactionsFromLibraries` does, but only
+    searching the library entries that the reaction index gives as candidates.
     """
-    from rmgpy.rmg.model import getFamilyLibraryObject
-    # get RMG-py reactions
     reactionList = []
-    if only_families is None:
-        # Not restricted to certain families, so also check libraries.
-        reactionList.extend(database.kinetics.generateReactionsFromLibraries(reactants, products))
-    reactionList.extend(database.kinetics.generateReactionsFromFamilies(reactants, products, only_families=only_families))
-    if len(reactants) == 1:
-        # if only one reactant, react it with itself bimolecularly, with RMG-py
-        # the java version already does this (it includes A+A reactions when you react A)
-        reactants2 = [reactants[0], reactants[0]]
-        if only_families is None:
-            # Not restricted to certain families, so also check libraries.
-            reactionList.extend(database.kinetics.generateReactionsFromLibraries(reactants2, products))
-        reactionList.extend(database.kinetics.generateReactionsFromFamilies(reactants2, products, only_families=only_families))
+    for label in database.kinetics.libraryOrder:
+        library = database.kinetics.libraries[label]
+        candidates = getCandidateDatabase(library, reactants, products)
+        if candidates.entries:
+            for reaction in database.kinetics.generateReactionsFromLibrary(reactants, products, candidates):
+                reaction.library = library
+                reactionList.append(reaction)
+    return reactionList
+
+def getFamilyKinetics(family, reaction, template, degeneracy):
+    """
+    Return all the kinetics for `reaction` from the kinetics `family`, as
+    :meth:`KineticsFamily.getKinetics` does, but only searching the
+    depository entries that the reaction index gives as candidates.
+    """
+    candidateFamily = copy.copy(family)
+    candidateFamily.depositories = []
+    depositories = {}
+    for depository in family.depositories:
+        candidates = getCandidateDatabase(depository, reaction.reactants, reaction.products)
+        candidateFamily.depositories.append(candidates)
+        depositories[id(candidates)] = depository
+    kineticsList = candidateFamily.getKinetics(reaction, template=template, degeneracy=degeneracy, returnAllKinetics=True)
+    return [[kinetics, depositories.get(id(source), source), entry, isForward] for kinetics, source, entry, isForward in kineticsList]
+
+# The pool of worker processes that generate reactions from the kinetics
+# families in parallel (and run other batches of searches, such as bulk thermo
+# estimates), the database the workers were forked with, which they use in
+# place of the global one, and the process that forked them
+_reactionsPool = None
+_reactionsDatabase = None
+_reactionsPoolProcess = None
+_reactionsPoolLock = threading.Lock()
+
+# Whether this process is one of the workers of the reactions pool, which
+# must not use the pool themselves
+_reactionsWorker = False
+
+def initReactionsWorker():
+    """
+    Set up a newly forked worker process of the reactions pool.
+    """
+    global _reactionsWorker
+    _reactionsWorker = True
+
+def startReactionsPool():
+    """
+    Fork the pool of worker processes for generating reactions from the
+    families of the database being served in parallel, and for the other
+    batches of searches, if ``DATABASE_REACTIONS_PROCESSES`` is above 1.
+    
+    The workers inherit the locks of the forking process as they are, so this
+    must be called before the process starts any other thread (such as those
+    watching the database files, reloading the database or serving requests),
+    and after the database has been preloaded, so the workers share it:
+    for example in gunicorn's ``post_fork`` hook (see
+    ``apache/gunicorn.conf.py.example``). Whenever a new version of the
+    database is swapped in, the workers are closed, and a new pool is forked
+    with it by the next search (see :func:`getReactionsPool`).
+    """
+    global _reactionsPoolProcess
+    if rmgweb.settings.DATABASE_REACTIONS_PROCESSES <= 1 or _reactionsWorker:
+        return
+    with _reactionsPoolLock:
+        if _reactionsPool is not None and _reactionsPoolProcess == os.getpid():
+            return
+        _reactionsPoolProcess = os.getpid()
+        forkReactionsPool()
+
+def forkReactionsPool():
+    """
+    Fork a new pool of worker processes with the database being served,
+    once the workers of any old pool have exited. Must be called with
+    _reactionsPoolLock held, and at a point where no other thread holds a
+    lock the workers use.
+    """
+    global _reactionsPool, _reactionsDatabase
+    if _reactionsPool is not None:
+        _reactionsPool.close()
+        _reactionsPool.join()
+        _reactionsPool = None
+    # The reactions are returned by pickling them, which needs a deep stack
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+    _reactionsDatabase = database
+    _reactionsPool = multiprocessing.Pool(rmgweb.settings.DATABASE_REACTIONS_PROCESSES, initializer=initReactionsWorker)
+
+def closeReactionsPool():
+    """
+    Let the workers of the reactions pool exit once they have finished the
+    searches they were given, freeing their copy of an old version of the
+    database. Called when a new version is swapped in.
+    """
+    global _reactionsDatabase
+    with _reactionsPoolLock:
+        if _reactionsPool is not None and _reactionsPoolProcess == os.getpid():
+            _reactionsPool.close()
+            _reactionsDatabase = None
+
+def getReactionsPool(db):
+    """
+    Return the pool of worker processes started by :func:`startReactionsPool`
+    if this process started it and its workers have the database `db`, or
+    ``None`` if the searches in `db` are to be made serially. Must be called
+    with _reactionsPoolLock held.
+    
+    If `db` is the database being served but the workers have an older
+    version, a new pool is forked with it first. The only other threads of a
+    process serving requests one at a time are the watcher threads, which
+    hold no lock the workers use, and the reload thread, which holds
+    _loadLock while it is loading; so the pool is only forked if _loadLock
+    is free, and otherwise this search is made serially.
+    """
+    if _reactionsPool is None or _reactionsWorker or _reactionsPoolProcess != os.getpid():
+        return None
+    if _reactionsDatabase is not db:
+        if db is not database or not _loadLock.acquire(False):
+            return None
+        try:
+            if db is not database:
+                return None
+            forkReactionsPool()
+        finally:
+            _loadLock.release()
+    return _reactionsPool
+
+def runDatabaseTask(function, args):
+    """
+    Return the result of calling `function` with the database the reactions
+    pool was forked with, followed by the given `args`. Run by the worker
+    processes of the reactions pool.
+    """
+    return function(_reactionsDatabase, *args)
+
+def startDatabaseTasks(database, function, argsList):
+    """
+    Start calling the module-level `function` on the reactions pool for each
+    tuple of arguments in `argsList`, as ``function(database, *args)``, where
+    the workers use their own copy of `database`. Returns a list of the
+    pending results, or ``None`` if the calls are to be made serially instead.
+    """
+    with _reactionsPoolLock:
+        pool = getReactionsPool(database)
+        if pool is None:
+            return None
+        return [pool.apply_async(runDatabaseTask, (function, args)) for args in argsList]
+
+def packTemplateReaction(reaction):
+    """
+    Return the reaction generated by a family, and its reverse if any, in a
+    form that can be sent from a worker process without also sending the
+    family's group trees, by replacing their templates with the labels of
+    their groups.
+    """
+    reverse = getattr(reaction, 'reverse', None)
+    if reverse is not None:
+        delattr(reaction, 'reverse')
+        reverse = packTemplateReaction(reverse)
+    template = [entry.label for entry in reaction.template]
+    reaction.template = None
+    return reaction, template, reverse
+
+def unpackTemplateReaction(database, packed):
+    """
+    Return the reaction packed by :func:`packTemplateReaction`, with the
+    groups of its template looked up in the families of `database`.
+    """
+    reaction, template, reverse = packed
+    groups = database.kinetics.families[reaction.family].groups
+    reaction.template = [groups.entries[label] for label in template]
+    if reverse is not None:
+        reaction.reverse = unpackTemplateReaction(database, reverse)
+    return reaction
+
+def generateFamilyReactions(label, reactants, products):
+    """
+    Return the reactions, packed by :func:`packTemplateReaction`, generated
+    by the kinetics family `label` for the given `reactants` and `products`.
+    Run by the worker processes of the reactions pool.
+    """
+    reactionList = _reactionsDatabase.kinetics.generateReactionsFromFamilies(reactants, products, only_families=[label])
+    return [packTemplateReaction(reaction) for reaction in reactionList]
+
+def startFamilyReactions(database, reactantsList, products, only_families):
+    """
+    Start generating the reactions from the families of `database` for each
+    list of reactants in `reactantsList` on the reactions pool, one family at
+    a time. Returns a list of the pending results for each list of reactants,
+    in the order the families are searched when generating serially, or
+    ``None`` if the reactions are to be generated serially instead. Any
+    families not loaded before the pool was forked are loaded by the workers
+    as they are first searched.
+    """
+    with _reactionsPoolLock:
+        pool = getReactionsPool(database)
+        if pool is None:
+            return None
+        labels = [label for label in database.kinetics.families.keys() if only_families is None or label in only_families]
+        return [[pool.apply_async(generateFamilyReactions, (label, reactants, products)) for label in labels]
+                for reactants in reactantsList]
+
+def getFamilyReactions(database, result):
+    """
+    Return a list of the reactions generated by one family on the reactions
+    pool, from its pending `result` given by :func:`startFamilyReactions`.
+    """
+    return [unpackTemplateReaction(database, packed) for packed in result.get()]
+
+def startRMGJavaKinetics(reactantList, productList=None):
+    """
+    Start querying RMG-Java for the reactions of the given reactants and
+    products, as :func:`getRMGJavaKinetics` does, in a background thread, so
+    that its response can be awaited while the rest of the database is
+    searched. Returns a function that waits for the response and returns the
+    list of reactions.
+    """
+    # RMG-Java clears the labeled atoms of the molecules, so send it copies
+    reactantList = [reactant.copy(deep=True) for reactant in reactantList]
+    productList = [product.copy(deep=True) for product in productList] if productList else None
+    reactionList = []
+    thread = threading.Thread(target=lambda: reactionList.extend(getRMGJavaKinetics(reactantList, productList)), name='RMG-Java query')
+    thread.setDaemon(True)
+    thread.start()
+    def wait():
+        thread.join()
+        return reactionList
+    return wait
+
+class GeneratedReactions(tuple):
+    """
+    The result of :func:`generateReactions`, which unpacks as the pair
+    (reactionList, rmgJavaReactionList). It also holds `familyReactions`, a
+    dictionary giving for each family that generated any of the reactions the
+    first of them estimated from its rate rules or groups, as a
+    :class:`Reaction` whose species are copies made before anything else
+    (such as generating their thermo) could change their structures. These
+    keep the atoms labeled as in the family's template, for prefilling a new
+    entry for the family's training set.
+    """
+
+    def __new__(cls, reactionList, rmgJavaReactionList, familyReactions=None):
+        self = tuple.__new__(cls, (reactionList, rmgJavaReactionList))
+        self.familyReactions = familyReactions if familyReactions is not None else {}
+        return self
+
+def getReactionsKinetics(reactionList, familyReactions):
+    """
+    Return a list of the reactions in `reactionList` with their kinetics. The
+    reactions that already have kinetics (e.g. from a library) are kept as
+    they are, and each reaction generated by a family is replaced by a
+    reaction for each matching kinetics entry in the family's depositories
+    and for its estimate from the rate rules or groups. The first estimated
+    reaction of each family is stored in the `familyReactions` dictionary as
+    described for :class:`GeneratedReactions`.
+    """
+    from rmgpy.rmg.model import getFamilyLibraryObject
     
-    # get RMG-py kinetics
     reactionList0 = reactionList; reactionList = []
     for reaction in reactionList0:
         # If the reaction already has kinetics (e.g. from a library),
@@ -374,9 +1487,9 @@ def generateReactions(database, reactants, products=None, only_families=None):
             assert isinstance(reaction, TemplateReaction)
             # Get all of the kinetics for the reaction
             family = getFamilyLibraryObject(reaction.family)
-            kineticsList = family.getKinetics(reaction, template=reaction.template, degeneracy=reaction.degeneracy, returnAllKinetics=True)
+            kineticsList = getFamilyKinetics(family, reaction, template=reaction.template, degeneracy=reaction.degeneracy)
             if family.ownReverse and hasattr(reaction,'reverse'):
-                kineticsListReverse = family.getKinetics(reaction.reverse, template=reaction.reverse.template, degeneracy=reaction.reverse.degeneracy, returnAllKinetics=True)
+                kineticsListReverse = getFamilyKinetics(family, reaction.reverse, template=reaction.reverse.template, degeneracy=reaction.reverse.degeneracy)
                 for kinetics, source, entry, isForward in kineticsListReverse:
                     for kinetics0, source0, entry0, isForward0 in kineticsList:
                         if source0 is not None and source is not None and entry0 is entry and isForward != isForward0:
@@ -405,6 +1518,8 @@ def generateReactions(database, reactants, products=None, only_families=None):
                         family = reaction.family,
                         estimator = source,
                     )
+                    if reaction.family not in familyReactions:
+                        familyReactions[reaction.family] = Reaction(reactants=copy.deepcopy(reactant_species), products=copy.deepcopy(product_species))
                 else:
                     rxn = DepositoryReaction(
                         reactants = reactant_species,
@@ -418,15 +1533,104 @@ def generateReactions(database, reactants, products=None, only_families=None):
                     )                    
                     
                 reactionList.append(rxn)
+    return reactionList
+
+def iterateReactions(database, reactants, products=None, only_families=None, cache=True, rmgJava=True):
+    """
+    Generate the reactions (and associated kinetics) for a given set of
+    `reactants` and an optional set of `products`, as :func:`generateReactions`
+    does, but yielding them in batches as they are found, each a
+    :class:`GeneratedReactions` pair of the new reactions. The reactions from
+    the libraries come first, then those from each family in turn, and those
+    from RMG-Java, which is queried in the background in the meantime, last.
     
-    # get RMG-java reactions
+    The results are cached once all the batches have been yielded, unless
+    `cache` is ``False``. A cached result is yielded as a single batch.
+    If `rmgJava` is ``False``, RMG-Java is not queried.
+    """
+    key = reactioncache.getReactionsKey(reactants, products, only_families)
+    result = reactioncache.getCachedReactions(database, key, reactants, products) if cache else None
+    if result is not None:
+        reactionList, rmgJavaReactionList, familyReactions = result
+        if only_families is None and rmgJava and not rmgJavaReactionList:
+            # RMG-Java may just not have been running, so ask it again
+            rmgJavaReactionList = getRMGJavaKinetics(reactants, products)
+            if rmgJavaReactionList:
+                reactioncache.cacheReactions(database, key, (reactionList, rmgJavaReactionList, familyReactions), reactants, products)
+        yield GeneratedReactions(reactionList, rmgJavaReactionList, familyReactions)
+        return
+    
+    # Not restricted to certain families, so also check RMG-Java, which may
+    # take a while to answer
+    rmgJavaKinetics = startRMGJavaKinetics(reactants, products) if only_families is None and rmgJava else None
+    
+    # get RMG-py reactions
+    reactantsList = [reactants]
+    if len(reactants) == 1:
+        # if only one reactant, react it with itself bimolecularly, with RMG-py
+        # the java version already does this (it includes A+A reactions when you react A)
+        reactantsList.append([reactants[0], reactants[0]])
+    # The families may be searched by the reactions pool while the libraries are searched here
+    familyResults = startFamilyReactions(database, reactantsList, products, only_families)
+    reactionList = []
+    familyReactions = {}
     if only_families is None:
-        # Not restricted to certain families, so also check RMG-Java.
-        rmgJavaReactionList = getRMGJavaKinetics(reactants, products)
-    else:
-        rmgJavaReactionList = []
+        # Not restricted to certain families, so also check libraries.
+        batch = []
+        for reactants0 in reactantsList:
+            batch.extend(generateReactionsFromLibraries(database, reactants0, products))
+        reactionList.extend(batch)
+        yield GeneratedReactions(batch, [])
     
-    return reactionList, rmgJavaReactionList
+    labels = [label for label in database.kinetics.families.keys() if only_families is None or label in only_families]
+    for index, reactants0 in enumerate(reactantsList):
+        for labelIndex, label in enumerate(labels):
+            if familyResults is None:
+                batch = database.kinetics.generateReactionsFromFamilies(reactants0, products, only_families=[label])
+            else:
+                batch = getFamilyReactions(database, familyResults[index][labelIndex])
+            if not batch:
+                continue
+            # get RMG-py kinetics
+            batchFamilyReactions = {}
+            batch = getReactionsKinetics(batch, batchFamilyReactions)
+            for family, reaction in batchFamilyReactions.iteritems():
+                familyReactions.setdefault(family, reaction)
+            reactionList.extend(batch)
+            yield GeneratedReactions(batch, [], batchFamilyReactions)
+    
+    # get RMG-java reactions
+    rmgJavaReactionList = rmgJavaKinetics() if rmgJavaKinetics is not None else []
+    yield GeneratedReactions([], rmgJavaReactionList)
+    
+    if cache:
+        reactioncache.cacheReactions(database, key, (reactionList, rmgJavaReactionList, familyReactions), reactants, products)
+
+def generateReactions(database, reactants, products=None, only_families=None, cache=True, rmgJava=True):
+    """
+    Generate the reactions (and associated kinetics) for a given set of
+    `reactants` and an optional set of `products`. A list of reactions is
+    returned, with a reaction for each matching kinetics entry in any part of
+    the database. This means that the same reaction may appear multiple times
+    with different kinetics in the output. If the RMG-Java server is running,
+    this function will also query it for reactions and kinetics.
+    If `only_families` is a list of strings, only those labeled families are 
+    used: no libraries and no RMG-Java kinetics are returned. If `rmgJava` is
+    ``False``, RMG-Java is not queried.
+    The lists are returned as a :class:`GeneratedReactions` pair.
+    
+    The results are cached until the kinetics or thermo database is reloaded
+    (see :mod:`rmgweb.database.reactioncache`), unless `cache` is ``False``.
+    """
+    reactionList = []
+    rmgJavaReactionList = []
+    familyReactions = {}
+    for batch in iterateReactions(database, reactants, products, only_families, cache, rmgJava):
+        reactionList.extend(batch[0])
+        rmgJavaReactionList.extend(batch[1])
+        for family, reaction in batch.familyReactions.iteritems():
+            familyReactions.setdefault(family, reaction)
+    return GeneratedReactions(reactionList, rmgJavaReactionList, familyReactions)
     
 ################################################################################
 
@@ -572,17 +1776,16 @@ def getRMGJavaKinetics(reactantList, productList=None):
     
         return reactants, products, kinetics, entry
     
-    def identifySpecies(species_dict, molecule):
+    def identifySpecies(species_keys, molecule):
         """
-        Given a species_dict list and the species adjacency list, identifies
-        whether species is found in the list and returns its name if found.
+        Given a :class:`SpeciesDict` of the species names by their molecules
+        and a species molecule, identifies whether species is found in the
+        dictionary and returns its name if found.
         """
-        resonance_isomers = molecule.generateResonanceIsomers()
-        for name, adjlist in species_dict:
-            listmolecule = Molecule().fromAdjacencyList(adjlist, saturateH=True)
-            for isomer in resonance_isomers:
-                if isomer.isIsomorphic(listmolecule):
-                    return name
+        for isomer in molecule.generateResonanceIsomers():
+            name = species_keys.get(isomer)
+            if name is not None:
+                return name
         return False
 
     productList = productList or []
@@ -633,19 +1836,24 @@ def getRMGJavaKinetics(reactantList, productList=None):
         print response
         return []
 
+    species_dict = [(key, Molecule().fromAdjacencyList(value,saturateH=True)) for key, value in species_dict]
+    species_keys = SpeciesDict()
+    for key, molecule in species_dict:
+        species_keys.setdefault(molecule, key)
+    
     # Name the species in reaction
     reactantNames = []
     for reactant in reactantList:
-        reactantNames.append(identifySpecies(species_dict, reactant))
+        reactantNames.append(identifySpecies(species_keys, reactant))
     productNames = []
     for product in productList:
-        productNames.append(identifySpecies(species_dict, product))
-        # identifySpecies(species_dict, product) returns "False" if it can't find product
-        if not identifySpecies(species_dict, product):
+        productNames.append(identifySpecies(species_keys, product))
+        # identifySpecies(species_keys, product) returns "False" if it can't find product
+        if not productNames[-1]:
             print "Could not find this requested product in the species dictionary from RMG-Java:"
             print str(product)
     
-    species_dict = dict([(key, Molecule().fromAdjacencyList(value,saturateH=True)) for key, value in species_dict])
+    species_dict = dict(species_dict)
     
     # Both products were actually found in species dictionary or were blank
     reaction = None
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+This module estimates the transport data of all the species of a mechanism at
+once, for writing a Chemkin transport file (tran.dat).
+
+The estimates are cached (see :mod:`rmgweb.database.transportcache`), so
+estimating the transport data of an edited mechanism only estimates the
+species that are new to it. The species that are not cached are estimated on the worker pool of the database (see
+``DATABASE_REACTIONS_PROCESSES``) in chunks.
+"""
+
+import os.path
+import shutil
+import tempfile
+
+import rmgpy.constants as constants
+from rmgpy.chemkin import loadChemkinFile
+
+from rmgweb.database.canonical import SpeciesDict
+from rmgweb.database.tools import startDatabaseTasks
+from rmgweb.database.transportcache import cacheTransport, getCachedTransport
+
+################################################################################
+
+# How many species to send to a worker process at a time
+TRANSPORT_CHUNK_SIZE = 50
+
+def loadMechanismSpecies(chemkinFile, dictionaryFile):
+    """
+    Return a list of the (label, molecule) pairs of the species of the
+    mechanism in the uploaded `chemkinFile`, with their structures from the
+    uploaded RMG species `dictionaryFile`. A species missing from the
+    dictionary gets an error message in place of its molecule.
+    """
+    path = tempfile.mkdtemp()
+    try:
+        chemkinPath = os.path.join(path, 'chem.inp')
+        dictionaryPath = os.path.join(path, 'species_dictionary.txt')
+        for upload, filePath in [(chemkinFile, chemkinPath), (dictionaryFile, dictionaryPath)]:
+            with open(filePath, 'wb') as f:
+                for chunk in upload.chunks():
+                    f.write(chunk)
+        speciesList, reactionList = loadChemkinFile(chemkinPath, dictionaryPath, readComments=False)
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+    return [(species.label, species.molecule[0] if species.molecule else 'Not in the species dictionary')
+            for species in speciesList]
+
+def estimateTransportChunk(database, molecules):
+    """
+    Return a list of the transport data RMG would use for each of `molecules`
+    (the first found in a library, or else the group estimate) from
+    `database`, each with a description of its source, or the error message
+    in place of those that fail. Run by the worker processes of the database
+    pool.
+    """
+    from rmgpy.species import Species
+    
+    chunk = []
+    for molecule in molecules:
+        try:
+            species = Species(molecule=[molecule])
+            species.generateResonanceIsomers()
+            data, library, entry = database.transport.getTransportProperties(species)
+            source = 'Group additivity' if library is None else '{0} ({1})'.format(library.label, entry.label)
+            chunk.append((data, source))
+        except Exception, e:
+            chunk.append('{0}: {1!s}'.format(e.__class__.__name__, e))
+    return chunk
+
+def iterateBatchTransport(database, speciesList):
+    """
+    Yield a (label, transport data, source) tuple for each of the (label,
+    molecule) pairs in `speciesList`, in order, with ``None`` in place of the
+    transport data and an error message as the source for those that could
+    not be estimated. Each distinct species not already cached is estimated
+    once, and then cached.
+    """
+    generation = getattr(database, 'transportGeneration', None)
+    # The distinct species, with their cached estimates (None if not cached)
+    molecules = []
+    estimates = []
+    indices = SpeciesDict()
+    rows = []
+    for label, molecule in speciesList:
+        if isinstance(molecule, basestring):
+            rows.append(None)
+            continue
+        index = indices.setdefault(molecule, len(molecules))
+        if index == len(molecules):
+            molecules.append(molecule)
+            estimates.append(getCachedTransport(generation, molecule) if generation is not None else None)
+        rows.append(index)
+    
+    missing = [index for index, estimate in enumerate(estimates) if estimate is None]
+    chunks = [missing[i:i+TRANSPORT_CHUNK_SIZE] for i in range(0, len(missing), TRANSPORT_CHUNK_SIZE)]
+    argsList = [([molecules[index] for index in chunk],) for chunk in chunks]
+    pending = startDatabaseTasks(database, estimateTransportChunk, argsList)
+    done = 0
+    
+    for (label, molecule), index in zip(speciesList, rows):
+        if index is None:
+            yield label, None, molecule
+            continue
+        # Wait for the chunk of this species, if not already done
+        while estimates[index] is None:
+            if pending is None:
+                results = estimateTransportChunk(database, *argsList[done])
+            else:
+                results = pending[done].get()
+            for chunkIndex, estimate in zip(chunks[done], results):
+                estimates[chunkIndex] = estimate
+                if generation is not None and not isinstance(estimate, basestring):
+                    cacheTransport(generation, molecules[chunkIndex], estimate)
+            done += 1
+        estimate = estimates[index]
+        if isinstance(estimate, basestring):
+            yield label, None, estimate
+        else:
+            data, source = estimate
+            yield label, data, source
+
+def writeTransportHeader():
+    """
+    Return the comment lines heading the columns of a Chemkin transport file.
+    """
+    return ('! {0:15} {1:8} {2:9} {3:9} {4:9} {5:9} {6:9} {7:9}\n'.format('Species', 'Shape', 'LJ-depth', 'LJ-diam', 'DiplMom', 'Polzblty', 'RotRelaxNum', 'Data') +
+            '! {0:15} {1:8} {2:9} {3:9} {4:9} {5:9} {6:9} {7:9}\n'.format('Name', 'Index', 'epsilon/k_B', 'sigma', 'mu', 'alpha', 'Zrot', 'Source'))
+
+def writeTransportEntry(label, data, source):
+    """
+    Return the line of a Chemkin transport file giving the transport `data`
+    of the species `label`, estimated from the given `source`, or a comment
+    explaining why there are none if `data` is ``None``.
+    """
+    if data is None:
+        return '! {0:19s} No transport data: {1}\n'.format(label, source)
+    return '{0:19} {1:d}   {2:9.3f} {3:9.3f} {4:9.3f} {5:9.3f} {6:9.3f}    ! {7:s}\n'.format(
+        label,
+        data.shapeIndex,
+        data.epsilon.value_si / constants.R,
+        data.sigma.value_si * 1e10,
+        data.dipoleMoment.value_si * constants.c * 1e21 if data.dipoleMoment else 0,
+        data.polarizability.value_si * 1e30 if data.polarizability else 0,
+        data.rotrelaxcollnum or 0,
+        source,
+    )
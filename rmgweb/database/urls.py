@@ -38,12 +38,16 @@ urlpatterns = [
     # Load the whole database into memory
     url(r'^load/?$', views.load),
     
+    # The version of the database being served, and any reload in progress
+    url(r'^status/?$', views.status),
+    
     # Export to an RMG-Java database
     url(r'^export_(?P<type>zip|tar\.gz)/?$', views.export),
 
     # Thermodynamics database
     url(r'^thermo/$', views.thermo),
     url(r'^thermo/search/$', views.moleculeSearch),
+    url(r'^thermo/batch/?$', views.thermoBatch),
     url(r'^thermo/molecule/(?P<adjlist>[\S\s]+)$', views.thermoData),
     url(r'^thermo/(?P<section>\w+)/(?P<subsection>.+)/(?P<index>-?\d+)/$', views.thermoEntry),
     url(r'^thermo/(?P<section>\w+)/(?P<subsection>.+)/(?P<adjlist>[\S\s]+)/new$', views.thermoEntryNew),
@@ -54,6 +58,7 @@ urlpatterns = [
     # Transport database
     url(r'^transport/$', views.transport),
     url(r'^transport/search/$', views.moleculeSearch),
+    url(r'^transport/batch/?$', views.transportBatch),
     url(r'^transport/molecule/(?P<adjlist>[\S\s]+)$', views.transportData),
     url(r'^transport/(?P<section>\w+)/(?P<subsection>.+)/(?P<index>-?\d+)/$', views.transportEntry),
     url(r'^transport/(?P<section>\w+)/(?P<subsection>.+)/$', views.transport),
@@ -63,6 +68,8 @@ urlpatterns = [
     url(r'^solvation/$', views.solvation),
     url(r'^solvation/search/$', views.solvationSearch),    
     url(r'^solvation/results/solute=(?P<solute_adjlist>[\S\s]+)__solvent=(?P<solvent>[\S\s]+)$', views.solvationData),    
+    url(r'^solvation/screen/solute=(?P<solute_adjlist>[\S\s]+)$', views.solvationScreen),
+    url(r'^solvation/batch/?$', views.solvationBatch),
     url(r'^solvation/(?P<section>\w+)/(?P<subsection>.+)/(?P<index>-?\d+)/$', views.solvationEntry),
     url(r'^solvation/(?P<section>\w+)/(?P<subsection>.+)/$', views.solvation),
     url(r'^solvation/(?P<section>\w+)/$', views.solvation),   
@@ -78,6 +85,7 @@ urlpatterns = [
     # Kinetics database
     url(r'^kinetics/$', views.kinetics),
     url(r'^kinetics/search/$', views.kineticsSearch),
+    url(r'^kinetics/batch/?$', views.kineticsBatch),
     url(r'^kinetics/results/reactant1=(?P<reactant1>[\S\s]+)__reactant2=(?P<reactant2>[\S\s]+)__product1=(?P<product1>[\S\s]+)__product2=(?P<product2>[\S\s]+)__product3=(?P<product3>[\S\s]+)$', views.kineticsResults),
     url(r'^kinetics/results/reactant1=(?P<reactant1>[\S\s]+)__product1=(?P<product1>[\S\s]+)__product2=(?P<product2>[\S\s]+)__product3=(?P<product3>[\S\s]+)$', views.kineticsResults),
     url(r'^kinetics/results/reactant1=(?P<reactant1>[\S\s]+)__reactant2=(?P<reactant2>[\S\s]+)__reactant3=(?P<reactant3>[\S\s]+)__product1=(?P<product1>[\S\s]+)__product2=(?P<product2>[\S\s]+)$', views.kineticsResults),
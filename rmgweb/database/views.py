@@ -30,6 +30,8 @@
 
 import cookielib
 import copy
+import json
+import math
 import os
 import re
 import shutil
@@ -40,6 +42,9 @@ import sys
 import time
 import urllib
 import urllib2
+import weakref
+
+import numpy
 
 try:
     from bs4 import BeautifulSoup
@@ -47,9 +52,11 @@ except ImportError:
     from BeautifulSoup import BeautifulSoup
 from django.shortcuts import render_to_response
 from django.template import RequestContext
-from django.http import Http404, HttpResponseRedirect, HttpResponse
+from django.http import Http404, HttpResponseRedirect, HttpResponse, StreamingHttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed
+from django.template.loader import render_to_string
 from django.contrib.auth.decorators import login_required
 from django.core.urlresolvers import reverse
+from django.views.decorators.csrf import csrf_exempt
 import rmgweb.settings
 
 # from django.forms.models import BaseInlineFormSet, inlineformset_factory
@@ -65,6 +72,7 @@ from rmgpy.reaction import Reaction
 from rmgpy.quantity import Quantity
 
 import rmgpy
+import rmgpy.constants
 from rmgpy.data.base import *
 from rmgpy.data.thermo import ThermoDatabase
 from rmgpy.data.kinetics import *
@@ -75,6 +83,15 @@ from rmgpy.data.transport import *
 
 from rmgweb.database.forms import *
 from tools import *
+from entryindex import getEntryIndex, getEntryList
+from structureindex import findStructure
+from reactionindex import getReactionIndex
+from reverserates import generateReverseRateCoefficients
+from kineticsbatch import BATCH_MAX_REACTIONS, BATCH_PRESSURE, BATCH_TEMPERATURES, getBatchKinetics
+from transportbatch import iterateBatchTransport, loadMechanismSpecies, writeTransportEntry, writeTransportHeader
+from solvationbatch import getBatchSolvation, writeBatchSolvationCSV
+from solventscreen import SCREENING_TEMPERATURE, SOLUTE_DESCRIPTORS, getSolventParameters, screenSolvents
+from thermobatch import CHEMKIN_THERMO_FOOTER, CHEMKIN_THERMO_HEADER, THERMO_TEMPERATURES, iterateBatchThermo, parseSpeciesDictionary, parseSpeciesList, writeBatchThermoEntry
 from rmgweb.main.tools import *
 
 #from rmgweb.main.tools import moleculeToURL, moleculeFromURL
@@ -88,6 +105,13 @@ def load(request):
     loadDatabase()
     return HttpResponseRedirect(reverse(index))
 
+def status(request):
+    """
+    Return the version of the RMG database served by this process, and the
+    state of any reload in progress, as JSON.
+    """
+    return HttpResponse(json.dumps(getDatabaseStatus(), indent=4), content_type='application/json')
+
 def index(request):
     """
     The RMG database homepage.
@@ -209,17 +233,15 @@ def transportEntry(request, section, subsection, index):
         raise Http404
     
     index = int(index)
+    entryIndex = getEntryIndex(database)
     if index != 0 and index != -1:
-        for entry in database.entries.values():
-            if entry.index == index:
-                break
-        else:
+        entry = entryIndex.get(index)
+        if entry is None:
             raise Http404
     else:
-        if index == 0:
-            index = min(entry.index for entry in database.entries.values() if entry.index > 0)
-        else:
-            index = max(entry.index for entry in database.entries.values() if entry.index > 0)
+        index = entryIndex.minIndex if index == 0 else entryIndex.maxIndex
+        if index is None:
+            raise Http404
         return HttpResponseRedirect(reverse(transportEntry,
                                             kwargs={'section': section,
                                                     'subsection': subsection,
@@ -279,6 +301,41 @@ def transportData(request, adjlist):
 
     return render_to_response('transportData.html', {'molecule': molecule, 'structure': structure, 'transportDataList': transportDataList, 'symmetryNumber': symmetryNumber}, context_instance=RequestContext(request))
 
+def transportBatch(request):
+    """
+    A view for estimating the transport data of every species of an uploaded
+    mechanism, given as a Chemkin file and species dictionary, which are
+    streamed back as a Chemkin transport file. The mechanism may have at most
+    ``DATABASE_BATCH_MAX_SPECIES`` species.
+    """
+    from forms import TransportBatchForm
+    if request.method != 'POST':
+        return render_to_response('transportBatch.html', {'form': TransportBatchForm()}, context_instance=RequestContext(request))
+    form = TransportBatchForm(request.POST, request.FILES, error_class=DivErrorList)
+    speciesList = None
+    if form.is_valid():
+        try:
+            speciesList = loadMechanismSpecies(form.cleaned_data['chemkin'], form.cleaned_data['dictionary'])
+        except Exception, e:
+            form.add_error(None, 'Could not read the mechanism: {0!s}'.format(e))
+    if speciesList is not None and len(speciesList) > rmgweb.settings.DATABASE_BATCH_MAX_SPECIES:
+        form.add_error(None, 'At most {0:d} species can be estimated at once.'.format(rmgweb.settings.DATABASE_BATCH_MAX_SPECIES))
+        speciesList = None
+    if speciesList is None:
+        return render_to_response('transportBatch.html', {'form': form}, context_instance=RequestContext(request))
+    
+    # Load the transport database if necessary
+    loadDatabase('transport')
+    from tools import database # used for the whole mechanism
+    
+    def stream():
+        yield writeTransportHeader()
+        for label, data, source in iterateBatchTransport(database, speciesList):
+            yield writeTransportEntry(label, data, source)
+    response = StreamingHttpResponse(stream(), content_type='text/plain')
+    response['Content-Disposition'] = 'attachment; filename=tran.dat'
+    return response
+
 #################################################################################################################################################
 
 def solvation(request, section='', subsection=''):
@@ -350,17 +407,15 @@ def solvationEntry(request, section, subsection, index):
         raise Http404
     
     index = int(index)
+    entryIndex = getEntryIndex(database)
     if index != 0 and index != -1:
-        for entry in database.entries.values():
-            if entry.index == index:
-                break
-        else:
+        entry = entryIndex.get(index)
+        if entry is None:
             raise Http404
     else:
-        if index == 0:
-            index = min(entry.index for entry in database.entries.values() if entry.index > 0)
-        else:
-            index = max(entry.index for entry in database.entries.values() if entry.index > 0)
+        index = entryIndex.minIndex if index == 0 else entryIndex.maxIndex
+        if index is None:
+            raise Http404
         return HttpResponseRedirect(reverse(solvationEntry,
                                             kwargs={'section': section,
                                                     'subsection': subsection,
@@ -428,6 +483,82 @@ def solvationData(request, solute_adjlist, solvent=''):
 
     return render_to_response('solvationData.html', {'molecule': molecule, 'structure': structure, 'solvationDataList': solvationDataList, 'solventDataInfo': solventDataInfo}, context_instance=RequestContext(request))
 
+def solvationScreen(request, solute_adjlist):
+    """
+    Returns a table of the solvation free energy, enthalpy and entropy of the
+    solute given by `solute_adjlist` in every solvent in the database, or the
+    same as JSON if ``?format=json`` is given.
+    """
+    loadDatabase('solvation')
+    db = getSolvationDatabase('','')
+
+    molecule = moleculeFromURL(solute_adjlist)
+    solute = Species(molecule = [molecule])
+    solute.generateResonanceIsomers()
+
+    # The preferred solute data is screened against all the solvents at once
+    soluteData = db.getSoluteData(solute)
+    solvents = screenSolvents(db, soluteData)
+
+    if request.GET.get('format') == 'json':
+        return HttpResponse(json.dumps({
+            'solute': molecule.toSMILES(),
+            'soluteData': dict([(name, getattr(soluteData, name)) for name in SOLUTE_DESCRIPTORS + ['V']]),
+            'temperature': SCREENING_TEMPERATURE,
+            'units': 'SI (J, mol, K)',
+            'solvents': solvents,
+        }, indent=4), content_type='application/json')
+
+    structure = getStructureInfo(molecule)
+    return render_to_response('solvationScreen.html', {'molecule': molecule, 'structure': structure, 'soluteData': soluteData, 'solvents': solvents, 'temperature': SCREENING_TEMPERATURE}, context_instance=RequestContext(request))
+
+def solvationBatch(request):
+    """
+    A view for estimating the solvation of a batch of species, given as an
+    uploaded species dictionary or a list of SMILES, in several solvents at
+    once. The results are returned as a CSV table or as JSON. At most
+    ``DATABASE_BATCH_MAX_SPECIES`` species can be given at once.
+    """
+    from forms import SolvationBatchForm
+    if request.method != 'POST':
+        return render_to_response('solvationBatch.html', {'form': SolvationBatchForm()}, context_instance=RequestContext(request))
+    form = SolvationBatchForm(request.POST, request.FILES, error_class=DivErrorList)
+    if not form.is_valid():
+        return render_to_response('solvationBatch.html', {'form': form}, context_instance=RequestContext(request))
+    
+    speciesList = []
+    if form.cleaned_data['dictionary']:
+        speciesList.extend(parseSpeciesDictionary(form.cleaned_data['dictionary'].read()))
+    if form.cleaned_data['species']:
+        speciesList.extend(parseSpeciesList(form.cleaned_data['species']))
+    if len(speciesList) > rmgweb.settings.DATABASE_BATCH_MAX_SPECIES:
+        form.add_error(None, 'At most {0:d} species can be estimated at once.'.format(rmgweb.settings.DATABASE_BATCH_MAX_SPECIES))
+        return render_to_response('solvationBatch.html', {'form': form}, context_instance=RequestContext(request))
+    
+    # Load the solvation database if necessary
+    loadDatabase('solvation')
+    from tools import database # used for the whole batch
+    
+    # Only the solvents with parameters in the loaded library can be screened
+    labels = getSolventParameters(database.solvation.libraries['solvent'])[0]
+    solvents = sorted(form.cleaned_data['solvents']) or labels
+    unknown = [solvent for solvent in solvents if solvent not in labels]
+    if unknown:
+        form.add_error('solvents', 'No solvent parameters for {0}.'.format(', '.join(unknown)))
+        return render_to_response('solvationBatch.html', {'form': form}, context_instance=RequestContext(request))
+    results = getBatchSolvation(database, speciesList, solvents)
+    if form.cleaned_data['format'] == 'json':
+        return HttpResponse(json.dumps({
+            'temperature': SCREENING_TEMPERATURE,
+            'units': 'SI (J, mol, K)',
+            'solvents': solvents,
+            'species': results,
+        }, indent=4), content_type='application/json')
+    else:
+        response = HttpResponse(writeBatchSolvationCSV(results, solvents), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename=solvation.csv'
+        return response
+
 
 #################################################################################################################################################
 
@@ -493,17 +624,15 @@ def statmechEntry(request, section, subsection, index):
         raise Http404
     
     index = int(index)
+    entryIndex = getEntryIndex(database)
     if index != 0 and index != -1:
-        for entry in database.entries.values():
-            if entry.index == index:
-                break
-        else:
+        entry = entryIndex.get(index)
+        if entry is None:
             raise Http404
     else:
-        if index == 0:
-            index = min(entry.index for entry in database.entries.values() if entry.index > 0)
-        else:
-            index = max(entry.index for entry in database.entries.values() if entry.index > 0)
+        index = entryIndex.minIndex if index == 0 else entryIndex.maxIndex
+        if index is None:
+            raise Http404
         return HttpResponseRedirect(reverse(statmechEntry,
                                             kwargs={'section': section,
                                                     'subsection': subsection,
@@ -626,17 +755,15 @@ def thermoEntry(request, section, subsection, index):
     except ValueError:
         raise Http404
     index = int(index)
+    entryIndex = getEntryIndex(database)
     if index != 0 and index != -1:
-        for entry in database.entries.values():
-            if entry.index == index:
-                break
-        else:
+        entry = entryIndex.get(index)
+        if entry is None:
             raise Http404
     else:
-        if index == 0:
-            index = min(entry.index for entry in database.entries.values() if entry.index > 0)
-        else:
-            index = max(entry.index for entry in database.entries.values() if entry.index > 0)
+        index = entryIndex.minIndex if index == 0 else entryIndex.maxIndex
+        if index is None:
+            raise Http404
         return HttpResponseRedirect(reverse(thermoEntry,
                                             kwargs={'section': section,
                                                     'subsection': subsection,
@@ -726,6 +853,52 @@ def thermoData(request, adjlist):
 
     return render_to_response('thermoData.html', {'molecule': molecule, 'structure': structure, 'thermoDataList': thermoDataList, 'symmetryNumber': symmetryNumber, 'plotWidth': 500, 'plotHeight': 400 + 15 * len(thermoDataList)}, context_instance=RequestContext(request))
 
+def thermoBatch(request):
+    """
+    A view for estimating the thermo data of a batch of species at once, given
+    as an uploaded species dictionary or a list of SMILES. The data are
+    streamed back as a Chemkin thermo file or as JSON, each species as soon as
+    it has been estimated. At most ``DATABASE_BATCH_MAX_SPECIES`` species can
+    be given at once.
+    """
+    from forms import ThermoBatchForm
+    if request.method != 'POST':
+        return render_to_response('thermoBatch.html', {'form': ThermoBatchForm()}, context_instance=RequestContext(request))
+    form = ThermoBatchForm(request.POST, request.FILES, error_class=DivErrorList)
+    if not form.is_valid():
+        return render_to_response('thermoBatch.html', {'form': form}, context_instance=RequestContext(request))
+    
+    speciesList = []
+    if form.cleaned_data['dictionary']:
+        speciesList.extend(parseSpeciesDictionary(form.cleaned_data['dictionary'].read()))
+    if form.cleaned_data['species']:
+        speciesList.extend(parseSpeciesList(form.cleaned_data['species']))
+    if len(speciesList) > rmgweb.settings.DATABASE_BATCH_MAX_SPECIES:
+        form.add_error(None, 'At most {0:d} species can be estimated at once.'.format(rmgweb.settings.DATABASE_BATCH_MAX_SPECIES))
+        return render_to_response('thermoBatch.html', {'form': form}, context_instance=RequestContext(request))
+    
+    # Load the thermo database if necessary
+    loadDatabase('thermo')
+    from tools import database # used for the whole batch
+    
+    results = iterateBatchThermo(database, speciesList)
+    if form.cleaned_data['format'] == 'json':
+        def stream():
+            yield '{{"temperatures": {0}, "units": "SI (J, mol, K)", "species": [\n'.format(json.dumps(THERMO_TEMPERATURES))
+            for index, result in enumerate(results):
+                yield (',\n' if index else '') + json.dumps(result)
+            yield '\n]}\n'
+        return StreamingHttpResponse(stream(), content_type='application/json')
+    else:
+        def stream():
+            yield CHEMKIN_THERMO_HEADER
+            for result in results:
+                yield writeBatchThermoEntry(result)
+            yield CHEMKIN_THERMO_FOOTER
+        response = StreamingHttpResponse(stream(), content_type='text/plain')
+        response['Content-Disposition'] = 'attachment; filename=therm.dat'
+        return response
+
 ################################################################################
 
 def getDatabaseTreeAsList(database, entries):
@@ -741,92 +914,88 @@ def getDatabaseTreeAsList(database, entries):
         tree.extend(getDatabaseTreeAsList(database, entry.children))
     return tree
 
-def getKineticsTreeHTML(database, section, subsection, entries):
+# The temperatures (in K) at which log10(k) is shown for each node of a kinetics tree
+KINETICS_TREE_TEMPERATURES = [300,400,500,600,800,1000,1500,2000]
+
+# The rendered tree of each kinetics groups or rules database, kept until the
+# database object is replaced by a reload of its family
+_kineticsTreeCache = weakref.WeakKeyDictionary()
+
+def getKineticsTreeRates(entries):
+    """
+    Return a dictionary of the values of log10(k), in SI units, at each of the
+    KINETICS_TREE_TEMPERATURES for each of the `entries` with kinetics data,
+    indexed by the id of the entry. The Arrhenius kinetics are evaluated for
+    all entries together in one NumPy pass; other kinetics models are
+    evaluated individually.
+    """
+    Tlist = numpy.array(KINETICS_TREE_TEMPERATURES, numpy.float64)
+    rates = {}
+    arrhenius = [entry for entry in entries if type(entry.data) is Arrhenius]
+    if arrhenius:
+        A = numpy.array([entry.data.A.value_si for entry in arrhenius])
+        n = numpy.array([entry.data.n.value_si for entry in arrhenius])
+        Ea = numpy.array([entry.data.Ea.value_si for entry in arrhenius])
+        T0 = numpy.array([entry.data.T0.value_si for entry in arrhenius])
+        # log10(k) = log10(A) + n log10(T/T0) - Ea / (R T ln 10)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            logk = (numpy.log10(A)[:,numpy.newaxis]
+                    + n[:,numpy.newaxis] * numpy.log10(Tlist[numpy.newaxis,:] / T0[:,numpy.newaxis])
+                    - Ea[:,numpy.newaxis] / (rmgpy.constants.R * math.log(10) * Tlist[numpy.newaxis,:]))
+        for entry, row in zip(arrhenius, logk):
+            rates[id(entry)] = row
+    for entry in entries:
+        if entry.data is not None and id(entry) not in rates:
+            rates[id(entry)] = [math.log10(entry.data.getRateCoefficient(T, P=1e5)) for T in KINETICS_TREE_TEMPERATURES]
+    return rates
+
+def writeKineticsTreeHTML(html, section, subsection, entries, rates):
     """
-    Return a string of HTML markup used for displaying information about
-    kinetics entries in a given `database` as a tree of unordered lists.
+    Append the HTML markup for the kinetics tree of `entries`, with the
+    given `rates` from :func:`getKineticsTreeRates`, to the list `html`.
     """
-    html = ''
     for entry in entries:
         # Write current node
         url = reverse(kineticsEntry, kwargs={'section': section, 'subsection': subsection, 'index': entry.index})
-        html += '<li class="kineticsEntry">\n'
-        html += '<div class="kineticsLabel">'
+        html.append('<li class="kineticsEntry">\n')
+        html.append('<div class="kineticsLabel">')
         if len(entry.children) > 0:
-            html += '<img id="button_{0}" class="treeButton" src="/media/tree-collapse.png"/>'.format(entry.index)
+            html.append('<img id="button_{0}" class="treeButton" src="/media/tree-collapse.png"/>'.format(entry.index))
         else:
-            html += '<img class="treeButton" src="/media/tree-blank.png"/>'
-        html += '<a href="{0}">{1}. {2}</a>\n'.format(url, entry.index, entry.label)
-        html += '<div class="kineticsData">\n'
+            html.append('<img class="treeButton" src="/media/tree-blank.png"/>')
+        html.append('<a href="{0}">{1}. {2}</a>\n'.format(url, entry.index, entry.label))
+        html.append('<div class="kineticsData">\n')
         if entry.data is not None:
-            for T in [300,400,500,600,800,1000,1500,2000]:
-                html += '<span class="kineticsDatum">{0:.2f}</span> '.format(math.log10(entry.data.getRateCoefficient(T, P=1e5)))
-        html += '</div>\n'
+            for logk in rates[id(entry)]:
+                html.append('<span class="kineticsDatum">{0:.2f}</span> '.format(logk))
+        html.append('</div>\n')
         # Recursively descend children (depth-first)
         if len(entry.children) > 0:
-            html += '<ul id="children_{0}" class="kineticsSubTree">\n'.format(entry.index)
-            html += getKineticsTreeHTML(database, section, subsection, entry.children)
-            html += '</ul>\n'
-        html += '</li>\n'
-    return html
+            html.append('<ul id="children_{0}" class="kineticsSubTree">\n'.format(entry.index))
+            writeKineticsTreeHTML(html, section, subsection, entry.children, rates)
+            html.append('</ul>\n')
+        html.append('</li>\n')
 
-def getUntrainedReactions(family):
-    """
-    Return a depository containing unique reactions for which no
-    training data exists.
+def getKineticsTreeHTML(database, section, subsection, entries):
     """
-    
-    # Load training depository
-    for depository in family.depositories:
-        if 'training' in depository.label:
-            training = depository
-            break
-    else:
-        raise Exception('Could not find training depository in {0} family.'.format(family.label))
-    
-    # Load trained reactions
-    trainedReactions = []
-    for entry in training.entries.values():
-        for reaction in trainedReactions:
-            if reaction.isIsomorphic(entry.item):
-                break
-        else:
-            trainedReactions.append(entry.item)
-    
-    # Load untrained reactions
-    untrainedReactions = []
-    for depository in family.depositories:
-        if 'training' not in depository.label:
-            for entry in depository.entries.values():
-                for reaction in trainedReactions:
-                    if reaction.isIsomorphic(entry.item):
-                        break
-                else:
-                    for reaction in untrainedReactions:
-                        if reaction.isIsomorphic(entry.item):
-                            break
-                    else:
-                        untrainedReactions.append(entry.item)
-    
-    # Sort reactions by reactant size
-    untrainedReactions.sort(key=lambda reaction: sum([1 for r in reaction.reactants for a in r.molecule[0].atoms if a.isNonHydrogen()]))
-    
-    # Build entries
-    untrained = KineticsDepository(name='{0}/untrained'.format(family.label),
-                                   label='{0}/untrained'.format(family.label))
-    count = 1
-    for reaction in untrainedReactions:
-        untrained.entries['{0}'.format(count)] = Entry(
-            item = reaction,
-            index = count,
-            label = getReactionUrl(reaction),
-        )
-        count += 1
-    
-    return untrained
-
-
-
+    Return a string of HTML markup used for displaying information about
+    kinetics entries in a given `database` as a tree of unordered lists.
+    The markup for the whole tree (from ``database.top``) is cached until the
+    database is reloaded.
+    """
+    key = (section, subsection)
+    wholeTree = entries is database.top
+    if wholeTree:
+        cached = _kineticsTreeCache.get(database)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+    rates = getKineticsTreeRates(getDatabaseTreeAsList(database, entries))
+    html = []
+    writeKineticsTreeHTML(html, section, subsection, entries, rates)
+    html = ''.join(html)
+    if wholeTree:
+        _kineticsTreeCache[database] = (key, html)
+    return html
 
 
 ###############################################################################
@@ -1220,10 +1389,7 @@ def kinetics(request, section='', subsection=''):
             tree = '<ul class="kineticsTree">\n{0}\n</ul>\n'.format(getKineticsTreeHTML(database, section, subsection, database.top))
         else:
             # If there is not a tree, consider all entries
-            entries0 = database.entries.values()
-            if any(isinstance(item, list) for item in entries0):
-                # if the entries are lists
-                entries0 = reduce(lambda x,y: x+y, entries0)
+            entries0 = getEntryList(database)
             # Sort the entries by index and label
             entries0.sort(key=lambda entry: (entry.index, entry.label))
             tree = ''
@@ -1281,25 +1447,23 @@ def kinetics(request, section='', subsection=''):
         # database components
         kineticsLibraries = [(label, library) for label, library in rmgDatabase.kinetics.libraries.iteritems() if subsection in label]
         kineticsLibraries.sort()
-        for family in rmgDatabase.kinetics.families.itervalues():
-            for i in range(0,len(family.depositories)):
-                if 'untrained' in family.depositories[i].name:
-                    family.depositories.pop(i)
-            family.depositories.append(getUntrainedReactions(family))
-        kineticsFamilies = [(label, family) for label, family in rmgDatabase.kinetics.families.iteritems() if subsection in label]
+        kineticsFamilies = [(label, family, getUntrainedDepository(family)) for label, family in rmgDatabase.kinetics.families.iteritems() if subsection in label]
         kineticsFamilies.sort()
         return render_to_response('kinetics.html', {'section': section, 'subsection': subsection, 'kineticsLibraries': kineticsLibraries, 'kineticsFamilies': kineticsFamilies}, context_instance=RequestContext(request))
 
 def kineticsUntrained(request, family):
     rmgDatabase = loadDatabase('kinetics', 'families')
-    entries0 = getUntrainedReactions(rmgDatabase.kinetics.families[family]).entries.values()
+    try:
+        entries0 = getUntrainedDepository(rmgDatabase.kinetics.families[family]).entries.values()
+    except KeyError:
+        raise Http404
     entries0.sort(key=lambda entry: (entry.index, entry.label))
     
     entries = []
     for entry0 in entries0:
         entry = {
                 'index': entry0.index,
-                'url': entry0.label,
+                'url': getReactionUrl(entry0.item),
             }
         
         entry['reactants'] = ' + '.join([getStructureInfo(reactant) for reactant in entry0.item.reactants])
@@ -1353,10 +1517,7 @@ def kineticsEntryNew(request, family, type):
     except ValueError:
         raise Http404
     
-    entries = database.entries.values()
-    if any(isinstance(item, list) for item in entries):
-        # if the entries are lists
-        entries = reduce(lambda x,y: x+y, entries)
+    entries = getEntryList(database)
     entry = None
     if request.method == 'POST':
         form = KineticsEntryEditForm(request.POST, error_class=DivErrorList)
@@ -1364,11 +1525,15 @@ def kineticsEntryNew(request, family, type):
             new_entry = form.cleaned_data['entry']
 
             # Set new entry index
-            indices = [entry.index for entry in database.entries.values()]
-            new_entry.index = max(indices or [0]) + 1
+            new_entry.index = getEntryIndex(database).nextIndex
 
             # Confirm entry does not already exist in depository
-            for entry in entries:
+            if type == 'training':
+                # Only the entries with the same reactants and products need checking
+                candidates = [entry for label, entry in getReactionIndex(database).find(new_entry.item.reactants, new_entry.item.products)]
+            else:
+                candidates = entries
+            for entry in candidates:
                 if ((type == 'training' and new_entry.item.isIsomorphic(entry.item)) or
                     (type == 'NIST' and new_entry.label == entry.label)):
                         kwargs = {'section': 'families',
@@ -1434,6 +1599,8 @@ def kineticsEntryNew(request, family, type):
             if True:
                 # save it
                 database.entries[index] = new_entry
+                indexDatabase(database)
+                _kineticsTreeCache.pop(database, None)
                 path = os.path.join(rmgweb.settings.DATABASE_PATH, 'kinetics', 'families', family, '{0}.py'.format(type))
                 database.save(path)
                 commit_author = '{0.first_name} {0.last_name} <{0.email}>'.format(request.user)
@@ -1485,15 +1652,9 @@ def kineticsEntryEdit(request, section, subsection, index):
     except ValueError:
         raise Http404
     
-    entries = database.entries.values()
-    if any(isinstance(item, list) for item in entries):
-        # if the entries are lists
-        entries = reduce(lambda x,y: x+y, entries)
     index = int(index)
-    for entry in entries:
-        if entry.index == index:
-            break
-    else:
+    entry = getEntryIndex(database).get(index)
+    if entry is None:
         raise Http404
     
     if request.method == 'POST':
@@ -1530,6 +1691,8 @@ def kineticsEntryEdit(request, section, subsection, index):
             if True:
                 # save it
                 database.entries[index] = new_entry
+                indexDatabase(database)
+                _kineticsTreeCache.pop(database, None)
                 path = os.path.join(rmgweb.settings.DATABASE_PATH, 'kinetics', section, subsection + '.py' )
                 database.save(path)
                 commit_author = "{0.first_name} {0.last_name} <{0.email}>".format(request.user)
@@ -1607,10 +1770,7 @@ def thermoEntryNew(request, section, subsection, adjlist):
     except ValueError:
         raise Http404
     
-    entries = database.entries.values()
-    if any(isinstance(item, list) for item in entries):
-        # if the entries are lists
-        entries = reduce(lambda x,y: x+y, entries)
+    entries = getEntryList(database)
     entry = None
     if request.method == 'POST':
         form = ThermoEntryEditForm(request.POST, error_class=DivErrorList)
@@ -1618,8 +1778,7 @@ def thermoEntryNew(request, section, subsection, adjlist):
             new_entry = form.cleaned_data['entry']
 
             # Set new entry index
-            indices = [entry.index for entry in database.entries.values()]
-            new_entry.index = max(indices or [0]) + 1
+            new_entry.index = getEntryIndex(database).nextIndex
 
             # Do not need to confirm entry already exists- should allow the user to store multiple 
             # thermo entries in to the depository or into separate libraries for the same molecule if the data exists.
@@ -1650,6 +1809,7 @@ def thermoEntryNew(request, section, subsection, adjlist):
             if True:
                 # save it
                 database.entries[index] = new_entry
+                indexDatabase(database)
                 path = os.path.join(rmgweb.settings.DATABASE_PATH, 'thermo', section, subsection + '.py')
                 database.save(path)
                 commit_author = '{0.first_name} {0.last_name} <{0.email}>'.format(request.user)
@@ -1719,15 +1879,9 @@ def thermoEntryEdit(request, section, subsection, index):
     except ValueError:
         raise Http404
     
-    entries = database.entries.values()
-    if any(isinstance(item, list) for item in entries):
-        # if the entries are lists
-        entries = reduce(lambda x,y: x+y, entries)
     index = int(index)
-    for entry in entries:
-        if entry.index == index:
-            break
-    else:
+    entry = getEntryIndex(database).get(index)
+    if entry is None:
         raise Http404
     
     if request.method == 'POST':
@@ -1764,6 +1918,7 @@ def thermoEntryEdit(request, section, subsection, index):
             if True:
                 # save it
                 database.entries[index] = new_entry
+                indexDatabase(database)
                 path = os.path.join(rmgweb.settings.DATABASE_PATH, 'thermo', section, subsection + '.py' )
                 database.save(path)
                 commit_author = "{0.first_name} {0.last_name} <{0.email}>".format(request.user)
@@ -1839,23 +1994,16 @@ def kineticsEntry(request, section, subsection, index):
     except ValueError:
         raise Http404
     
-    entries = database.entries.values()
-    if any(isinstance(item, list) for item in entries):
-        # if the entries are lists
-        entries = reduce(lambda x,y: x+y, entries)
-                
     index = int(index)
+    entryIndex = getEntryIndex(database)
     if index != 0 and index != -1:
-        for entry in entries:
-            if entry.index == index:
-                break
-        else:
+        entry = entryIndex.get(index)
+        if entry is None:
             raise Http404
     else:
-        if index == 0:
-            index = min(entry.index for entry in entries if entry.index > 0)
-        else:
-            index = max(entry.index for entry in entries if entry.index > 0)
+        index = entryIndex.minIndex if index == 0 else entryIndex.maxIndex
+        if index is None:
+            raise Http404
         return HttpResponseRedirect(reverse(kineticsEntry,
                                             kwargs={'section': section,
                                                     'subsection': subsection,
@@ -2156,44 +2304,16 @@ def kineticsResults(request, reactant1, reactant2='', reactant3='', product1='',
         
     return render_to_response('kineticsResults.html', {'reactionDataList': reactionDataList}, context_instance=RequestContext(request))
 
-def kineticsData(request, reactant1, reactant2='', reactant3='', product1='', product2='', product3=''):
+def getKineticsDataList(database, reactionList, rmgJavaReactionList, reactantList, start=0):
     """
-    A view used to present a list of reactions and the associated kinetics
-    for each.
+    Return a list of the results shown on the kinetics data page for the
+    reactions in `reactionList` (of which those in `rmgJavaReactionList` come
+    from RMG-Java), each given in the direction of the requested reactants in
+    `reactantList`, and numbered from `start` + 1. Also returns the label of
+    the last family that estimated any of the kinetics, or an empty string.
     """
-    from forms import RateEvaluationForm, KineticsEntryEditForm
-    # Load the kinetics database if necessary
-    loadDatabase('kinetics')
-    # Also load the thermo database so we can generate reverse kinetics if necessary
-    loadDatabase('thermo')
-    from tools import database # the global one with both thermo and kinetics
-
-    reactantList = []
-    reactantList.append(moleculeFromURL(reactant1))
-    if reactant2 != '':
-        reactantList.append(moleculeFromURL(reactant2))
-    if reactant3 != '':
-        reactantList.append(moleculeFromURL(reactant3))
-
-    if product1 != '' or product2 != '' or product3 != '':
-        productList = []
-        if product1 != '':
-            productList.append(moleculeFromURL(product1))
-        if product2 != '':
-            productList.append(moleculeFromURL(product2))
-        if product3 != '':
-            productList.append(moleculeFromURL(product3))
-            
-        reverseReaction = Reaction(reactants = productList, products = reactantList)
-        reverseReactionURL = getReactionUrl(reverseReaction)
-    else:
-        productList = None
-
-    # Search for the corresponding reaction(s)
-    reactionList, rmgJavaReactionList = generateReactions(database, reactantList, productList)
-    reactionList.extend(rmgJavaReactionList)
-    
     kineticsDataList = []
+    reverseRows = []
     family = ''
     
     # Go through database and group additivity kinetics entries
@@ -2236,54 +2356,173 @@ def kineticsData(request, reactant1, reactant2='', reactant3='', product1='', pr
         forwardKinetics = reaction.kinetics
         
         is_forward = reactionHasReactants(reaction, reactantList)
-        entry.result = len(kineticsDataList) + 1
+        entry.result = start + len(kineticsDataList) + 1
 
         if is_forward:
             kineticsDataList.append([reactants, arrow, products, entry, forwardKinetics, source, href, is_forward])
         else:
+            # The reverse kinetics are filled in below, all fitted together
             if isinstance(forwardKinetics, Arrhenius) or isinstance(forwardKinetics, KineticsData):
-                reverseKinetics = reaction.generateReverseRateCoefficient()
-                reverseKinetics.Tmin = forwardKinetics.Tmin
-                reverseKinetics.Tmax = forwardKinetics.Tmax
-                reverseKinetics.Pmin = forwardKinetics.Pmin
-                reverseKinetics.Pmax = forwardKinetics.Pmax
-            else:
-                reverseKinetics = None
-            kineticsDataList.append([products, arrow, reactants, entry, reverseKinetics, source, href, is_forward])
+                reverseRows.append((len(kineticsDataList), reaction))
+            kineticsDataList.append([products, arrow, reactants, entry, None, source, href, is_forward])
 
-    # Construct new entry form from group-additive result
-    # Need to get group-additive reaction from generateReaction with only_families
-    # +--> otherwise, adjacency list doesn't store reaction template properly
-    if family:
-        additiveList, empty_list = generateReactions(database, reactantList, productList, only_families=family)
-        additiveList = [rxn for rxn in additiveList if isinstance(rxn, TemplateReaction)]
-        reaction = additiveList[0]
-        new_entry = StringIO.StringIO(u'')
-        try:
-            if reactionHasReactants(reaction, reactantList):
-                rmgpy.data.kinetics.saveEntry(new_entry, Entry(label=str(reaction), item=Reaction(reactants=reaction.reactants, products=reaction.products)))
-            else:
-                rmgpy.data.kinetics.saveEntry(new_entry, Entry(label=str(reaction), item=Reaction(reactants=reaction.products, products=reaction.reactants)))
-        except Exception, e:
-            new_entry.write("ENTRY WAS NOT PARSED CORRECTLY.\n")
-            new_entry.write(str(e))
-            pass
-        entry_string = new_entry.getvalue()
-        entry_string = re.sub('^entry\(\n','',entry_string) # remove leading entry(
-        entry_string = re.sub('\s*index = -?\d+,\n','',entry_string) # remove the 'index = 23,' (or -1)line
-        new_entry_form = KineticsEntryEditForm(initial={'entry':entry_string })
-    else:
-        new_entry_form = None
+    if reverseRows:
+        reverseKineticsList = generateReverseRateCoefficients([reaction for index, reaction in reverseRows], getattr(database, 'thermoGeneration', None))
+        for (index, reaction), reverseKinetics in zip(reverseRows, reverseKineticsList):
+            forwardKinetics = reaction.kinetics
+            reverseKinetics.Tmin = forwardKinetics.Tmin
+            reverseKinetics.Tmax = forwardKinetics.Tmax
+            reverseKinetics.Pmin = forwardKinetics.Pmin
+            reverseKinetics.Pmax = forwardKinetics.Pmax
+            kineticsDataList[index][4] = reverseKinetics
+
+    return kineticsDataList, family
 
+def getNewKineticsEntryForm(familyReactions, family, reactantList):
+    """
+    Return the form for creating a new training entry of `family` from the
+    average of the rates on the kinetics data page, or ``None`` if no family
+    estimated any of them. `familyReactions` holds the group-additive
+    reaction of each family, in the direction it was generated.
+    """
+    from forms import KineticsEntryEditForm
+    if not family:
+        return None
+    # Need the group-additive reaction as it was generated, before its species
+    # were changed, otherwise the adjacency list doesn't store the reaction
+    # template properly
+    reaction = familyReactions[family]
+    new_entry = StringIO.StringIO(u'')
+    try:
+        if reactionHasReactants(reaction, reactantList):
+            rmgpy.data.kinetics.saveEntry(new_entry, Entry(label=str(reaction), item=Reaction(reactants=reaction.reactants, products=reaction.products)))
+        else:
+            rmgpy.data.kinetics.saveEntry(new_entry, Entry(label=str(reaction), item=Reaction(reactants=reaction.products, products=reaction.reactants)))
+    except Exception, e:
+        new_entry.write("ENTRY WAS NOT PARSED CORRECTLY.\n")
+        new_entry.write(str(e))
+        pass
+    entry_string = new_entry.getvalue()
+    entry_string = re.sub('^entry\(\n','',entry_string) # remove leading entry(
+    entry_string = re.sub('\s*index = -?\d+,\n','',entry_string) # remove the 'index = 23,' (or -1)line
+    return KineticsEntryEditForm(initial={'entry':entry_string })
+
+def getRateEvaluation(request):
+    """
+    Return the form for evaluating the rates on the kinetics data page, bound
+    to the POSTed temperature and pressure if there are any, and a list of
+    the temperature and pressure in SI units to evaluate the rates at, which
+    is empty unless valid ones were POSTed.
+    """
+    from forms import RateEvaluationForm
     rateForm = RateEvaluationForm()
     eval = []
     if request.method == 'POST':
         rateForm = RateEvaluationForm(request.POST, error_class=DivErrorList)
-        initial = request.POST.copy()
         if rateForm.is_valid():
             temperature = Quantity(rateForm.cleaned_data['temperature'], str(rateForm.cleaned_data['temperature_units'])).value_si
             pressure = Quantity(rateForm.cleaned_data['pressure'], str(rateForm.cleaned_data['pressure_units'])).value_si
             eval = [temperature, pressure]
+    return rateForm, eval
+
+# Separates the part of the streamed kinetics data page before the results
+# from the part after them
+KINETICS_STREAM_MARKER = '<!-- kinetics results -->'
+
+def kineticsDataStream(request, database, reactantList, productList, reverseReactionURL, rateForm, eval):
+    """
+    Return a response streaming the kinetics data page for the given reactants
+    and products, which shows the results from the libraries, each family and
+    RMG-Java as soon as each is searched, rather than once all have been. The
+    plot of the rates, the forms for creating a training entry from their
+    average and for evaluating them (with `rateForm`, at the conditions in
+    `eval`) follow the last of the results.
+    """
+    context = RequestContext(request)
+    page = render_to_string('kineticsDataStream.html', {'reactantList': reactantList,
+                                                        'productList': productList,
+                                                        'reverseReactionURL': reverseReactionURL,
+                                                        }, context_instance=context)
+    head, tail = page.split(KINETICS_STREAM_MARKER)
+    
+    def stream():
+        started = time.time()
+        firstResult = None
+        allKineticsData = []
+        familyReactions = {}
+        lastFamily = ''
+        yield head
+        for batch in iterateReactions(database, reactantList, productList):
+            reactionList, rmgJavaReactionList = batch
+            for family, reaction in batch.familyReactions.iteritems():
+                familyReactions.setdefault(family, reaction)
+            kineticsDataList, family = getKineticsDataList(database, reactionList + rmgJavaReactionList, rmgJavaReactionList, reactantList, start=len(allKineticsData))
+            if not kineticsDataList:
+                continue
+            if firstResult is None:
+                firstResult = time.time() - started
+            allKineticsData.extend(kineticsDataList)
+            lastFamily = family or lastFamily
+            yield render_to_string('kineticsDataStreamResults.html', {'kineticsDataList': kineticsDataList}, context_instance=context)
+        yield render_to_string('kineticsDataStreamEnd.html', {'kineticsDataList': allKineticsData,
+                                                              'firstResult': firstResult,
+                                                              'total': time.time() - started,
+                                                              'plotWidth': 500,
+                                                              'plotHeight': 400 + 15 * len(allKineticsData),
+                                                              'form': rateForm,
+                                                              'eval': eval,
+                                                              'new_entry_form': getNewKineticsEntryForm(familyReactions, lastFamily, reactantList),
+                                                              'subsection': lastFamily,
+                                                              }, context_instance=context)
+        yield tail
+    
+    return StreamingHttpResponse(stream())
+
+def kineticsData(request, reactant1, reactant2='', reactant3='', product1='', product2='', product3=''):
+    """
+    A view used to present a list of reactions and the associated kinetics
+    for each.
+    """
+    # Load the kinetics database if necessary
+    loadDatabase('kinetics')
+    # Also load the thermo database so we can generate reverse kinetics if necessary
+    loadDatabase('thermo')
+    from tools import database # the global one with both thermo and kinetics
+
+    reactantList = []
+    reactantList.append(moleculeFromURL(reactant1))
+    if reactant2 != '':
+        reactantList.append(moleculeFromURL(reactant2))
+    if reactant3 != '':
+        reactantList.append(moleculeFromURL(reactant3))
+
+    if product1 != '' or product2 != '' or product3 != '':
+        productList = []
+        if product1 != '':
+            productList.append(moleculeFromURL(product1))
+        if product2 != '':
+            productList.append(moleculeFromURL(product2))
+        if product3 != '':
+            productList.append(moleculeFromURL(product3))
+            
+        reverseReaction = Reaction(reactants = productList, products = reactantList)
+        reverseReactionURL = getReactionUrl(reverseReaction)
+    else:
+        productList = None
+        reverseReactionURL = ''
+
+    rateForm, eval = getRateEvaluation(request)
+
+    if request.GET.get('stream'):
+        return kineticsDataStream(request, database, reactantList, productList, reverseReactionURL, rateForm, eval)
+
+    # Search for the corresponding reaction(s)
+    generatedReactions = generateReactions(database, reactantList, productList)
+    reactionList, rmgJavaReactionList = generatedReactions
+    kineticsDataList, family = getKineticsDataList(database, reactionList + rmgJavaReactionList, rmgJavaReactionList, reactantList)
+
+    # Construct new entry form from group-additive result
+    new_entry_form = getNewKineticsEntryForm(generatedReactions.familyReactions, family, reactantList)
 
     return render_to_response('kineticsData.html', {'kineticsDataList': kineticsDataList,
                                                     'plotWidth': 500,
@@ -2298,6 +2537,44 @@ def kineticsData(request, reactant1, reactant2='', reactant3='', product1='', pr
                                                     },
                                              context_instance=RequestContext(request))
 
+@csrf_exempt
+def kineticsBatch(request):
+    """
+    Return as JSON every kinetics entry and estimate for each of a batch of
+    reactions, POSTed as a JSON object such as::
+    
+        {"reactions": ["CC + [OH]", {"reactants": ["C=C", "[H]"], "products": ["C[CH2]"]}],
+         "temperatures": [300, 1000, 2000]}
+    
+    where each reaction is given as for
+    :func:`rmgweb.database.kineticsbatch.parseReaction`, and the temperatures
+    in K at which to evaluate the rate coefficients are optional. At most
+    ``BATCH_MAX_REACTIONS`` reactions can be given in one batch.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    try:
+        query = json.loads(request.body)
+        reactions = list(query['reactions'])
+        temperatures = [float(T) for T in query.get('temperatures') or BATCH_TEMPERATURES]
+    except (ValueError, KeyError, TypeError, AttributeError), e:
+        return HttpResponseBadRequest('Invalid kinetics batch request: {0!s}'.format(e), content_type='text/plain')
+    if len(reactions) > BATCH_MAX_REACTIONS:
+        return HttpResponseBadRequest('Invalid kinetics batch request: at most {0:d} reactions can be given at once.'.format(BATCH_MAX_REACTIONS), content_type='text/plain')
+    
+    # Load the kinetics database, and the thermo database for the rate rules
+    loadDatabase('kinetics')
+    loadDatabase('thermo')
+    from tools import database # the global one with both thermo and kinetics, used for the whole batch
+    
+    results = getBatchKinetics(database, reactions, temperatures)
+    return HttpResponse(json.dumps({
+        'temperatures': temperatures,
+        'pressure': BATCH_PRESSURE,
+        'units': 'SI (m, mol, s, K, Pa)',
+        'reactions': results,
+    }, indent=1), content_type='application/json')
+
 def moleculeSearch(request):
     """
     Creates webpage form to display molecule chemgraph upon entering adjacency list, smiles, or inchi, as well as searches for thermochemistry data.
@@ -2364,6 +2641,9 @@ def solvationSearch(request):
         
             if 'solvation' in request.POST:
                 return HttpResponseRedirect(reverse(solvationData, kwargs={'solute_adjlist': solute_adjlist, 'solvent': solvent}))
+
+            if 'screen' in request.POST:
+                return HttpResponseRedirect(reverse(solvationScreen, kwargs={'solute_adjlist': solute_adjlist}))
                     
             if 'reset' in request.POST:
                 form = SolvationSearchForm()
@@ -2457,7 +2737,16 @@ def moleculeEntry(request,adjlist):
         oldAdjlist = molecule.toAdjacencyList(removeH=True,oldStyle=True)
     except:
         pass
-    return render_to_response('moleculeEntry.html',{'structure':structure,'molecule':molecule,'oldAdjlist':oldAdjlist}, context_instance=RequestContext(request))
+
+    # List the database entries in which the molecule appears, searching only
+    # the parts of the database already loaded rather than loading the rest
+    from tools import database
+    appearances = []
+    for component, section, subsection, entry in findStructure(database, molecule):
+        url = reverse('database.views.{0}Entry'.format(component), kwargs={'section': section, 'subsection': subsection, 'index': entry.index})
+        appearances.append((url, '{0}/{1}/{2}'.format(component, section, subsection), entry.index, entry.label))
+
+    return render_to_response('moleculeEntry.html',{'structure':structure,'molecule':molecule,'oldAdjlist':oldAdjlist,'appearances':appearances}, context_instance=RequestContext(request))
 
 def groupEntry(request,adjlist):
     """
@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+
+"""
+This module watches the RMG database directories for changes, so that the
+website can tell whether a part of the database needs reloading without
+walking and ``stat()``-ing every file on each request.
+
+Each watched directory has a generation number that is incremented whenever
+anything beneath it changes. On Linux the changes are reported by inotify;
+elsewhere a background thread polls the directory tree instead. Either way
+the check made while serving a request is a single integer comparison.
+
+Watchers are per process: a process forked from one that was watching
+starts its own watcher the first time it calls :func:`getWatcher`.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+import sys
+import threading
+import time
+
+################################################################################
+
+def isIgnored(name):
+    """
+    Return ``True`` if changes to the file `name` should be ignored, such as
+    hidden files, editor backups and compiled Python files.
+    """
+    return name.startswith('.') or name.endswith('~') or os.path.splitext(name)[1] in ['.pyc', '.pyo']
+
+class DirectoryWatcher(object):
+    """
+    The base class for watchers that keep a generation number for each
+    watched directory. Subclasses call :meth:`bump` when they detect a change.
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.generations = {}
+        self.lock = threading.Lock()
+
+    def watch(self, path):
+        """
+        Start watching the directory tree at `path`, if not already doing so.
+        """
+        path = os.path.abspath(path)
+        with self.lock:
+            if path in self.generations:
+                return
+            self.generations[path] = 0
+            self.addWatch(path)
+
+    def addWatch(self, path):
+        raise NotImplementedError()
+
+    def getGeneration(self, path):
+        """
+        Return the generation number of the watched directory at `path`. The
+        number changes whenever anything in the directory tree changes.
+        """
+        return self.generations[os.path.abspath(path)]
+
+    def bump(self, path):
+        """
+        Increment the generation of every watched directory containing `path`.
+        """
+        for root in self.generations.keys():
+            if path == root or path.startswith(root + os.sep):
+                self.generations[root] += 1
+
+    def bumpAll(self):
+        """
+        Increment the generation of every watched directory.
+        """
+        for root in self.generations.keys():
+            self.generations[root] += 1
+
+################################################################################
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+IN_WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+                 IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+def _getLibC():
+    """
+    Return the C library if it provides inotify, or ``None`` if not.
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+class InotifyWatcher(DirectoryWatcher):
+    """
+    A watcher that is told about changes by the Linux kernel via inotify.
+    A background thread reads the events and bumps the generation numbers.
+    """
+
+    def __init__(self, libc):
+        DirectoryWatcher.__init__(self)
+        self.libc = libc
+        self.fd = libc.inotify_init()
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init failed')
+        # The directory watched by each inotify watch descriptor
+        self.directories = {}
+        self.thread = threading.Thread(target=self.run)
+        self.thread.setDaemon(True)
+        self.thread.start()
+
+    def addWatch(self, path):
+        """
+        Add inotify watches for the directory at `path` and all of its
+        subdirectories, since inotify watches are not recursive.
+        """
+        for root, dirs, files in os.walk(path):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            wd = self.libc.inotify_add_watch(self.fd, root, IN_WATCH_MASK)
+            if wd < 0:
+                print >> sys.stderr, "Unable to watch {0} for changes: {1}".format(root, os.strerror(ctypes.get_errno()))
+                continue
+            self.directories[wd] = root
+
+    def run(self):
+        """
+        Read inotify events forever, bumping the generation of the watched
+        directories they affect.
+        """
+        while True:
+            try:
+                buffer = os.read(self.fd, 65536)
+            except OSError, e:
+                if e.errno == errno.EINTR:
+                    continue
+                raise
+            offset = 0
+            with self.lock:
+                while offset < len(buffer):
+                    wd, mask, cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                    name = buffer[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip('\0')
+                    offset += _EVENT_HEADER.size + length
+                    self.processEvent(wd, mask, name)
+
+    def processEvent(self, wd, mask, name):
+        """
+        Process a single inotify event for the file `name` in the directory
+        with watch descriptor `wd`.
+        """
+        if mask & IN_Q_OVERFLOW:
+            # Events were lost, so assume everything changed
+            self.bumpAll()
+            return
+        if mask & IN_IGNORED:
+            # The watch was removed (e.g. its directory was deleted)
+            self.directories.pop(wd, None)
+            return
+        directory = self.directories.get(wd)
+        if directory is None or (name and isIgnored(name)):
+            return
+        path = os.path.join(directory, name) if name else directory
+        if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+            # Start watching new subdirectories too
+            self.addWatch(path)
+        self.bump(path)
+
+################################################################################
+
+class PollingWatcher(DirectoryWatcher):
+    """
+    A watcher for platforms without inotify, which walks the watched
+    directories in a background thread every `interval` seconds and bumps
+    the generation of any in which a file was added, removed or modified.
+    """
+
+    def __init__(self, interval=2.0):
+        DirectoryWatcher.__init__(self)
+        self.interval = interval
+        self.signatures = {}
+        self.thread = threading.Thread(target=self.run)
+        self.thread.setDaemon(True)
+        self.thread.start()
+
+    def addWatch(self, path):
+        self.signatures[path] = self.getSignature(path)
+
+    def getSignature(self, path):
+        """
+        Return a dictionary of the modification time and size of every file
+        in the directory tree at `path`.
+        """
+        signature = {}
+        for root, dirs, files in os.walk(path):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            for name in files:
+                if isIgnored(name):
+                    continue
+                filepath = os.path.join(root, name)
+                try:
+                    stat = os.stat(filepath)
+                except OSError:
+                    # The file was removed while we were walking
+                    continue
+                signature[filepath] = (stat.st_mtime, stat.st_size)
+        return signature
+
+    def run(self):
+        """
+        Poll the watched directories forever.
+        """
+        while True:
+            time.sleep(self.interval)
+            for path in self.signatures.keys():
+                signature = self.getSignature(path)
+                with self.lock:
+                    if signature != self.signatures[path]:
+                        self.signatures[path] = signature
+                        self.bump(path)
+
+################################################################################
+
+_watcher = None
+_watcherLock = threading.Lock()
+
+def getWatcher():
+    """
+    Return the directory watcher for the current process, starting one if
+    necessary. An inotify watcher is used where available, and a polling
+    watcher otherwise.
+    """
+    global _watcher
+    watcher = _watcher
+    if watcher is not None and watcher.pid == os.getpid():
+        return watcher
+    with _watcherLock:
+        if _watcher is None or _watcher.pid != os.getpid():
+            libc = _getLibC()
+            watcher = None
+            if libc is not None:
+                try:
+                    watcher = InotifyWatcher(libc)
+                except OSError, e:
+                    print >> sys.stderr, "Unable to use inotify ({0!s}); polling for database changes instead.".format(e)
+            _watcher = watcher or PollingWatcher()
+            print "Started {0} for database changes in process {1}".format(_watcher.__class__.__name__, os.getpid())
+        return _watcher
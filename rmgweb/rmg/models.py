@@ -37,7 +37,7 @@ from django.utils.text import capfirst
 from rmgpy.molecule.molecule import Molecule
 from rmgpy.rmg.main import RMG
 from rmgweb.main.tools import *
-from rmgweb.database.tools import database, loadDatabase
+from rmgweb.database.tools import loadDatabase
 
 import rmgweb.settings as settings
 
@@ -106,6 +106,7 @@ class Chemkin(models.Model):
         from rmgpy.kinetics import ArrheniusEP, Chebyshev
         from rmgpy.reaction import Reaction
         from rmgpy.data.base import Entry
+        from rmgweb.database.reverserates import generateReverseRateCoefficients
         
         kineticsDataList = []    
         chemkinPath= self.path + '/chemkin/chem.inp'
@@ -123,7 +124,13 @@ class Chemkin(models.Model):
             # If the kinetics are ArrheniusEP, replace them with Arrhenius
             if isinstance(reaction.kinetics, ArrheniusEP):
                 reaction.kinetics = reaction.kinetics.toArrhenius(reaction.getEnthalpyOfReaction(298))
-
+        
+        # Fit the reverse kinetics of all the reactions together; the fits are
+        # cached until the chemkin file is replaced
+        version = (chemkinPath, os.path.getmtime(chemkinPath), os.path.getsize(chemkinPath))
+        reverseKineticsList = generateReverseRateCoefficients(reactionList, version)
+        
+        for reaction, reverseKinetics in zip(reactionList, reverseKineticsList):
             if os.path.exists(dictionaryPath):
                 reactants = ' + '.join([moleculeToInfo(reactant) for reactant in reaction.reactants])
                 arrow = '&hArr;' if reaction.reversible else '&rarr;'
@@ -142,7 +149,6 @@ class Chemkin(models.Model):
             forward = True
             chemkin = reaction.toChemkin(speciesList)
             
-            reverseKinetics = reaction.generateReverseRateCoefficient()
             reverseKinetics.comment = 'Fitted reverse reaction. ' + reaction.kinetics.comment
             
             rev_reaction = Reaction(reactants = reaction.products, products = reaction.reactants, kinetics = reverseKinetics)
@@ -888,7 +894,7 @@ class Input(models.Model):
 # DATABASE MODELS
 ################################################################################
 loadDatabase('thermo','libraries')
-loadDatabase('kinetics','libraries')
+database = loadDatabase('kinetics','libraries')
 ThermoLibraries = [(label, label) for label, library in database.thermo.libraries.iteritems()]
 ThermoLibraries.sort()
 KineticsLibraries = [(label, label) for label, library in database.kinetics.libraries.iteritems()]
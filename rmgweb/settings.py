@@ -42,6 +42,98 @@ try:
 except ImportError:
     template_debug_setting = DEBUG
 
+# Where to keep the serialized snapshot of the loaded RMG database, which lets
+# new worker processes start without parsing the whole database.
+# Set it to None in secretsettings.py to disable snapshots.
+try:
+    from secretsettings import DATABASE_SNAPSHOT_PATH
+except ImportError:
+    DATABASE_SNAPSHOT_PATH = os.path.join(PROJECT_PATH, '..', 'database', 'snapshot', 'RMG_database.pkl')
+
+# Where to cache the kinetics families once their rate rules have been trained,
+# so they need not be retrained until their files or the thermo database change.
+# Set it to None in secretsettings.py to disable the cache.
+try:
+    from secretsettings import DATABASE_RULES_CACHE_PATH
+except ImportError:
+    DATABASE_RULES_CACHE_PATH = os.path.join(PROJECT_PATH, '..', 'database', 'rules')
+
+# How many processes to use when loading the whole RMG database from scratch,
+# e.g. when preloading it or building the snapshot. Loading forks worker
+# processes, so only set this above 1 where that is safe to do.
+try:
+    from secretsettings import DATABASE_LOAD_PROCESSES
+except ImportError:
+    DATABASE_LOAD_PROCESSES = 1
+
+# How many processes to generate the reactions for a kinetics search with,
+# searching the families in parallel. The worker processes are forked from
+# the web server process by tools.startReactionsPool() before it starts any
+# threads, so only set this above 1 where that is safe to do. Each time the
+# database is reloaded the workers are closed, freeing the old version, and
+# the next search forks new ones with the new version; a search made while a
+# reload is still in progress runs serially.
+try:
+    from secretsettings import DATABASE_REACTIONS_PROCESSES
+except ImportError:
+    DATABASE_REACTIONS_PROCESSES = 1
+
+# How many kinetics searches (the reactions generated for a set of reactants
+# and products) to keep in memory, so popular searches are not repeated.
+# Set it to 0 in secretsettings.py to disable the cache.
+try:
+    from secretsettings import DATABASE_REACTIONS_CACHE_SIZE
+except ImportError:
+    DATABASE_REACTIONS_CACHE_SIZE = 256
+
+# Where to also keep the results of kinetics searches on disk, so they can be
+# shared by all the server processes and survive restarts. None disables it.
+try:
+    from secretsettings import DATABASE_REACTIONS_CACHE_PATH
+except ImportError:
+    DATABASE_REACTIONS_CACHE_PATH = None
+
+# How many species to keep the estimated thermo data of in memory, so each is
+# estimated only once however many reactions or searches it takes part in.
+# Set it to 0 in secretsettings.py to disable the cache.
+try:
+    from secretsettings import DATABASE_THERMO_CACHE_SIZE
+except ImportError:
+    DATABASE_THERMO_CACHE_SIZE = 1024
+
+# How many fitted reverse rate coefficients to keep in memory, so the reverse
+# kinetics shown on a page are not refitted every time it is viewed.
+# Set it to 0 in secretsettings.py to disable the cache.
+try:
+    from secretsettings import DATABASE_REVERSE_RATES_CACHE_SIZE
+except ImportError:
+    DATABASE_REVERSE_RATES_CACHE_SIZE = 1024
+
+# How many species to keep the estimated transport data of in memory, so that
+# estimating the transport data of an edited mechanism only estimates its new
+# species. Set it to 0 in secretsettings.py to disable the cache.
+try:
+    from secretsettings import DATABASE_TRANSPORT_CACHE_SIZE
+except ImportError:
+    DATABASE_TRANSPORT_CACHE_SIZE = 4096
+
+# How many species to keep the estimated solute data of in memory, so that
+# the solvation of a mechanism's species is estimated only once for each
+# species, however many solvents or uploads it is needed for.
+# Set it to 0 in secretsettings.py to disable the cache.
+try:
+    from secretsettings import DATABASE_SOLUTE_CACHE_SIZE
+except ImportError:
+    DATABASE_SOLUTE_CACHE_SIZE = 4096
+
+# The most species that can be uploaded at once to the bulk thermo, transport
+# and solvation pages, so that one upload cannot tie up a server process and
+# the worker pool for long.
+try:
+    from secretsettings import DATABASE_BATCH_MAX_SPECIES
+except ImportError:
+    DATABASE_BATCH_MAX_SPECIES = 1000
+
 MANAGERS = ADMINS
 
 # Local time zone for this installation. Choices can be found here: